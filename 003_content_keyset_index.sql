@@ -0,0 +1,4 @@
+-- Migration: 003_content_keyset_index.sql
+-- Index for keyset pagination of content, newest first
+
+CREATE INDEX idx_content_company_created_at_id ON content(company_id, created_at DESC, id DESC);
@@ -0,0 +1,5 @@
+-- Migration: 004_content_filter_indexes.sql
+-- Indexes for filtered content lists, newest first within each filter
+
+CREATE INDEX idx_content_company_status_created_at_id ON content(company_id, status, created_at DESC, id DESC);
+CREATE INDEX idx_content_company_type_created_at_id ON content(company_id, type, created_at DESC, id DESC);
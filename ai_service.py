@@ -5,9 +5,21 @@ This module provides the service layer for AI-powered content generation.
 """
 
 import os
+import re
 import json
-from typing import Dict, Any, List, Optional
-
+import string
+import time
+import asyncio
+import functools
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Final, AsyncIterator, Tuple, Callable, Mapping
+
+import httpx
+import openai
+import numpy as np
+import redis.asyncio as redis
+
+from .llm_cache import LLMCache, RedisCacheBackend
 from .prompt_templates import (
     LEAD_MESSAGE_TEMPLATES,
     REVIEW_REQUEST_TEMPLATES,
@@ -16,41 +28,14 @@ from .prompt_templates import (
 )
 
 
-class AIService:
-    """Service for AI-powered content generation."""
+# Mock responses used when no OpenAI API key is configured
+_MOCK_LEAD: Final[str] = "Hello {lead_name}, thank you for your interest in our services. I noticed you came to us through {source}. I'd love to learn more about your needs and how we can help. Would you be available for a quick call this week?"
 
-    def __init__(self):
-        """Initialize the AI service."""
-        self.api_key = os.environ.get("OPENAI_API_KEY", "mock_api_key")
-        self.model = os.environ.get("OPENAI_MODEL", "gpt-4")
+_MOCK_REVIEW: Final[str] = "Hi {customer_name}, thank you for choosing our services! We hope you had a great experience. If you have a moment, we'd really appreciate it if you could leave us a review on {platform}. Your feedback helps us improve and helps others find us. Here's a link: {review_url}"
 
-    def _call_openai_api(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7) -> str:
-        """
-        Call the OpenAI API to generate content.
-        
-        Args:
-            prompt: Prompt to send to the API
-            max_tokens: Maximum number of tokens to generate
-            temperature: Temperature for generation
-            
-        Returns:
-            Generated content
-        """
-        # In a real implementation, this would call the OpenAI API
-        # For now, we'll just return a mock response based on the prompt
-        
-        # Mock implementation for development
-        if "lead" in prompt.lower():
-            return "Hello {lead_name}, thank you for your interest in our services. I noticed you came to us through {source}. I'd love to learn more about your needs and how we can help. Would you be available for a quick call this week?"
-        
-        elif "review" in prompt.lower():
-            return "Hi {customer_name}, thank you for choosing our services! We hope you had a great experience. If you have a moment, we'd really appreciate it if you could leave us a review on {platform}. Your feedback helps us improve and helps others find us. Here's a link: {review_url}"
-        
-        elif "referral" in prompt.lower():
-            return "Hi {customer_name}, thank you for your positive review! We'd love to show our appreciation by offering you and your friends a special discount. Share this code with friends or family: {referral_code}. They'll get 10% off their first purchase, and you'll get 10% off your next one when they use it!"
-        
-        elif "blog" in prompt.lower():
-            return """# 10 Tips for Small Business Success
+_MOCK_REFERRAL: Final[str] = "Hi {customer_name}, thank you for your positive review! We'd love to show our appreciation by offering you and your friends a special discount. Share this code with friends or family: {referral_code}. They'll get 10% off their first purchase, and you'll get 10% off your next one when they use it!"
+
+_MOCK_BLOG: Final[str] = """# 10 Tips for Small Business Success
 
 Running a small business can be challenging, but with the right strategies, you can set yourself up for success. Here are ten proven tips to help your small business thrive:
 
@@ -95,12 +80,12 @@ Connect with other business owners, join industry associations, and attend netwo
 Stay flexible and be willing to adapt your business model as needed. Keep an eye on industry trends and be prepared to evolve your products or services to meet changing customer needs.
 
 By implementing these strategies, you can position your small business for long-term success. Remember, building a successful business takes time, so be patient and persistent in your efforts."""
-        
-        elif "social" in prompt.lower():
-            return "🚀 Excited to share our latest tips for small business success! Check out our new blog post where we cover everything from defining your unique value proposition to embracing technology. Link in bio! #SmallBusinessTips #Entrepreneurship #BusinessGrowth"
-        
-        elif "email" in prompt.lower():
-            return """Subject: 10 Essential Tips to Grow Your Small Business
+
+_MOCK_TITLE: Final[str] = "10 Tips for Small Business Success"
+
+_MOCK_SOCIAL: Final[str] = "🚀 Excited to share our latest tips for small business success! Check out our new blog post where we cover everything from defining your unique value proposition to embracing technology. Link in bio! #SmallBusinessTips #Entrepreneurship #BusinessGrowth"
+
+_MOCK_EMAIL: Final[str] = """Subject: 10 Essential Tips to Grow Your Small Business
 
 Dear Valued Customer,
 
@@ -125,11 +110,435 @@ Wishing you continued success,
 [Your Name]
 [Company Name]
 """
+
+_MOCK_DEFAULT: Final[str] = "Generated content based on your request."
+
+_MOCK_RESPONSES: Final[Dict[str, str]] = {
+    "lead": _MOCK_LEAD,
+    "review": _MOCK_REVIEW,
+    "referral": _MOCK_REFERRAL,
+    "blog": _MOCK_BLOG,
+    "title": _MOCK_TITLE,
+    "social": _MOCK_SOCIAL,
+    "email": _MOCK_EMAIL
+}
+
+# Stock messages returned without calling the API when the request carries
+# too little information to personalize a message
+_FALLBACK_MESSAGES: Final[Dict[str, str]] = {
+    "lead": "Hi there, thank you for your interest in our services. Is there anything we can help you with?",
+    "review": "Hi {customer_name}, thank you for your business! If you have a moment, we'd really appreciate it if you could leave us a review."
+}
+
+# Models for short messages and for long-form content, overridable per
+# deployment
+OPENAI_SMALL_MODEL = os.environ.get("OPENAI_SMALL_MODEL", "gpt-4o-mini")
+OPENAI_LARGE_MODEL = os.environ.get("OPENAI_LARGE_MODEL", "gpt-4o")
+
+# Smallest model and output budget that serve each intent; intents not
+# listed here use OPENAI_MODEL with a 500 token budget. Long content doubles
+# the budget.
+_MODEL_BY_INTENT: Final[Dict[str, Tuple[str, int]]] = {
+    "title": (OPENAI_SMALL_MODEL, 40),
+    "social": (OPENAI_SMALL_MODEL, 120),
+    "lead": (OPENAI_SMALL_MODEL, 200),
+    "review": (OPENAI_SMALL_MODEL, 200),
+    "referral": (OPENAI_SMALL_MODEL, 250),
+    "email": (OPENAI_LARGE_MODEL, 500),
+    "blog": (OPENAI_LARGE_MODEL, 500)
+}
+
+# Stop sequences for intents that should produce a single short block
+_STOP_BY_INTENT: Final[Dict[str, List[str]]] = {
+    "title": ["\n\n"],
+    "social": ["\n\n"]
+}
+
+# Polling interval bounds in seconds for OpenAI batch jobs
+BATCH_POLL_INITIAL_SECONDS = 5
+BATCH_POLL_MAX_SECONDS = 300
+
+# Generated response templates are reused for up to this many seconds, and at
+# most this many are kept, least recently used first out
+RESPONSE_CACHE_TTL_SECONDS = 24 * 60 * 60
+RESPONSE_CACHE_MAX_ENTRIES = 4096
+
+# Per-recipient placeholders in a generated response, such as {lead_name}
+_SLOT_RE = re.compile(r"\{(\w+)\}")
+
+# Prompt used to generate blog post titles
+_TITLE_PROMPT_TEMPLATE: Final[str] = "Generate a catchy title for a blog post about {topic}. Make it SEO-friendly and include key terms if possible."
+
+# Fallback routing for prompts sent without an explicit intent; each intent is
+# a named group so a match maps to its intent without lower-casing the text
+_INTENT_RE = re.compile(
+    "|".join(f"(?P<{intent}>{intent})" for intent in ("lead", "review", "referral", "blog", "social", "email")),
+    re.IGNORECASE
+)
+
+
+def _compile_template(template: str) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Compile a str.format template into a render function.
+    
+    The template is parsed once, so rendering only joins the precomputed
+    literals with the parameter values.
+    
+    Args:
+        template: Template with {name} placeholders
         
-        else:
-            return "Generated content based on your request."
+    Returns:
+        Function rendering the template from a mapping of parameters
+    """
+    pieces = []
+    for literal, field_name, format_spec, conversion in string.Formatter().parse(template):
+        if format_spec or conversion:
+            return template.format_map
+        if literal:
+            pieces.append((literal, None))
+        if field_name is not None:
+            pieces.append((None, field_name))
+    
+    def render(params: Mapping[str, Any]) -> str:
+        return "".join([literal if field_name is None else str(params[field_name]) for literal, field_name in pieces])
+    
+    return render
+
+
+# Prompt templates compiled once at import time
+_COMPILED_LEAD_TEMPLATES: Final = {key: _compile_template(value) for key, value in LEAD_MESSAGE_TEMPLATES.items()}
+_COMPILED_REVIEW_TEMPLATES: Final = {key: _compile_template(value) for key, value in REVIEW_REQUEST_TEMPLATES.items()}
+_COMPILED_REFERRAL_TEMPLATES: Final = {key: _compile_template(value) for key, value in REFERRAL_OFFER_TEMPLATES.items()}
+_COMPILED_CONTENT_TEMPLATES: Final = {key: _compile_template(value) for key, value in CONTENT_GENERATION_TEMPLATES.items()}
+_COMPILED_TITLE_TEMPLATE: Final = _compile_template(_TITLE_PROMPT_TEMPLATE)
+
+# Templates used by default, bound once so lookups avoid a second dict access
+_DEFAULT_LEAD_TEMPLATE: Final = _COMPILED_LEAD_TEMPLATES["initial_contact"]
+_DEFAULT_REVIEW_TEMPLATE: Final = _COMPILED_REVIEW_TEMPLATES["default"]
+_DEFAULT_REFERRAL_TEMPLATE: Final = _COMPILED_REFERRAL_TEMPLATES["default"]
+_DEFAULT_CONTENT_TEMPLATE: Final = _COMPILED_CONTENT_TEMPLATES["blog"]
+
+
+@functools.lru_cache(maxsize=1024)
+def _join_keywords(keywords: Tuple[str, ...]) -> str:
+    """Join keywords for a prompt, memoized for repeated keyword lists."""
+    return ", ".join(keywords)
+
+
+# HTTP client shared by every AIService instance, so OpenAI calls reuse
+# pooled keep-alive HTTP/2 connections instead of opening new ones
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(60.0, connect=10.0)
+        )
+    return _http_client
+
+
+# Completion calls in flight keyed by their parameters, so concurrent
+# identical prompts from any AIService instance share one API call
+_inflight_completions: Dict[tuple, "asyncio.Future[str]"] = {}
+
+# Generated content shared by every AIService instance, so repeated and
+# near-identical generation requests skip the LLM round trip. With
+# LLM_CACHE_REDIS_URL set, cached responses are shared by all API processes
+_cache_redis_url = os.environ.get("LLM_CACHE_REDIS_URL")
+_content_cache = LLMCache(RedisCacheBackend(redis.from_url(_cache_redis_url)) if _cache_redis_url else None)
+
+
+class AIService:
+    """Service for AI-powered content generation."""
+
+    def __init__(self):
+        """Initialize the AI service."""
+        self.api_key = os.environ.get("OPENAI_API_KEY", "mock_api_key")
+        self.model = os.environ.get("OPENAI_MODEL", "gpt-4")
+        self.embedding_model = os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+        
+        # Async client on the shared HTTP transport, built on first use and
+        # rebuilt whenever the transport has been closed and replaced
+        self._openai_client: Optional[openai.AsyncOpenAI] = None
+        self._openai_http_client: Optional[httpx.AsyncClient] = None
+        
+        # Response templates keyed by (template_id, fixed prompt parameters),
+        # with the time the entry expires, least recently used first
+        self._response_cache: "OrderedDict[tuple, Tuple[float, str]]" = OrderedDict()
+
+    @property
+    def _client(self) -> Optional[openai.AsyncOpenAI]:
+        """
+        Get the OpenAI client on the current shared HTTP client.
+        
+        Returns:
+            OpenAI client, or None in development so that the module-level
+            mock responses are used instead
+        """
+        if self.api_key == "mock_api_key":
+            return None
+        http_client = _get_http_client()
+        if self._openai_client is None or self._openai_http_client is not http_client:
+            self._openai_client = openai.AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+            self._openai_http_client = http_client
+        return self._openai_client
+
+    async def close(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        global _http_client
+        if _http_client is not None:
+            await _http_client.aclose()
+            _http_client = None
+        self._openai_client = None
+        self._openai_http_client = None
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Get the generated content cache counters for this process."""
+        return _content_cache.stats()
+
+    def _completion_params(self, intent: Optional[str], max_tokens: Optional[int]) -> Dict[str, Any]:
+        """
+        Get the model, output budget and stop sequences for an intent.
+        
+        Args:
+            intent: Kind of content requested
+            max_tokens: Explicit maximum number of tokens, overriding the intent default
+            
+        Returns:
+            Keyword arguments for the completions API
+        """
+        model, default_max_tokens = _MODEL_BY_INTENT.get(intent, (self.model, 500))
+        params = {
+            "model": model,
+            "max_tokens": max_tokens or default_max_tokens
+        }
+        if intent in _STOP_BY_INTENT:
+            params["stop"] = _STOP_BY_INTENT[intent]
+        return params
+
+    def _content_max_tokens(self, content_type: str, length: str) -> int:
+        """
+        Get the output budget for a content generation request.
+        
+        Args:
+            content_type: Type of content to generate
+            length: Length of the content
+            
+        Returns:
+            Maximum number of tokens to generate
+        """
+        max_tokens = _MODEL_BY_INTENT.get(content_type, (self.model, 500))[1]
+        return max_tokens * 2 if length == "long" else max_tokens
+
+    async def _call_openai_api(self, prompt: str, max_tokens: Optional[int] = None, temperature: float = 0.7, intent: Optional[str] = None) -> str:
+        """
+        Call the OpenAI API to generate content.
+        
+        Args:
+            prompt: Prompt to send to the API
+            max_tokens: Maximum number of tokens to generate (defaults to the intent's budget)
+            temperature: Temperature for generation
+            intent: Kind of content requested (lead, review, referral, blog, social, email, title)
+            
+        Returns:
+            Generated content
+        """
+        if self._client is not None:
+            key = (self.model, prompt, max_tokens, temperature, intent)
+            completion = _inflight_completions.get(key)
+            if completion is None:
+                completion = asyncio.ensure_future(self._create_completion(prompt, max_tokens, temperature, intent))
+                _inflight_completions[key] = completion
+                completion.add_done_callback(lambda _: _inflight_completions.pop(key, None))
+            
+            # Shielded, so one cancelled caller does not cancel the shared call
+            return await asyncio.shield(completion)
+        
+        # Mock implementation for development
+        if intent is None:
+            match = _INTENT_RE.search(prompt)
+            intent = match.lastgroup if match else None
+        
+        return _MOCK_RESPONSES.get(intent, _MOCK_DEFAULT)
+
+    async def _create_completion(self, prompt: str, max_tokens: Optional[int], temperature: float, intent: Optional[str]) -> str:
+        """
+        Send a prompt to the chat completions API.
+        
+        Args:
+            prompt: Prompt to send to the API
+            max_tokens: Maximum number of tokens to generate (defaults to the intent's budget)
+            temperature: Temperature for generation
+            intent: Kind of content requested
+            
+        Returns:
+            Generated content
+        """
+        response = await self._client.chat.completions.create(
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            **self._completion_params(intent, max_tokens)
+        )
+        return response.choices[0].message.content
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed text for semantic cache lookups.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector, or None in development without an API key
+        """
+        if self._client is None:
+            return None
+        
+        response = await self._client.embeddings.create(model=self.embedding_model, input=text)
+        return np.asarray(response.data[0].embedding, dtype=np.float32)
 
-    def generate_lead_message(self, params: Dict[str, Any]) -> str:
+    async def _stream_openai_api(self, prompt: str, max_tokens: Optional[int] = None, temperature: float = 0.7, intent: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Call the OpenAI API and yield content as it is generated.
+        
+        Args:
+            prompt: Prompt to send to the API
+            max_tokens: Maximum number of tokens to generate (defaults to the intent's budget)
+            temperature: Temperature for generation
+            intent: Kind of content requested
+            
+        Yields:
+            Generated content deltas
+        """
+        if self._client is None:
+            # Mock implementation for development
+            yield await self._call_openai_api(prompt, max_tokens, temperature, intent)
+            return
+        
+        stream = await self._client.chat.completions.create(
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            **self._completion_params(intent, max_tokens)
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def _generate_from_template(self, template_id: tuple, template: Callable[[Mapping[str, Any]], str], fixed: Dict[str, Any], slots: Dict[str, Any]) -> str:
+        """
+        Generate a message from a prompt template, reusing cached responses.
+        
+        Per-recipient slots are sent to the API as literal placeholders so the
+        response can be cached as a template and re-filled for later recipients
+        that share the same template and fixed parameters.
+        
+        Args:
+            template_id: Identifier of the prompt template
+            template: Compiled prompt template
+            fixed: Parameters that change the generated response
+            slots: Per-recipient parameters substituted into the response
+            
+        Returns:
+            Generated message
+        """
+        key = (template_id, tuple(sorted(fixed.items())))
+        response_template = self._get_response_template(key)
+        
+        if response_template is None:
+            prompt = self._template_prompt(template, fixed, slots)
+            response_template = await self._call_openai_api(prompt, intent=template_id[0])
+            if response_template:
+                self._cache_response_template(key, response_template)
+        
+        return self._fill_response(response_template, slots)
+
+    def _get_response_template(self, key: tuple) -> Optional[str]:
+        """Get a cached response template, or None if missing or expired."""
+        cached = self._response_cache.get(key)
+        if cached is None:
+            return None
+        if cached[0] <= time.time():
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        return cached[1]
+
+    def _cache_response_template(self, key: tuple, response_template: str) -> None:
+        """Cache a response template, evicting the least recently used entry when full."""
+        self._response_cache[key] = (time.time() + RESPONSE_CACHE_TTL_SECONDS, response_template)
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+            self._response_cache.popitem(last=False)
+
+    def _template_prompt(self, template: Callable[[Mapping[str, Any]], str], fixed: Dict[str, Any], slots: Dict[str, Any]) -> str:
+        """
+        Render a prompt with the per-recipient slots left as placeholders.
+        
+        Args:
+            template: Compiled prompt template
+            fixed: Parameters that change the generated response
+            slots: Per-recipient parameters substituted into the response
+            
+        Returns:
+            Prompt to send to the API
+        """
+        return template({**fixed, **{slot: "{" + slot + "}" for slot in slots}})
+
+    def _fill_response(self, response_template: str, slots: Dict[str, Any]) -> str:
+        """
+        Substitute per-recipient slots into a cached response.
+        
+        Only the known {slot} placeholders are replaced; the response is model
+        output, so any other braces are left as they are.
+        
+        Args:
+            response_template: Response with slot placeholders
+            slots: Per-recipient parameters
+            
+        Returns:
+            Personalized response
+        """
+        def substitute(match: "re.Match[str]") -> str:
+            slot = match.group(1)
+            return str(slots[slot]) if slot in slots else match.group(0)
+        
+        return _SLOT_RE.sub(substitute, response_template)
+
+    def _lead_message_request(self, params: Dict[str, Any]) -> Optional[Tuple[tuple, Callable[[Mapping[str, Any]], str], Dict[str, Any], Dict[str, Any]]]:
+        """
+        Resolve the template and parameters for a lead message.
+        
+        Args:
+            params: Parameters for message generation
+            
+        Returns:
+            Tuple of template ID, compiled template, fixed parameters and slots,
+            or None if the stock fallback message should be used
+        """
+        message_type = params.get("message_type", "initial_contact")
+        
+        # Nothing to personalize, so skip the API call
+        if message_type not in _COMPILED_LEAD_TEMPLATES and not params.get("lead_name"):
+            return None
+        
+        # Get the appropriate template
+        template = _COMPILED_LEAD_TEMPLATES.get(message_type, _DEFAULT_LEAD_TEMPLATE)
+        
+        fixed = {
+            "company_id": params.get("company_id", ""),
+            "lead_source": params.get("lead_source", "our website")
+        }
+        slots = {"lead_name": params.get("lead_name", "there")}
+        
+        return ("lead", message_type), template, fixed, slots
+
+    async def generate_lead_message(self, params: Dict[str, Any]) -> str:
         """
         Generate a personalized message for a lead.
         
@@ -139,21 +548,138 @@ Wishing you continued success,
         Returns:
             Generated message
         """
-        # Get the appropriate template
-        message_type = params.get("message_type", "initial_contact")
-        template = LEAD_MESSAGE_TEMPLATES.get(message_type, LEAD_MESSAGE_TEMPLATES["initial_contact"])
+        request = self._lead_message_request(params)
+        if request is None:
+            return _FALLBACK_MESSAGES["lead"]
         
-        # Fill in template placeholders
-        prompt = template.format(
-            lead_name=params.get("lead_name", "there"),
-            company_id=params.get("company_id", ""),
-            lead_source=params.get("lead_source", "our website")
+        # Generate content
+        return await self._generate_from_template(*request)
+
+    async def generate_lead_messages_bulk(self, items: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Generate personalized messages for many leads through the OpenAI Batch API.
+        
+        Intended for non-interactive campaigns: batch jobs are cheaper per
+        request but may take up to 24 hours. Only responses missing from the
+        response cache are submitted, once per distinct template and fixed
+        parameters.
+        
+        Args:
+            items: Parameters for each message, as for generate_lead_message
+            
+        Returns:
+            Generated messages, in the same order as items, with None for
+            items whose request failed in the batch job
+            
+        Raises:
+            RuntimeError: If the batch job does not complete
+        """
+        if self._client is None:
+            return [await self.generate_lead_message(params) for params in items]
+        
+        requests = [self._lead_message_request(params) for params in items]
+        
+        # Collect one prompt per distinct response that is not cached yet
+        response_templates: Dict[tuple, Optional[str]] = {}
+        prompts: Dict[tuple, str] = {}
+        for request in requests:
+            if request is None:
+                continue
+            template_id, template, fixed, slots = request
+            key = (template_id, tuple(sorted(fixed.items())))
+            if key in response_templates or key in prompts:
+                continue
+            response_template = self._get_response_template(key)
+            if response_template is None:
+                prompts[key] = self._template_prompt(template, fixed, slots)
+            else:
+                response_templates[key] = response_template
+        
+        if prompts:
+            keys = list(prompts)
+            responses = await self._run_batch([prompts[key] for key in keys], intent="lead")
+            for key, response in zip(keys, responses):
+                # Failed or empty responses are not cached, so they are retried next time
+                response_templates[key] = response or None
+                if response:
+                    self._cache_response_template(key, response)
+        
+        messages = []
+        for request in requests:
+            if request is None:
+                messages.append(_FALLBACK_MESSAGES["lead"])
+                continue
+            template_id, _, fixed, slots = request
+            response_template = response_templates[(template_id, tuple(sorted(fixed.items())))]
+            messages.append(self._fill_response(response_template, slots) if response_template else None)
+        
+        return messages
+
+    async def _run_batch(self, prompts: List[str], intent: Optional[str] = None, temperature: float = 0.7) -> List[Optional[str]]:
+        """
+        Run chat completions for several prompts as one OpenAI batch job.
+        
+        Args:
+            prompts: Prompts to send to the API
+            intent: Kind of content requested
+            temperature: Temperature for generation
+            
+        Returns:
+            Generated content, in the same order as prompts, with None for
+            prompts whose request failed
+            
+        Raises:
+            RuntimeError: If the batch job does not complete
+        """
+        params = self._completion_params(intent, None)
+        lines = [
+            json.dumps({
+                "custom_id": str(index),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "temperature": temperature,
+                    "messages": [{"role": "user", "content": prompt}],
+                    **params
+                }
+            })
+            for index, prompt in enumerate(prompts)
+        ]
+        
+        input_file = await self._client.files.create(
+            file=("batch_input.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = await self._client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
         )
         
-        # Generate content
-        return self._call_openai_api(prompt)
+        # Poll with exponential backoff until the job finishes
+        delay = BATCH_POLL_INITIAL_SECONDS
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+            batch = await self._client.batches.retrieve(batch.id)
+        
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch {batch.id} finished with status {batch.status}")
+        
+        output = await self._client.files.content(batch.output_file_id)
+        
+        results: List[Optional[str]] = [None] * len(prompts)
+        for line in output.text.splitlines():
+            if not line:
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                results[int(result["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+        
+        return results
 
-    def generate_review_request(self, params: Dict[str, Any]) -> str:
+    async def generate_review_request(self, params: Dict[str, Any]) -> str:
         """
         Generate a review request message.
         
@@ -163,20 +689,25 @@ Wishing you continued success,
         Returns:
             Generated message
         """
-        # Get the template
-        template = REVIEW_REQUEST_TEMPLATES["default"]
+        # Without a platform there is nothing to tailor the request to
+        if not params.get("platform"):
+            return _FALLBACK_MESSAGES["review"].format(customer_name=params.get("customer_name") or "there")
         
-        # Fill in template placeholders
-        prompt = template.format(
-            customer_name=params.get("customer_name", "there"),
-            company_id=params.get("company_id", ""),
-            platform=params.get("platform", "Google")
-        )
+        # Get the template
+        template = _DEFAULT_REVIEW_TEMPLATE
         
         # Generate content
-        return self._call_openai_api(prompt)
+        return await self._generate_from_template(
+            ("review", "default"),
+            template,
+            fixed={
+                "company_id": params.get("company_id", ""),
+                "platform": params["platform"]
+            },
+            slots={"customer_name": params.get("customer_name", "there")}
+        )
 
-    def generate_referral_offer(self, params: Dict[str, Any]) -> str:
+    async def generate_referral_offer(self, params: Dict[str, Any]) -> str:
         """
         Generate a referral offer message.
         
@@ -187,19 +718,62 @@ Wishing you continued success,
             Generated message
         """
         # Get the template
-        template = REFERRAL_OFFER_TEMPLATES["default"]
+        template = _DEFAULT_REFERRAL_TEMPLATE
         
-        # Fill in template placeholders
-        prompt = template.format(
-            customer_name=params.get("customer_name", "there"),
-            company_id=params.get("company_id", ""),
-            referral_code=params.get("referral_code", "CODE123")
+        # Generate content
+        return await self._generate_from_template(
+            ("referral", "default"),
+            template,
+            fixed={"company_id": params.get("company_id", "")},
+            slots={
+                "customer_name": params.get("customer_name", "there"),
+                "referral_code": params.get("referral_code", "CODE123")
+            }
         )
+
+    def _validate_topic(self, topic: str) -> None:
+        """
+        Check that a content generation request has a topic.
         
-        # Generate content
-        return self._call_openai_api(prompt)
+        Args:
+            topic: Topic for the content
+            
+        Raises:
+            ValueError: If the topic is empty
+        """
+        if not topic or not topic.strip():
+            raise ValueError("A topic is required to generate content")
 
-    def generate_content(self, content_type: str, topic: str, keywords: List[str] = None, tone: str = "professional", length: str = "medium", target_audience: str = None, additional_instructions: str = None, company_id: str = None) -> Dict[str, str]:
+    def _build_content_prompt(self, content_type: str, topic: str, keywords: Optional[List[str]], tone: str, length: str, target_audience: Optional[str], additional_instructions: Optional[str]) -> str:
+        """
+        Build the prompt for a content generation request.
+        
+        Args:
+            content_type: Type of content to generate (blog, social, email)
+            topic: Topic for the content
+            keywords: Keywords to include
+            tone: Tone of the content
+            length: Length of the content
+            target_audience: Target audience for the content
+            additional_instructions: Additional instructions for generation
+            
+        Returns:
+            Prompt to send to the API
+        """
+        # Get the appropriate template
+        template = _COMPILED_CONTENT_TEMPLATES.get(content_type, _DEFAULT_CONTENT_TEMPLATE)
+        
+        # Fill in template placeholders
+        return template({
+            "topic": topic,
+            "keywords": _join_keywords(tuple(keywords)) if keywords else "",
+            "tone": tone,
+            "length": length,
+            "target_audience": target_audience or "general audience",
+            "additional_instructions": additional_instructions or ""
+        })
+
+    async def generate_content(self, content_type: str, topic: str, keywords: List[str] = None, tone: str = "professional", length: str = "medium", target_audience: str = None, additional_instructions: str = None, company_id: str = None) -> Dict[str, str]:
         """
         Generate content for marketing or communication.
         
@@ -215,31 +789,133 @@ Wishing you continued success,
             
         Returns:
             Dictionary with generated content
+            
+        Raises:
+            ValueError: If the topic is empty
         """
-        # Get the appropriate template
-        template = CONTENT_GENERATION_TEMPLATES.get(content_type, CONTENT_GENERATION_TEMPLATES["blog"])
+        self._validate_topic(topic)
         
-        # Fill in template placeholders
-        prompt = template.format(
-            topic=topic,
-            keywords=", ".join(keywords) if keywords else "",
-            tone=tone,
-            length=length,
-            target_audience=target_audience or "general audience",
-            additional_instructions=additional_instructions or ""
+        prompt = self._build_content_prompt(content_type, topic, keywords, tone, length, target_audience, additional_instructions)
+        
+        # Serve repeated requests from the cache; responses at the default
+        # temperature are reused, as with the lead and review templates
+        key = LLMCache.cache_key(
+            self._completion_params(content_type, None)["model"],
+            {"company_id": company_id, "content_type": content_type, "prompt": prompt},
+            temperature=0.7
         )
+        cached = await _content_cache.get(key)
+        if cached is not None:
+            return dict(cached)
         
-        # Generate content
-        generated_content = self._call_openai_api(prompt, max_tokens=1000 if length == "long" else 500)
+        # Near-identical requests match on the embedding of their variable
+        # fields, within one company only. Requests without a company skip
+        # semantic matching, so no tenant is served another tenant's content
+        namespace = ("company", company_id, content_type, length) if company_id else None
+        semantic_text = "\n".join([
+            topic,
+            _join_keywords(tuple(keywords)) if keywords else "",
+            tone,
+            target_audience or "",
+            additional_instructions or ""
+        ])
+        embedding = None
+        if namespace is not None and _content_cache.has_index(namespace):
+            embedding = await self._embed(semantic_text)
+            if embedding is not None:
+                cached = await _content_cache.semantic_get(namespace, embedding)
+                if cached is not None:
+                    return dict(cached)
+        
+        body_coro = self._call_openai_api(prompt, max_tokens=self._content_max_tokens(content_type, length), intent=content_type)
         
-        # For blog posts, generate a title separately
+        # For blog posts, generate a title separately, concurrently with the body
         title = topic
         if content_type == "blog":
-            title_prompt = f"Generate a catchy title for a blog post about {topic}. Make it SEO-friendly and include key terms if possible."
-            title = self._call_openai_api(title_prompt, max_tokens=50, temperature=0.8)
+            title_prompt = _COMPILED_TITLE_TEMPLATE({"topic": topic})
+            title_coro = self._call_openai_api(title_prompt, temperature=0.8, intent="title")
+            generated_content, title = await asyncio.gather(body_coro, title_coro)
+        else:
+            generated_content = await body_coro
         
-        return {
+        result = {
             "title": title,
             "body": generated_content
         }
+        
+        # The first request in a namespace is embedded only once generated,
+        # to seed the index for later requests
+        if namespace is not None and embedding is None:
+            embedding = await self._embed(semantic_text)
+        await _content_cache.set(key, result, namespace=namespace, embedding=embedding)
+        
+        return dict(result)
+
+    def stream_content(self, content_type: str, topic: str, keywords: List[str] = None, tone: str = "professional", length: str = "medium", target_audience: str = None, additional_instructions: str = None, company_id: str = None) -> AsyncIterator[Dict[str, str]]:
+        """
+        Generate content for marketing or communication, yielding the body as it is generated.
+        
+        The request is validated before anything is streamed.
+        
+        Args:
+            content_type: Type of content to generate (blog, social, email)
+            topic: Topic for the content
+            keywords: Keywords to include
+            tone: Tone of the content
+            length: Length of the content
+            target_audience: Target audience for the content
+            additional_instructions: Additional instructions for generation
+            company_id: ID of the company
+            
+        Returns:
+            Iterator of dictionaries with a body "delta", followed by a final dictionary with the "title"
+            
+        Raises:
+            ValueError: If the topic is empty
+        """
+        self._validate_topic(topic)
+        
+        return self._stream_content_events(content_type, topic, keywords, tone, length, target_audience, additional_instructions)
+
+    async def _stream_content_events(self, content_type: str, topic: str, keywords: Optional[List[str]], tone: str, length: str, target_audience: Optional[str], additional_instructions: Optional[str]) -> AsyncIterator[Dict[str, str]]:
+        """
+        Stream generated content events.
+        
+        Args:
+            content_type: Type of content to generate (blog, social, email)
+            topic: Topic for the content
+            keywords: Keywords to include
+            tone: Tone of the content
+            length: Length of the content
+            target_audience: Target audience for the content
+            additional_instructions: Additional instructions for generation
+            
+        Yields:
+            Dictionaries with a body "delta", followed by a final dictionary with the "title"
+        """
+        prompt = self._build_content_prompt(content_type, topic, keywords, tone, length, target_audience, additional_instructions)
+        
+        # For blog posts, generate the title while the body is streaming
+        title_task = None
+        if content_type == "blog":
+            title_prompt = _COMPILED_TITLE_TEMPLATE({"topic": topic})
+            title_task = asyncio.ensure_future(
+                self._call_openai_api(title_prompt, temperature=0.8, intent="title")
+            )
+        
+        try:
+            async for delta in self._stream_openai_api(prompt, max_tokens=self._content_max_tokens(content_type, length), intent=content_type):
+                yield {"delta": delta}
+            
+            title = await title_task if title_task else topic
+        finally:
+            if title_task and not title_task.done():
+                title_task.cancel()
+        
+        yield {"title": title}
+
 
+@functools.lru_cache(maxsize=1)
+def get_ai_service() -> AIService:
+    """Get the shared AI service, created on first use."""
+    return AIService()
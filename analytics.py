@@ -4,25 +4,117 @@ API router for analytics.
 This module provides the API endpoints for retrieving analytics and metrics.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, BackgroundTasks, status
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+from pydantic import BaseModel
+import orjson
 
 from models.analytics import (
     AnalyticsFilter, DashboardMetrics, LeadMetrics,
     ReviewMetrics, ReferralMetrics, ContentMetrics
 )
-from services.analytics.analytics_service import AnalyticsService
+from services.analytics.analytics_service import get_analytics_service, TimeSeries, METRICS_CACHE_TTL_SECONDS
 from core.security import get_current_user, get_current_company
 
 router = APIRouter()
-analytics_service = AnalyticsService()
+analytics_service = get_analytics_service()
 
 
-@router.get("/dashboard", response_model=Dict[str, Any])
-async def get_dashboard_metrics(
+async def close_analytics_service() -> None:
+    """Write the tracked metrics still queued."""
+    await analytics_service.close()
+
+
+# Flush tracked metrics when the application shuts down
+router.add_event_handler("shutdown", close_analytics_service)
+
+# Metrics are cached per day range, so clients may reuse them for as long
+METRICS_CACHE_CONTROL = f"private, max-age={METRICS_CACHE_TTL_SECONDS}"
+
+# Date range used when the client does not provide a start date
+DEFAULT_METRICS_WINDOW = timedelta(days=30)
+
+
+def _encode_metrics_value(value: Any) -> Any:
+    """
+    Encode values orjson does not support natively.
+    
+    Args:
+        value: Value to encode
+        
+    Returns:
+        JSON-serializable value
+        
+    Raises:
+        TypeError: If the value cannot be encoded
+    """
+    if isinstance(value, TimeSeries):
+        return value.to_records()
+    
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class MetricsResponse(ORJSONResponse):
+    """
+    JSON response for metrics, serialized entirely by orjson.
+    
+    Datetimes and NumPy values are encoded natively rather than being
+    converted in Python first, and daily series are expanded straight
+    from their columns.
+    """
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_encode_metrics_value,
+            option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+
+
+class MetricsWindow(BaseModel):
+    """Date range for a metrics request."""
+    start_date: datetime
+    end_date: datetime
+
+
+class LeadEvent(BaseModel):
+    """Lead event tracked as part of a batch."""
+    lead_id: str
+    status: str
+    source: Optional[str] = None
+
+
+def get_metrics_window(
     start_date: Optional[datetime] = Query(None, description="Start date for metrics"),
-    end_date: Optional[datetime] = Query(None, description="End date for metrics"),
+    end_date: Optional[datetime] = Query(None, description="End date for metrics")
+) -> MetricsWindow:
+    """
+    Get the date range for a metrics request, filling in omitted bounds.
+    
+    An omitted end date is floored to the current hour, so requests within
+    the same hour resolve to the same range.
+    
+    Args:
+        start_date: Start date for metrics
+        end_date: End date for metrics
+        
+    Returns:
+        Date range for the request
+    """
+    if not end_date:
+        end_date = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    
+    if not start_date:
+        start_date = end_date - DEFAULT_METRICS_WINDOW
+    
+    return MetricsWindow(start_date=start_date, end_date=end_date)
+
+
+@router.get("/dashboard", response_model=Dict[str, Any], response_class=MetricsResponse)
+async def get_dashboard_metrics(
+    window: MetricsWindow = Depends(get_metrics_window),
     current_user: Dict[str, Any] = Depends(get_current_user),
     current_company: Dict[str, Any] = Depends(get_current_company)
 ):
@@ -32,23 +124,15 @@ async def get_dashboard_metrics(
     This endpoint retrieves metrics for the dashboard, including summary metrics,
     charts, and value summary.
     """
-    # Set default date range if not provided
-    if not end_date:
-        end_date = datetime.utcnow()
-    
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
     # Get dashboard metrics
-    metrics = analytics_service.get_dashboard_metrics(current_company["id"], start_date, end_date)
+    metrics = await run_in_threadpool(analytics_service.get_dashboard_metrics, current_company["id"], window.start_date, window.end_date)
     
-    return metrics
+    return MetricsResponse(metrics, headers={"Cache-Control": METRICS_CACHE_CONTROL})
 
 
-@router.get("/leads", response_model=Dict[str, Any])
+@router.get("/leads", response_model=Dict[str, Any], response_class=MetricsResponse)
 async def get_lead_metrics(
-    start_date: Optional[datetime] = Query(None, description="Start date for metrics"),
-    end_date: Optional[datetime] = Query(None, description="End date for metrics"),
+    window: MetricsWindow = Depends(get_metrics_window),
     source: Optional[str] = Query(None, description="Filter by lead source"),
     current_user: Dict[str, Any] = Depends(get_current_user),
     current_company: Dict[str, Any] = Depends(get_current_company)
@@ -59,23 +143,15 @@ async def get_lead_metrics(
     This endpoint retrieves metrics related to leads, including conversion rates,
     sources, and response times.
     """
-    # Set default date range if not provided
-    if not end_date:
-        end_date = datetime.utcnow()
-    
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
     # Get lead metrics
-    metrics = analytics_service.get_lead_metrics(current_company["id"], start_date, end_date, source)
+    metrics = await run_in_threadpool(analytics_service.get_lead_metrics, current_company["id"], window.start_date, window.end_date, source)
     
-    return metrics
+    return MetricsResponse(metrics, headers={"Cache-Control": METRICS_CACHE_CONTROL})
 
 
-@router.get("/reviews", response_model=Dict[str, Any])
+@router.get("/reviews", response_model=Dict[str, Any], response_class=MetricsResponse)
 async def get_review_metrics(
-    start_date: Optional[datetime] = Query(None, description="Start date for metrics"),
-    end_date: Optional[datetime] = Query(None, description="End date for metrics"),
+    window: MetricsWindow = Depends(get_metrics_window),
     platform: Optional[str] = Query(None, description="Filter by review platform"),
     current_user: Dict[str, Any] = Depends(get_current_user),
     current_company: Dict[str, Any] = Depends(get_current_company)
@@ -86,23 +162,15 @@ async def get_review_metrics(
     This endpoint retrieves metrics related to reviews, including completion rates,
     platforms, and rating distribution.
     """
-    # Set default date range if not provided
-    if not end_date:
-        end_date = datetime.utcnow()
-    
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
     # Get review metrics
-    metrics = analytics_service.get_review_metrics(current_company["id"], start_date, end_date, platform)
+    metrics = await run_in_threadpool(analytics_service.get_review_metrics, current_company["id"], window.start_date, window.end_date, platform)
     
-    return metrics
+    return MetricsResponse(metrics, headers={"Cache-Control": METRICS_CACHE_CONTROL})
 
 
-@router.get("/referrals", response_model=Dict[str, Any])
+@router.get("/referrals", response_model=Dict[str, Any], response_class=MetricsResponse)
 async def get_referral_metrics(
-    start_date: Optional[datetime] = Query(None, description="Start date for metrics"),
-    end_date: Optional[datetime] = Query(None, description="End date for metrics"),
+    window: MetricsWindow = Depends(get_metrics_window),
     current_user: Dict[str, Any] = Depends(get_current_user),
     current_company: Dict[str, Any] = Depends(get_current_company)
 ):
@@ -112,23 +180,15 @@ async def get_referral_metrics(
     This endpoint retrieves metrics related to referrals, including usage rates,
     conversion rates, and top referrers.
     """
-    # Set default date range if not provided
-    if not end_date:
-        end_date = datetime.utcnow()
-    
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
     # Get referral metrics
-    metrics = analytics_service.get_referral_metrics(current_company["id"], start_date, end_date)
+    metrics = await run_in_threadpool(analytics_service.get_referral_metrics, current_company["id"], window.start_date, window.end_date)
     
-    return metrics
+    return MetricsResponse(metrics, headers={"Cache-Control": METRICS_CACHE_CONTROL})
 
 
-@router.get("/content", response_model=Dict[str, Any])
+@router.get("/content", response_model=Dict[str, Any], response_class=MetricsResponse)
 async def get_content_metrics(
-    start_date: Optional[datetime] = Query(None, description="Start date for metrics"),
-    end_date: Optional[datetime] = Query(None, description="End date for metrics"),
+    window: MetricsWindow = Depends(get_metrics_window),
     content_type: Optional[str] = Query(None, description="Filter by content type"),
     current_user: Dict[str, Any] = Depends(get_current_user),
     current_company: Dict[str, Any] = Depends(get_current_company)
@@ -139,20 +199,13 @@ async def get_content_metrics(
     This endpoint retrieves metrics related to content, including engagement rates,
     content types, and top performing content.
     """
-    # Set default date range if not provided
-    if not end_date:
-        end_date = datetime.utcnow()
-    
-    if not start_date:
-        start_date = end_date - timedelta(days=30)
-    
     # Get content metrics
-    metrics = analytics_service.get_content_metrics(current_company["id"], start_date, end_date, content_type)
+    metrics = await run_in_threadpool(analytics_service.get_content_metrics, current_company["id"], window.start_date, window.end_date, content_type)
     
-    return metrics
+    return MetricsResponse(metrics, headers={"Cache-Control": METRICS_CACHE_CONTROL})
 
 
-@router.get("/activity", response_model=List[Dict[str, Any]])
+@router.get("/activity", response_model=List[Dict[str, Any]], response_class=MetricsResponse)
 async def get_recent_activity(
     limit: int = Query(10, ge=1, le=100, description="Maximum number of activities to return"),
     current_user: Dict[str, Any] = Depends(get_current_user),
@@ -164,12 +217,12 @@ async def get_recent_activity(
     This endpoint retrieves recent activity for the company.
     """
     # Get recent activity
-    activities = analytics_service.get_recent_activity(current_company["id"], limit)
+    activities = await run_in_threadpool(analytics_service.get_recent_activity, current_company["id"], limit)
     
-    return activities
+    return MetricsResponse(activities)
 
 
-@router.post("/track/lead", response_model=Dict[str, Any])
+@router.post("/track/lead", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def track_lead_metric(
     lead_id: str = Query(..., description="ID of the lead"),
     status: str = Query(..., description="Lead status"),
@@ -183,12 +236,29 @@ async def track_lead_metric(
     This endpoint tracks a lead-related metric.
     """
     # Track metric
-    result = analytics_service.track_lead_metric(current_company["id"], lead_id, status, source)
+    result = await analytics_service.track_lead_metric(current_company["id"], lead_id, status, source)
     
     return result
 
 
-@router.post("/track/review", response_model=Dict[str, Any])
+@router.post("/track/leads", response_model=List[Dict[str, Any]], status_code=status.HTTP_202_ACCEPTED)
+async def track_lead_metrics(
+    events: List[LeadEvent] = Body(..., description="Lead events to track"),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    current_company: Dict[str, Any] = Depends(get_current_company)
+):
+    """
+    Track several lead metrics.
+    
+    This endpoint tracks a batch of lead-related metrics, such as a bulk import.
+    """
+    # Track metrics
+    results = await analytics_service.track_lead_metrics(current_company["id"], [event.model_dump() for event in events])
+    
+    return results
+
+
+@router.post("/track/review", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def track_review_metric(
     customer_id: str = Query(..., description="ID of the customer"),
     status: str = Query(..., description="Review status"),
@@ -203,12 +273,12 @@ async def track_review_metric(
     This endpoint tracks a review-related metric.
     """
     # Track metric
-    result = analytics_service.track_review_metric(current_company["id"], customer_id, status, platform, rating)
+    result = await analytics_service.track_review_metric(current_company["id"], customer_id, status, platform, rating)
     
     return result
 
 
-@router.post("/track/referral", response_model=Dict[str, Any])
+@router.post("/track/referral", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def track_referral_metric(
     referral_id: str = Query(..., description="ID of the referral"),
     status: str = Query(..., description="Referral status"),
@@ -223,12 +293,12 @@ async def track_referral_metric(
     This endpoint tracks a referral-related metric.
     """
     # Track metric
-    result = analytics_service.track_referral_metric(current_company["id"], referral_id, status, customer_id, referred_lead_id)
+    result = await analytics_service.track_referral_metric(current_company["id"], referral_id, status, customer_id, referred_lead_id)
     
     return result
 
 
-@router.post("/track/content", response_model=Dict[str, Any])
+@router.post("/track/content", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def track_content_metric(
     content_id: str = Query(..., description="ID of the content"),
     status: str = Query(..., description="Content status"),
@@ -243,13 +313,14 @@ async def track_content_metric(
     This endpoint tracks a content-related metric.
     """
     # Track metric
-    result = analytics_service.track_content_metric(current_company["id"], content_id, status, content_type, platform)
+    result = await analytics_service.track_content_metric(current_company["id"], content_id, status, content_type, platform)
     
     return result
 
 
-@router.post("/track/content/engagement", response_model=Dict[str, Any])
+@router.post("/track/content/engagement", response_model=Dict[str, Any], status_code=status.HTTP_202_ACCEPTED)
 async def track_content_engagement(
+    background_tasks: BackgroundTasks,
     content_id: str = Query(..., description="ID of the content"),
     engagement_type: str = Query(..., description="Type of engagement (view, click, share, comment, like)"),
     value: int = Query(1, ge=1, description="Engagement value"),
@@ -261,10 +332,14 @@ async def track_content_engagement(
     """
     Track content engagement.
     
-    This endpoint tracks content engagement metrics.
+    This endpoint tracks content engagement metrics. Engagement is tracked
+    after the response is sent.
     """
     # Track engagement
-    result = analytics_service.track_content_engagement(current_company["id"], content_id, engagement_type, value, platform, metadata)
+    background_tasks.add_task(
+        analytics_service.track_content_engagement,
+        current_company["id"], content_id, engagement_type, value, platform, metadata
+    )
     
-    return result
+    return {"accepted": True}
 
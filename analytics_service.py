@@ -4,24 +4,449 @@ Analytics Service for Business Automation System.
 This module provides the service layer for tracking and reporting metrics.
 """
 
-import uuid
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+import os
+import time
+import asyncio
+import logging
+import heapq
+import functools
+import itertools
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Callable, Tuple, Iterator
+
+import numpy as np
 
 from models.analytics import (
     AnalyticsFilter, DashboardMetrics, LeadMetrics,
     ReviewMetrics, ReferralMetrics, ContentMetrics
 )
 
+logger = logging.getLogger(__name__)
+
+# Maximum number of tracked metrics written in a single batch
+FLUSH_BATCH_SIZE = 500
+
+# Maximum time in seconds a tracked metric waits before its batch is written
+FLUSH_INTERVAL_SECONDS = 0.5
+
+# Number of times a batch of tracked metrics is written before it is dropped
+FLUSH_WRITE_ATTEMPTS = 3
+
+# Time in seconds computed metrics are served from the cache
+METRICS_CACHE_TTL_SECONDS = 60
+
+# Maximum number of cached metric results kept per service instance
+METRICS_CACHE_MAX_ENTRIES = 1024
+
+# Number of metric IDs drawn from the system random source at a time
+METRIC_ID_BLOCK_SIZE = 256
+
+# Maximum number of recent activity items kept per company
+RECENT_ACTIVITY_MAX_ENTRIES = 1000
+
+
+def _day_start(value: datetime) -> datetime:
+    """Floor a datetime to the start of its day."""
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _iso_now() -> str:
+    """Get the current UTC time as an ISO string."""
+    return datetime.fromtimestamp(time.time(), tz=timezone.utc).isoformat()
+
+
+def _batch_uuid4(count: int) -> List[str]:
+    """
+    Generate random version 4 UUID strings in bulk.
+    
+    Draws the random bytes for the whole batch at once and formats them
+    directly, without building a UUID object per ID.
+    
+    Args:
+        count: Number of UUIDs to generate
+        
+    Returns:
+        List of UUIDs in canonical hyphenated form
+    """
+    buffer = bytearray(os.urandom(16 * count))
+    
+    # Set the version and variant bits of every UUID
+    buffer[6::16] = bytes(byte & 0x0F | 0x40 for byte in buffer[6::16])
+    buffer[8::16] = bytes(byte & 0x3F | 0x80 for byte in buffer[8::16])
+    
+    hex_digits = buffer.hex()
+    return [
+        f"{hex_digits[i:i + 8]}-{hex_digits[i + 8:i + 12]}-{hex_digits[i + 12:i + 16]}-{hex_digits[i + 16:i + 20]}-{hex_digits[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+def _metric_id_stream() -> Iterator[str]:
+    """Yield metric IDs, generated METRIC_ID_BLOCK_SIZE at a time."""
+    while True:
+        yield from _batch_uuid4(METRIC_ID_BLOCK_SIZE)
+
+
+@functools.lru_cache(maxsize=512)
+def _iso_date_range(start_ordinal: int, days: int) -> Tuple[str, ...]:
+    """
+    Get ISO timestamps for consecutive days.
+    
+    Cached, since dashboards request the same few ranges over and over.
+    
+    Args:
+        start_ordinal: Proleptic Gregorian ordinal of the first day
+        days: Number of days in the range
+        
+    Returns:
+        Tuple of ISO strings at midnight of each day
+    """
+    dates = np.datetime64(date.fromordinal(start_ordinal), "D") + np.arange(days).astype("timedelta64[D]")
+    return tuple(dates.astype("datetime64[s]").astype(str).tolist())
+
+
+# Mock breakdowns by lead source as (source, share of total, conversion rate)
+LEAD_SOURCE_SHARES = (
+    ("website", 0.4, 12.5),
+    ("facebook-ad", 0.3, 8.2),
+    ("referral", 0.2, 15.0),
+    ("other", 0.1, 5.0)
+)
+
+# (platform, share of requested, share of completed, completion rate, average rating)
+REVIEW_PLATFORM_SHARES = (
+    ("google", 0.5, 0.6, 60.0, 4.8),
+    ("yelp", 0.3, 0.25, 40.0, 4.5),
+    ("facebook", 0.2, 0.15, 35.0, 4.6)
+)
+
+# Mock share of completed reviews per rating, from 5 stars down to 1
+RATING_LABELS = ("5_star", "4_star", "3_star", "2_star", "1_star")
+RATING_SHARES = (0.7, 0.2, 0.07, 0.02, 0.01)
+
+# (content type, share of created and published, share of views, click-through rate)
+CONTENT_TYPE_SHARES = (
+    ("blog", 0.4, 0.5, 12.0),
+    ("social", 0.4, 0.3, 18.0),
+    ("email", 0.2, 0.2, 22.0)
+)
+
+# Mock recent activity as (age, type, data), newest first
+MOCK_ACTIVITY = (
+    (timedelta(hours=2), "lead_created", {"lead_id": "lead123", "source": "website"}),
+    (timedelta(hours=5), "review_completed", {"customer_id": "customer456", "platform": "google", "rating": 5}),
+    (timedelta(hours=8), "content_published", {"content_id": "content789", "platform": "wordpress", "type": "blog"}),
+    (timedelta(hours=12), "referral_used", {"referral_id": "ref101", "customer_id": "customer202", "lead_id": "lead303"}),
+    (timedelta(hours=24), "lead_converted", {"lead_id": "lead404", "source": "facebook-ad"}),
+    (timedelta(hours=28), "content_created", {"content_id": "content505", "type": "social"}),
+    (timedelta(hours=36), "review_requested", {"customer_id": "customer606", "platform": "yelp"})
+)
+
+# Column names of the daily series, in the order the kernels return them
+LEAD_SERIES_COLUMNS = ("new", "contacted", "converted")
+REVIEW_SERIES_COLUMNS = ("requested", "completed")
+REFERRAL_SERIES_COLUMNS = ("created", "used", "converted")
+CONTENT_SERIES_COLUMNS = ("created", "published", "views")
+
+
+@dataclass
+class TimeSeries:
+    """
+    Daily metric series stored as parallel columns, one array per metric.
+    
+    Metrics getters return series in this form; they are expanded to one
+    object per day only when the response is serialized. Days are kept as
+    a start ordinal and are formatted as ISO strings only at that point.
+    """
+    start_ordinal: int
+    days: int
+    columns: Dict[str, np.ndarray]
+
+    @functools.cached_property
+    def totals(self) -> Tuple[int, ...]:
+        """
+        Sum every column in one reduction.
+        
+        Computed once per series, so getters sharing a cached series do not
+        sum its columns again.
+        
+        Returns:
+            Column totals, in column order
+        """
+        if not self.columns:
+            return ()
+        return tuple(np.stack(tuple(self.columns.values())).sum(axis=1).tolist())
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Convert the series to one dictionary per day for the response.
+        
+        Returns:
+            List of dictionaries with the date and each column's value
+        """
+        keys = ("date", *self.columns)
+        dates = _iso_date_range(self.start_ordinal, self.days)
+        values = [column.tolist() for column in self.columns.values()]
+        return [dict(zip(keys, row)) for row in zip(dates, *values)]
+
+
+# Mock series kernels, one vectorized NumPy expression per column
+
+def _lead_series(days: int):
+    """Generate mock daily new, contacted and converted lead counts."""
+    day_index = np.arange(days, dtype=np.int64)
+    return 5 + day_index % 3, 3 + day_index % 2, 1 + day_index % 2
+
+
+def _review_series(days: int):
+    """Generate mock daily requested and completed review counts."""
+    day_index = np.arange(days, dtype=np.int64)
+    return 3 + day_index % 2, 1 + day_index % 2
+
+
+def _referral_series(days: int):
+    """Generate mock daily created, used and converted referral counts."""
+    day_index = np.arange(days, dtype=np.int64)
+    used = (day_index % 3 == 0).astype(np.int64)
+    converted = (day_index % 6 == 0).astype(np.int64)
+    return 1 + day_index % 2, used, converted
+
+
+def _content_series(days: int):
+    """Generate mock daily created, published and viewed content counts."""
+    day_index = np.arange(days, dtype=np.int64)
+    published = (day_index % 3 == 0).astype(np.int64)
+    return 1 + day_index % 2, published, 10 + day_index * 5
+
+
+@functools.lru_cache(maxsize=256)
+def _mock_time_series(kernel: Callable, columns: Tuple[str, ...], start_ordinal: int, days: int) -> TimeSeries:
+    """
+    Generate a mock daily series, shared by every getter that charts it.
+    
+    The arrays are made read-only, since cached series are shared between
+    requests.
+    
+    Args:
+        kernel: Series kernel returning one array per column
+        columns: Column names, in the order the kernel returns them
+        start_ordinal: Proleptic Gregorian ordinal of the first day
+        days: Number of days in the series
+        
+    Returns:
+        Daily series for the range
+    """
+    arrays = kernel(days)
+    for array in arrays:
+        array.flags.writeable = False
+    return TimeSeries(start_ordinal, days, dict(zip(columns, arrays)))
+
+
+def _copy_metrics(value: Any) -> Any:
+    """
+    Copy the dicts and lists of a cached metrics result.
+    
+    Time series are read-only, so they are shared rather than copied.
+    
+    Args:
+        value: Cached metrics result, or a value nested in one
+        
+    Returns:
+        Copy the caller may modify without changing the cached result
+    """
+    if isinstance(value, dict):
+        return {k: _copy_metrics(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_metrics(v) for v in value]
+    return value
+
+
+def cached_metrics(method: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """
+    Cache a metrics getter for METRICS_CACHE_TTL_SECONDS.
+    
+    The date range is floored to day boundaries, so requests for the same
+    days share one computed result. Getters run in worker threads, so
+    concurrent requests for the same key wait for a single computation; the
+    key's lock is dropped once the result is cached. Results are keyed on the
+    company's metrics generation, so writing tracked metrics for a company
+    invalidates its cached results. Callers get a copy of the cached result.
+    """
+    @functools.wraps(method)
+    def wrapper(self, company_id: str, start_date: datetime, end_date: datetime, *args, **kwargs) -> Dict[str, Any]:
+        start_date = _day_start(start_date)
+        end_date = _day_start(end_date)
+        generation = self._metrics_generation.get(company_id, 0)
+        key = (method.__name__, company_id, generation, start_date, end_date, args, tuple(sorted(kwargs.items())))
+        
+        cached = self._metrics_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return _copy_metrics(cached[1])
+        
+        with self._metrics_locks.setdefault(key, threading.Lock()):
+            try:
+                now = time.monotonic()
+                cached = self._metrics_cache.get(key)
+                if cached and cached[0] > now:
+                    return _copy_metrics(cached[1])
+                
+                if len(self._metrics_cache) >= METRICS_CACHE_MAX_ENTRIES:
+                    self._metrics_cache = {k: v for k, v in self._metrics_cache.items() if v[0] > now}
+                    if len(self._metrics_cache) >= METRICS_CACHE_MAX_ENTRIES:
+                        self._metrics_cache = {}
+                
+                metrics = method(self, company_id, start_date, end_date, *args, **kwargs)
+                self._metrics_cache[key] = (now + METRICS_CACHE_TTL_SECONDS, metrics)
+            finally:
+                # Threads already waiting on the lock find the cached result
+                self._metrics_locks.pop(key, None)
+        
+        return _copy_metrics(metrics)
+    
+    return wrapper
+
 
 class AnalyticsService:
     """Service for tracking and reporting metrics."""
 
+    __slots__ = (
+        "_metric_queue", "_flush_task", "_metrics_cache", "_metrics_locks",
+        "_metrics_generation", "_recent_activity", "_activity_sequence", "_metric_ids"
+    )
+
     def __init__(self):
         """Initialize the analytics service."""
-        pass
+        # Created on first use, since services are instantiated at import time
+        # before an event loop is running
+        self._metric_queue: Optional[asyncio.Queue] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        
+        # Computed metrics keyed by getter, company, date range and filters,
+        # with a lock for each key whose result is being computed
+        self._metrics_cache: Dict[tuple, tuple] = {}
+        self._metrics_locks: Dict[tuple, threading.Lock] = {}
+        
+        # Bumped when tracked metrics for a company are written, so stale
+        # cached results for the company are no longer looked up
+        self._metrics_generation: Dict[str, int] = {}
+        
+        # Bounded min-heaps of (time, sequence, activity) per company, so the
+        # oldest item is evicted first and the newest are read without sorting
+        self._recent_activity: Dict[str, List[tuple]] = {}
+        self._activity_sequence = itertools.count()
+        
+        # Metric IDs for single tracked events, drawn from random bytes in blocks
+        self._metric_ids = _metric_id_stream()
 
-    def track_lead_metric(self, company_id: str, lead_id: str, status: str, source: str = None) -> Dict[str, Any]:
+    def _record_activity(self, company_id: str, activity_type: str, timestamp: str, data: Dict[str, Any]) -> None:
+        """
+        Add a tracked event to the company's recent activity.
+        
+        Args:
+            company_id: ID of the company
+            activity_type: Type of activity
+            timestamp: ISO timestamp of the activity
+            data: Activity details
+        """
+        heap = self._recent_activity.setdefault(company_id, [])
+        item = (time.time(), next(self._activity_sequence), {
+            "type": activity_type,
+            "timestamp": timestamp,
+            "data": data
+        })
+        
+        if len(heap) < RECENT_ACTIVITY_MAX_ENTRIES:
+            heapq.heappush(heap, item)
+        else:
+            heapq.heappushpop(heap, item)
+
+    async def _enqueue_metric(self, metric: Dict[str, Any]) -> None:
+        """
+        Queue a tracked metric to be written with the next batch.
+        
+        Args:
+            metric: Tracked metric record
+        """
+        if self._metric_queue is None:
+            self._metric_queue = asyncio.Queue()
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
+        self._metric_queue.put_nowait(metric)
+
+    async def _flush_loop(self) -> None:
+        """Write queued metrics in batches of up to FLUSH_BATCH_SIZE or every FLUSH_INTERVAL_SECONDS."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._metric_queue.get()]
+            deadline = loop.time() + FLUSH_INTERVAL_SECONDS
+            
+            # The batch is written even when the loop is cancelled while
+            # collecting it, so no dequeued metric is lost at shutdown
+            try:
+                while len(batch) < FLUSH_BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._metric_queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            finally:
+                self._flush(batch)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Write a batch of tracked metrics, retrying up to FLUSH_WRITE_ATTEMPTS times.
+        
+        Args:
+            batch: Tracked metric records
+        """
+        for attempt in range(1, FLUSH_WRITE_ATTEMPTS + 1):
+            try:
+                self._write_metrics(batch)
+                break
+            except Exception as e:
+                logger.warning(f"Error writing {len(batch)} tracked metrics (attempt {attempt} of {FLUSH_WRITE_ATTEMPTS}): {e}")
+        else:
+            logger.error(f"Dropped {len(batch)} tracked metrics after {FLUSH_WRITE_ATTEMPTS} failed writes")
+            return
+        
+        for company_id in {metric["company_id"] for metric in batch}:
+            self._metrics_generation[company_id] = self._metrics_generation.get(company_id, 0) + 1
+
+    def _write_metrics(self, metrics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Write a batch of tracked metrics.
+        
+        Args:
+            metrics: Tracked metric records
+            
+        Returns:
+            List of dictionaries with the tracking result for each metric
+        """
+        # In a real implementation, this would save the batch to the database
+        # with a single multi-row insert
+        # For now, we'll just return a mock result for each metric
+        return [dict(metric) for metric in metrics]
+
+    async def close(self) -> None:
+        """Stop the flush loop and write the metrics still queued."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        
+        if self._metric_queue is not None:
+            while not self._metric_queue.empty():
+                count = min(self._metric_queue.qsize(), FLUSH_BATCH_SIZE)
+                self._flush([self._metric_queue.get_nowait() for _ in range(count)])
+
+    async def track_lead_metric(self, company_id: str, lead_id: str, status: str, source: str = None) -> Dict[str, Any]:
         """
         Track a lead metric.
         
@@ -32,21 +457,62 @@ class AnalyticsService:
             source: Lead source
             
         Returns:
-            Dictionary with tracking result
+            Dictionary with the tracked metric, queued to be written
         """
-        # In a real implementation, this would save to the database
-        # For now, we'll just return a mock result
-        return {
+        metric = {
             "success": True,
-            "metric_id": str(uuid.uuid4()),
+            "metric_id": next(self._metric_ids),
             "company_id": company_id,
             "lead_id": lead_id,
             "status": status,
             "source": source,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
+        
+        # Written to the database in batches by the flush loop
+        await self._enqueue_metric(metric)
+        self._record_activity(company_id, f"lead_{status}", metric["timestamp"], {"lead_id": lead_id, "source": source})
+        
+        return metric
+
+    async def track_lead_metrics(self, company_id: str, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Track several lead metrics at once.
+        
+        All metrics in the batch share one timestamp and their IDs are drawn
+        from a single random read, so bulk imports pay for the clock read,
+        formatting and system call once rather than per event.
+        
+        Args:
+            company_id: ID of the company
+            events: Lead events, each with lead_id, status and optional source
+            
+        Returns:
+            List of tracked metrics, queued to be written
+        """
+        timestamp = _iso_now()
+        metric_ids = _batch_uuid4(len(events))
+        
+        metrics = []
+        for event, metric_id in zip(events, metric_ids):
+            metric = {
+                "success": True,
+                "metric_id": metric_id,
+                "company_id": company_id,
+                "lead_id": event["lead_id"],
+                "status": event["status"],
+                "source": event.get("source"),
+                "timestamp": timestamp
+            }
+            
+            # Written to the database in batches by the flush loop
+            await self._enqueue_metric(metric)
+            self._record_activity(company_id, f"lead_{metric['status']}", timestamp, {"lead_id": metric["lead_id"], "source": metric["source"]})
+            metrics.append(metric)
+        
+        return metrics
 
-    def track_review_metric(self, company_id: str, customer_id: str, status: str, platform: str = None, rating: int = None) -> Dict[str, Any]:
+    async def track_review_metric(self, company_id: str, customer_id: str, status: str, platform: str = None, rating: int = None) -> Dict[str, Any]:
         """
         Track a review metric.
         
@@ -58,22 +524,26 @@ class AnalyticsService:
             rating: Review rating
             
         Returns:
-            Dictionary with tracking result
+            Dictionary with the tracked metric, queued to be written
         """
-        # In a real implementation, this would save to the database
-        # For now, we'll just return a mock result
-        return {
+        metric = {
             "success": True,
-            "metric_id": str(uuid.uuid4()),
+            "metric_id": next(self._metric_ids),
             "company_id": company_id,
             "customer_id": customer_id,
             "status": status,
             "platform": platform,
             "rating": rating,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
+        
+        # Written to the database in batches by the flush loop
+        await self._enqueue_metric(metric)
+        self._record_activity(company_id, f"review_{status}", metric["timestamp"], {"customer_id": customer_id, "platform": platform, "rating": rating})
+        
+        return metric
 
-    def track_referral_metric(self, company_id: str, referral_id: str, status: str, customer_id: str = None, referred_lead_id: str = None) -> Dict[str, Any]:
+    async def track_referral_metric(self, company_id: str, referral_id: str, status: str, customer_id: str = None, referred_lead_id: str = None) -> Dict[str, Any]:
         """
         Track a referral metric.
         
@@ -85,22 +555,26 @@ class AnalyticsService:
             referred_lead_id: ID of the lead who used the referral
             
         Returns:
-            Dictionary with tracking result
+            Dictionary with the tracked metric, queued to be written
         """
-        # In a real implementation, this would save to the database
-        # For now, we'll just return a mock result
-        return {
+        metric = {
             "success": True,
-            "metric_id": str(uuid.uuid4()),
+            "metric_id": next(self._metric_ids),
             "company_id": company_id,
             "referral_id": referral_id,
             "status": status,
             "customer_id": customer_id,
             "referred_lead_id": referred_lead_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
+        
+        # Written to the database in batches by the flush loop
+        await self._enqueue_metric(metric)
+        self._record_activity(company_id, f"referral_{status}", metric["timestamp"], {"referral_id": referral_id, "customer_id": customer_id, "lead_id": referred_lead_id})
+        
+        return metric
 
-    def track_content_metric(self, company_id: str, content_id: str, status: str, content_type: str = None, platform: str = None) -> Dict[str, Any]:
+    async def track_content_metric(self, company_id: str, content_id: str, status: str, content_type: str = None, platform: str = None) -> Dict[str, Any]:
         """
         Track a content metric.
         
@@ -112,22 +586,26 @@ class AnalyticsService:
             platform: Publishing platform
             
         Returns:
-            Dictionary with tracking result
+            Dictionary with the tracked metric, queued to be written
         """
-        # In a real implementation, this would save to the database
-        # For now, we'll just return a mock result
-        return {
+        metric = {
             "success": True,
-            "metric_id": str(uuid.uuid4()),
+            "metric_id": next(self._metric_ids),
             "company_id": company_id,
             "content_id": content_id,
             "status": status,
             "content_type": content_type,
             "platform": platform,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
+        
+        # Written to the database in batches by the flush loop
+        await self._enqueue_metric(metric)
+        self._record_activity(company_id, f"content_{status}", metric["timestamp"], {"content_id": content_id, "platform": platform, "type": content_type})
+        
+        return metric
 
-    def track_content_engagement(self, company_id: str, content_id: str, engagement_type: str, value: int = 1, platform: str = None, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def track_content_engagement(self, company_id: str, content_id: str, engagement_type: str, value: int = 1, platform: str = None, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Track content engagement.
         
@@ -140,22 +618,59 @@ class AnalyticsService:
             metadata: Additional metadata
             
         Returns:
-            Dictionary with tracking result
+            Dictionary with the tracked metric, queued to be written
         """
-        # In a real implementation, this would save to the database
-        # For now, we'll just return a mock result
-        return {
+        metric = {
             "success": True,
-            "metric_id": str(uuid.uuid4()),
+            "metric_id": next(self._metric_ids),
             "company_id": company_id,
             "content_id": content_id,
             "engagement_type": engagement_type,
             "value": value,
             "platform": platform,
             "metadata": metadata or {},
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
+        
+        # Written to the database in batches by the flush loop
+        await self._enqueue_metric(metric)
+        
+        return metric
 
+    def _series_over_time(self, kernel: Callable, columns: Tuple[str, ...], start_date: datetime, end_date: datetime) -> TimeSeries:
+        """
+        Get a mock daily series for a date range.
+        
+        Args:
+            kernel: Series kernel returning one array per column
+            columns: Column names, in the order the kernel returns them
+            start_date: Start date for metrics
+            end_date: End date for metrics
+            
+        Returns:
+            Daily series for the range
+        """
+        # In a real implementation, this would aggregate the tracked metrics per day
+        days = max((end_date - start_date).days + 1, 0)
+        return _mock_time_series(kernel, columns, start_date.toordinal(), days)
+
+    def _leads_over_time(self, start_date: datetime, end_date: datetime) -> TimeSeries:
+        """Get daily lead metrics for a date range."""
+        return self._series_over_time(_lead_series, LEAD_SERIES_COLUMNS, start_date, end_date)
+
+    def _reviews_over_time(self, start_date: datetime, end_date: datetime) -> TimeSeries:
+        """Get daily review metrics for a date range."""
+        return self._series_over_time(_review_series, REVIEW_SERIES_COLUMNS, start_date, end_date)
+
+    def _referrals_over_time(self, start_date: datetime, end_date: datetime) -> TimeSeries:
+        """Get daily referral metrics for a date range."""
+        return self._series_over_time(_referral_series, REFERRAL_SERIES_COLUMNS, start_date, end_date)
+
+    def _content_over_time(self, start_date: datetime, end_date: datetime) -> TimeSeries:
+        """Get daily content metrics for a date range."""
+        return self._series_over_time(_content_series, CONTENT_SERIES_COLUMNS, start_date, end_date)
+
+    @cached_metrics
     def get_dashboard_metrics(self, company_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """
         Get metrics for the dashboard.
@@ -171,49 +686,24 @@ class AnalyticsService:
         # In a real implementation, this would query the database
         # For now, we'll just return mock metrics
         
-        # Generate dates for charts
-        days = (end_date - start_date).days + 1
-        dates = [start_date + timedelta(days=i) for i in range(days)]
-        date_strings = [date.strftime("%Y-%m-%d") for date in dates]
-        
         # Generate mock lead metrics over time
-        leads_over_time = []
-        for i, date in enumerate(dates):
-            leads_over_time.append({
-                "date": date.isoformat(),
-                "new": 5 + (i % 3),
-                "contacted": 3 + (i % 2),
-                "converted": 1 + (i % 2)
-            })
+        leads = self._leads_over_time(start_date, end_date)
         
         # Generate mock review metrics over time
-        reviews_over_time = []
-        for i, date in enumerate(dates):
-            reviews_over_time.append({
-                "date": date.isoformat(),
-                "requested": 3 + (i % 2),
-                "completed": 1 + (i % 2)
-            })
+        reviews = self._reviews_over_time(start_date, end_date)
         
         # Generate mock content metrics over time
-        content_over_time = []
-        for i, date in enumerate(dates):
-            content_over_time.append({
-                "date": date.isoformat(),
-                "created": 1 + (i % 2),
-                "published": 1 if i % 3 == 0 else 0,
-                "views": 10 + (i * 5)
-            })
+        content = self._content_over_time(start_date, end_date)
         
         # Calculate summary metrics
-        total_leads = sum(day["new"] for day in leads_over_time)
-        converted_leads = sum(day["converted"] for day in leads_over_time)
+        total_leads, contacted_leads, converted_leads = leads.totals
         conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
         
-        total_reviews_requested = sum(day["requested"] for day in reviews_over_time)
-        total_reviews_completed = sum(day["completed"] for day in reviews_over_time)
+        total_reviews_requested, total_reviews_completed = reviews.totals
         completion_rate = (total_reviews_completed / total_reviews_requested * 100) if total_reviews_requested > 0 else 0
         
+        total_content_created, total_content_published, total_views = content.totals
+        
         # Calculate value summary
         avg_lead_value = 250  # Average value of a converted lead
         estimated_revenue = converted_leads * avg_lead_value
@@ -221,7 +711,7 @@ class AnalyticsService:
         hours_saved = (
             total_leads * 0.5 +  # 30 minutes per lead
             total_reviews_requested * 0.25 +  # 15 minutes per review request
-            sum(day["created"] for day in content_over_time) * 2  # 2 hours per content piece
+            total_content_created * 2  # 2 hours per content piece
         )
         
         hourly_rate = 50  # Hourly rate for labor
@@ -239,7 +729,7 @@ class AnalyticsService:
             "summary": {
                 "leads": {
                     "total": total_leads,
-                    "contacted": sum(day["contacted"] for day in leads_over_time),
+                    "contacted": contacted_leads,
                     "converted": converted_leads,
                     "conversion_rate": conversion_rate
                 },
@@ -256,19 +746,19 @@ class AnalyticsService:
                     "usage_rate": 30.0
                 },
                 "content": {
-                    "created": sum(day["created"] for day in content_over_time),
-                    "published": sum(day["published"] for day in content_over_time),
+                    "created": total_content_created,
+                    "published": total_content_published,
                     "engagement": {
-                        "views": sum(day["views"] for day in content_over_time),
-                        "clicks": int(sum(day["views"] for day in content_over_time) * 0.15),
+                        "views": total_views,
+                        "clicks": int(total_views * 0.15),
                         "ctr": 15.0
                     }
                 }
             },
             "charts": {
-                "leads_over_time": leads_over_time,
-                "reviews_over_time": reviews_over_time,
-                "content_over_time": content_over_time
+                "leads_over_time": leads,
+                "reviews_over_time": reviews,
+                "content_over_time": content
             },
             "value_summary": {
                 "estimated_revenue": estimated_revenue,
@@ -276,47 +766,12 @@ class AnalyticsService:
                 "labor_savings": labor_savings,
                 "roi_percent": roi_percent
             },
-            "recent_activity": [
-                {
-                    "type": "lead_created",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                    "data": {
-                        "lead_id": "lead123",
-                        "source": "website"
-                    }
-                },
-                {
-                    "type": "review_completed",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
-                    "data": {
-                        "customer_id": "customer456",
-                        "platform": "google",
-                        "rating": 5
-                    }
-                },
-                {
-                    "type": "content_published",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=8)).isoformat(),
-                    "data": {
-                        "content_id": "content789",
-                        "platform": "wordpress",
-                        "type": "blog"
-                    }
-                },
-                {
-                    "type": "referral_used",
-                    "timestamp": (datetime.utcnow() - timedelta(hours=12)).isoformat(),
-                    "data": {
-                        "referral_id": "ref101",
-                        "customer_id": "customer202",
-                        "lead_id": "lead303"
-                    }
-                }
-            ]
+            "recent_activity": self.get_recent_activity(company_id, 4)
         }
         
         return dashboard_metrics
 
+    @cached_metrics
     def get_lead_metrics(self, company_id: str, start_date: datetime, end_date: datetime, source: str = None) -> Dict[str, Any]:
         """
         Get lead-related metrics.
@@ -333,52 +788,26 @@ class AnalyticsService:
         # In a real implementation, this would query the database
         # For now, we'll just return mock metrics
         
-        # Generate dates for charts
-        days = (end_date - start_date).days + 1
-        dates = [start_date + timedelta(days=i) for i in range(days)]
-        
         # Generate mock lead metrics over time
-        leads_over_time = []
-        for i, date in enumerate(dates):
-            leads_over_time.append({
-                "date": date.isoformat(),
-                "new": 5 + (i % 3),
-                "contacted": 3 + (i % 2),
-                "converted": 1 + (i % 2)
-            })
+        leads = self._leads_over_time(start_date, end_date)
         
         # Calculate summary metrics
-        total_leads = sum(day["new"] for day in leads_over_time)
-        converted_leads = sum(day["converted"] for day in leads_over_time)
+        total_leads, contacted_leads, converted_leads = leads.totals
         conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
         
         # Construct lead metrics
         lead_metrics = {
             "summary": {
                 "total": total_leads,
-                "contacted": sum(day["contacted"] for day in leads_over_time),
+                "contacted": contacted_leads,
                 "converted": converted_leads,
                 "conversion_rate": conversion_rate
             },
             "by_source": {
-                "website": {
-                    "total": int(total_leads * 0.4),
-                    "conversion_rate": 12.5
-                },
-                "facebook-ad": {
-                    "total": int(total_leads * 0.3),
-                    "conversion_rate": 8.2
-                },
-                "referral": {
-                    "total": int(total_leads * 0.2),
-                    "conversion_rate": 15.0
-                },
-                "other": {
-                    "total": int(total_leads * 0.1),
-                    "conversion_rate": 5.0
-                }
+                name: {"total": int(total_leads * share), "conversion_rate": conversion_rate}
+                for name, share, conversion_rate in LEAD_SOURCE_SHARES
             },
-            "over_time": leads_over_time,
+            "over_time": leads,
             "response_times": {
                 "average_minutes": 45,
                 "median_minutes": 30,
@@ -388,6 +817,7 @@ class AnalyticsService:
         
         return lead_metrics
 
+    @cached_metrics
     def get_review_metrics(self, company_id: str, start_date: datetime, end_date: datetime, platform: str = None) -> Dict[str, Any]:
         """
         Get review-related metrics.
@@ -404,22 +834,11 @@ class AnalyticsService:
         # In a real implementation, this would query the database
         # For now, we'll just return mock metrics
         
-        # Generate dates for charts
-        days = (end_date - start_date).days + 1
-        dates = [start_date + timedelta(days=i) for i in range(days)]
-        
         # Generate mock review metrics over time
-        reviews_over_time = []
-        for i, date in enumerate(dates):
-            reviews_over_time.append({
-                "date": date.isoformat(),
-                "requested": 3 + (i % 2),
-                "completed": 1 + (i % 2)
-            })
+        reviews = self._reviews_over_time(start_date, end_date)
         
         # Calculate summary metrics
-        total_reviews_requested = sum(day["requested"] for day in reviews_over_time)
-        total_reviews_completed = sum(day["completed"] for day in reviews_over_time)
+        total_reviews_requested, total_reviews_completed = reviews.totals
         completion_rate = (total_reviews_completed / total_reviews_requested * 100) if total_reviews_requested > 0 else 0
         
         # Construct review metrics
@@ -431,37 +850,24 @@ class AnalyticsService:
                 "average_rating": 4.7
             },
             "by_platform": {
-                "google": {
-                    "requested": int(total_reviews_requested * 0.5),
-                    "completed": int(total_reviews_completed * 0.6),
-                    "completion_rate": 60.0,
-                    "average_rating": 4.8
-                },
-                "yelp": {
-                    "requested": int(total_reviews_requested * 0.3),
-                    "completed": int(total_reviews_completed * 0.25),
-                    "completion_rate": 40.0,
-                    "average_rating": 4.5
-                },
-                "facebook": {
-                    "requested": int(total_reviews_requested * 0.2),
-                    "completed": int(total_reviews_completed * 0.15),
-                    "completion_rate": 35.0,
-                    "average_rating": 4.6
+                name: {
+                    "requested": int(total_reviews_requested * requested_share),
+                    "completed": int(total_reviews_completed * completed_share),
+                    "completion_rate": completion_rate,
+                    "average_rating": average_rating
                 }
+                for name, requested_share, completed_share, completion_rate, average_rating in REVIEW_PLATFORM_SHARES
             },
-            "over_time": reviews_over_time,
+            "over_time": reviews,
             "rating_distribution": {
-                "5_star": int(total_reviews_completed * 0.7),
-                "4_star": int(total_reviews_completed * 0.2),
-                "3_star": int(total_reviews_completed * 0.07),
-                "2_star": int(total_reviews_completed * 0.02),
-                "1_star": int(total_reviews_completed * 0.01)
+                rating: int(total_reviews_completed * share)
+                for rating, share in zip(RATING_LABELS, RATING_SHARES)
             }
         }
         
         return review_metrics
 
+    @cached_metrics
     def get_referral_metrics(self, company_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """
         Get referral-related metrics.
@@ -477,24 +883,11 @@ class AnalyticsService:
         # In a real implementation, this would query the database
         # For now, we'll just return mock metrics
         
-        # Generate dates for charts
-        days = (end_date - start_date).days + 1
-        dates = [start_date + timedelta(days=i) for i in range(days)]
-        
         # Generate mock referral metrics over time
-        referrals_over_time = []
-        for i, date in enumerate(dates):
-            referrals_over_time.append({
-                "date": date.isoformat(),
-                "created": 1 + (i % 2),
-                "used": (i % 3) == 0 and 1 or 0,
-                "converted": (i % 6) == 0 and 1 or 0
-            })
+        referrals = self._referrals_over_time(start_date, end_date)
         
         # Calculate summary metrics
-        total_referrals_created = sum(day["created"] for day in referrals_over_time)
-        total_referrals_used = sum(day["used"] for day in referrals_over_time)
-        total_referrals_converted = sum(day["converted"] for day in referrals_over_time)
+        total_referrals_created, total_referrals_used, total_referrals_converted = referrals.totals
         
         usage_rate = (total_referrals_used / total_referrals_created * 100) if total_referrals_created > 0 else 0
         conversion_rate = (total_referrals_converted / total_referrals_used * 100) if total_referrals_used > 0 else 0
@@ -508,7 +901,7 @@ class AnalyticsService:
                 "usage_rate": usage_rate,
                 "conversion_rate": conversion_rate
             },
-            "over_time": referrals_over_time,
+            "over_time": referrals,
             "top_referrers": [
                 {
                     "customer_id": "customer123",
@@ -537,6 +930,7 @@ class AnalyticsService:
         
         return referral_metrics
 
+    @cached_metrics
     def get_content_metrics(self, company_id: str, start_date: datetime, end_date: datetime, content_type: str = None) -> Dict[str, Any]:
         """
         Get content-related metrics.
@@ -553,24 +947,11 @@ class AnalyticsService:
         # In a real implementation, this would query the database
         # For now, we'll just return mock metrics
         
-        # Generate dates for charts
-        days = (end_date - start_date).days + 1
-        dates = [start_date + timedelta(days=i) for i in range(days)]
-        
         # Generate mock content metrics over time
-        content_over_time = []
-        for i, date in enumerate(dates):
-            content_over_time.append({
-                "date": date.isoformat(),
-                "created": 1 + (i % 2),
-                "published": 1 if i % 3 == 0 else 0,
-                "views": 10 + (i * 5)
-            })
+        content = self._content_over_time(start_date, end_date)
         
         # Calculate summary metrics
-        total_content_created = sum(day["created"] for day in content_over_time)
-        total_content_published = sum(day["published"] for day in content_over_time)
-        total_views = sum(day["views"] for day in content_over_time)
+        total_content_created, total_content_published, total_views = content.totals
         
         # Construct content metrics
         content_metrics = {
@@ -582,26 +963,15 @@ class AnalyticsService:
                 "ctr": 15.0
             },
             "by_type": {
-                "blog": {
-                    "created": int(total_content_created * 0.4),
-                    "published": int(total_content_published * 0.4),
-                    "views": int(total_views * 0.5),
-                    "ctr": 12.0
-                },
-                "social": {
-                    "created": int(total_content_created * 0.4),
-                    "published": int(total_content_published * 0.4),
-                    "views": int(total_views * 0.3),
-                    "ctr": 18.0
-                },
-                "email": {
-                    "created": int(total_content_created * 0.2),
-                    "published": int(total_content_published * 0.2),
-                    "views": int(total_views * 0.2),
-                    "ctr": 22.0
+                name: {
+                    "created": int(total_content_created * created_share),
+                    "published": int(total_content_published * created_share),
+                    "views": int(total_views * views_share),
+                    "ctr": ctr
                 }
+                for name, created_share, views_share, ctr in CONTENT_TYPE_SHARES
             },
-            "over_time": content_over_time,
+            "over_time": content,
             "top_performing": [
                 {
                     "content_id": "content123",
@@ -643,70 +1013,24 @@ class AnalyticsService:
         Returns:
             List of recent activity items
         """
+        # Newest tracked activity first
+        heap = self._recent_activity.get(company_id)
+        if heap:
+            return [activity for _, _, activity in heapq.nlargest(limit, list(heap))]
+        
         # In a real implementation, this would query the database
-        # For now, we'll just return mock activities
-        activities = [
-            {
-                "type": "lead_created",
-                "timestamp": (datetime.utcnow() - timedelta(hours=2)).isoformat(),
-                "data": {
-                    "lead_id": "lead123",
-                    "source": "website"
-                }
-            },
-            {
-                "type": "review_completed",
-                "timestamp": (datetime.utcnow() - timedelta(hours=5)).isoformat(),
-                "data": {
-                    "customer_id": "customer456",
-                    "platform": "google",
-                    "rating": 5
-                }
-            },
-            {
-                "type": "content_published",
-                "timestamp": (datetime.utcnow() - timedelta(hours=8)).isoformat(),
-                "data": {
-                    "content_id": "content789",
-                    "platform": "wordpress",
-                    "type": "blog"
-                }
-            },
-            {
-                "type": "referral_used",
-                "timestamp": (datetime.utcnow() - timedelta(hours=12)).isoformat(),
-                "data": {
-                    "referral_id": "ref101",
-                    "customer_id": "customer202",
-                    "lead_id": "lead303"
-                }
-            },
-            {
-                "type": "lead_converted",
-                "timestamp": (datetime.utcnow() - timedelta(hours=24)).isoformat(),
-                "data": {
-                    "lead_id": "lead404",
-                    "source": "facebook-ad"
-                }
-            },
-            {
-                "type": "content_created",
-                "timestamp": (datetime.utcnow() - timedelta(hours=28)).isoformat(),
-                "data": {
-                    "content_id": "content505",
-                    "type": "social"
-                }
-            },
-            {
-                "type": "review_requested",
-                "timestamp": (datetime.utcnow() - timedelta(hours=36)).isoformat(),
-                "data": {
-                    "customer_id": "customer606",
-                    "platform": "yelp"
-                }
-            }
-        ]
+        # For now, we'll just return mock activities, with UTC ISO timestamps
+        # like tracked activity
+        now = datetime.now(timezone.utc)
         
         # Return limited number of activities
-        return activities[:limit]
+        return [
+            {"type": activity_type, "timestamp": (now - age).isoformat(), "data": dict(data)}
+            for age, activity_type, data in MOCK_ACTIVITY[:limit]
+        ]
+
 
+@functools.lru_cache(maxsize=1)
+def get_analytics_service() -> AnalyticsService:
+    """Get the shared analytics service, created on first use."""
+    return AnalyticsService()
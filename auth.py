@@ -6,6 +6,7 @@ This module provides the API endpoints for user authentication and authorization
 
 from fastapi import APIRouter, Depends, HTTPException, Body, status
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from typing import Dict, Any, Optional
 
 from models.user import User, UserCreate, UserUpdate, Token
@@ -28,7 +29,8 @@ async def register_user(user_in: UserCreate = Body(...)):
     # and save the new user to the database
     
     # Mock implementation for development
-    hashed_password = get_password_hash(user_in.password)
+    # Hash in a worker thread, since bcrypt would block the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, user_in.password)
     
     user = User(
         id="user123",
@@ -50,7 +52,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     
     This endpoint authenticates a user and returns an access token.
     """
-    user = authenticate_user(form_data.username, form_data.password)
+    # Verify in a worker thread, since bcrypt would block the event loop
+    user = await run_in_threadpool(authenticate_user, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -118,13 +121,13 @@ async def change_password(
     # and update the password in the database
     
     # Mock implementation for development
-    if not authenticate_user(current_user.email, old_password):
+    if not await run_in_threadpool(authenticate_user, current_user.email, old_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect password"
         )
     
-    hashed_password = get_password_hash(new_password)
+    hashed_password = await run_in_threadpool(get_password_hash, new_password)
     
     return {
         "message": "Password changed successfully"
@@ -11,10 +11,13 @@ import sys
 import argparse
 import logging
 import subprocess
-import json
+import asyncio
+import base64
 import datetime
+import orjson
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
+from google.cloud import firestore_admin_v1
 from pathlib import Path
 
 # Configure logging
@@ -28,11 +31,123 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).parent
 BACKUP_DIR = BASE_DIR / 'backups'
 
+# Number of Firestore collections streamed in parallel
+FIREBASE_BACKUP_WORKERS = 16
+
+# Number of documents fetched per Firestore query page
+FIREBASE_BACKUP_PAGE_SIZE = 1000
+
+# Maximum number of documents waiting to be written, bounding memory use
+FIREBASE_BACKUP_QUEUE_SIZE = 10000
+
+# Cloud Storage prefix (gs://bucket/path) for server-side Firestore exports;
+# when unset, collections are streamed to a local file instead
+FIREBASE_EXPORT_URI = os.getenv('FIREBASE_EXPORT_URI')
+
+# Maximum time to wait for a server-side Firestore export
+FIREBASE_EXPORT_TIMEOUT_SECONDS = 6 * 60 * 60
+
+# pg_dump compression method and level (zstd requires pg_dump 16 or later)
+POSTGRES_BACKUP_COMPRESSION = os.getenv('POSTGRES_BACKUP_COMPRESSION', 'zstd:3')
+
 def ensure_backup_dir():
     """Ensure backup directory exists."""
     BACKUP_DIR.mkdir(exist_ok=True)
     logger.info(f"Using backup directory: {BACKUP_DIR}")
 
+def encode_firestore_value(value):
+    """Encode Firestore values that orjson does not support natively."""
+    if isinstance(value, datetime.datetime):
+        # Firestore returns a datetime subclass with nanosecond precision
+        return value.isoformat()
+    if isinstance(value, (firestore.DocumentReference, firestore.AsyncDocumentReference)):
+        return value.path
+    if isinstance(value, firestore.GeoPoint):
+        return {"latitude": value.latitude, "longitude": value.longitude}
+    if isinstance(value, bytes):
+        # Firestore blob fields
+        return base64.b64encode(value).decode('ascii')
+    # Fail loudly rather than writing a lossy str() of an unknown type
+    raise TypeError(f"Cannot back up value of type {type(value).__name__}")
+
+async def stream_collection(collection, records, streams):
+    """Stream the documents of a Firestore collection into the write queue."""
+    collection_name = collection.id
+    count = 0
+    
+    try:
+        async with streams:
+            # Read in pages ordered by document ID, so no single query runs long
+            # enough to hit the stream deadline on large collections
+            query = collection.order_by('__name__').limit(FIREBASE_BACKUP_PAGE_SIZE)
+            last_doc = None
+            
+            while True:
+                page = query.start_after(last_doc) if last_doc else query
+                page_count = 0
+                
+                async for doc in page.stream():
+                    doc_data = doc.to_dict()
+                    doc_data['id'] = doc.id
+                    await records.put({"collection": collection_name, "doc": doc_data})
+                    last_doc = doc
+                    page_count += 1
+                
+                count += page_count
+                if page_count < FIREBASE_BACKUP_PAGE_SIZE:
+                    break
+    finally:
+        # Signal the writer that this collection is done
+        await records.put(None)
+    
+    logger.info(f"Backed up {count} documents from collection {collection_name}")
+    return count
+
+async def dump_firebase_collections(backup_file):
+    """Stream all Firestore collections into an NDJSON backup file."""
+    db = firestore_async.client()
+    collections = [collection async for collection in db.collections()]
+    
+    # Stream collections concurrently, multiplexed over the client's single
+    # gRPC channel, and write one document per line as they arrive, so the
+    # database is never held in memory
+    records = asyncio.Queue(maxsize=FIREBASE_BACKUP_QUEUE_SIZE)
+    streams = asyncio.Semaphore(FIREBASE_BACKUP_WORKERS)
+    tasks = [asyncio.create_task(stream_collection(collection, records, streams)) for collection in collections]
+    
+    with open(backup_file, 'wb', buffering=1 << 20) as f:
+        remaining = len(tasks)
+        while remaining:
+            record = await records.get()
+            if record is None:
+                remaining -= 1
+                continue
+            f.write(orjson.dumps(
+                record,
+                default=encode_firestore_value,
+                option=orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE
+            ))
+    
+    # Raise any error from the collection streams
+    await asyncio.gather(*tasks)
+
+def export_firebase_managed(timestamp):
+    """Export Firestore to Cloud Storage with the managed export service."""
+    app = firebase_admin.get_app()
+    output_uri_prefix = f"{FIREBASE_EXPORT_URI.rstrip('/')}/firebase_backup_{timestamp}"
+    
+    # Firestore runs the export server-side, including subcollections
+    client = firestore_admin_v1.FirestoreAdminClient(credentials=app.credential.get_credential())
+    operation = client.export_documents(request={
+        "name": f"projects/{app.project_id}/databases/(default)",
+        "output_uri_prefix": output_uri_prefix
+    })
+    logger.info(f"Started Firestore export {operation.operation.name} to {output_uri_prefix}")
+    
+    # Poll the long-running operation until the export finishes
+    response = operation.result(timeout=FIREBASE_EXPORT_TIMEOUT_SECONDS)
+    return response.output_uri_prefix
+
 def backup_firebase():
     """Backup Firebase database."""
     logger.info("Backing up Firebase database")
@@ -64,33 +179,16 @@ def backup_firebase():
             
             firebase_admin.initialize_app(cred)
         
-        db = firestore.client()
-        
-        # Get all collections
-        collections = db.collections()
-        
         # Create timestamp for backup filename
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_file = BACKUP_DIR / f"firebase_backup_{timestamp}.json"
         
-        # Backup data
-        backup_data = {}
-        for collection in collections:
-            collection_name = collection.id
-            backup_data[collection_name] = []
-            
-            # Get all documents in collection
-            docs = collection.stream()
-            for doc in docs:
-                doc_data = doc.to_dict()
-                doc_data['id'] = doc.id
-                backup_data[collection_name].append(doc_data)
-            
-            logger.info(f"Backed up {len(backup_data[collection_name])} documents from collection {collection_name}")
+        if FIREBASE_EXPORT_URI:
+            backup_uri = export_firebase_managed(timestamp)
+            logger.info(f"Firebase backup completed successfully: {backup_uri}")
+            return backup_uri
         
-        # Write backup to file
-        with open(backup_file, 'w') as f:
-            json.dump(backup_data, f, default=str, indent=2)
+        backup_file = BACKUP_DIR / f"firebase_backup_{timestamp}.ndjson"
+        asyncio.run(dump_firebase_collections(backup_file))
         
         logger.info(f"Firebase backup completed successfully: {backup_file}")
         return str(backup_file)
@@ -114,15 +212,15 @@ def backup_postgresql():
         sys.exit(1)
     
     try:
-        # Create timestamp for backup filename
+        # Create timestamp for backup directory name
         timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_file = BACKUP_DIR / f"postgresql_backup_{timestamp}.sql"
+        backup_file = BACKUP_DIR / f"postgresql_backup_{timestamp}"
         
         # Set PGPASSWORD environment variable for pg_dump
         env = os.environ.copy()
         env['PGPASSWORD'] = pg_password
         
-        # Run pg_dump
+        # Run pg_dump, dumping tables in parallel over one connection per job
         cmd = [
             'pg_dump',
             '-h', pg_host,
@@ -130,12 +228,25 @@ def backup_postgresql():
             '-U', pg_user,
             '-d', pg_db,
             '-f', str(backup_file),
-            '--format=p',  # plain text format
+            '--format=d',  # directory format, required for parallel dumps
+            '--jobs', str(os.cpu_count() or 1),
+            '--compress', POSTGRES_BACKUP_COMPRESSION,
             '--no-owner',
-            '--no-acl'
+            '--no-acl',
+            '--verbose'
         ]
         
-        subprocess.run(cmd, env=env, check=True)
+        # Skip the data of large tables that can be re-derived, e.g. "analytics,workflow_runs"
+        for table in filter(None, os.getenv('POSTGRES_BACKUP_EXCLUDE_TABLE_DATA', '').split(',')):
+            cmd.extend(['--exclude-table-data', table.strip()])
+        
+        # Log progress as pg_dump reports it
+        process = subprocess.Popen(cmd, env=env, stderr=subprocess.PIPE, text=True)
+        for line in process.stderr:
+            logger.info(line.rstrip())
+        
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd)
         
         logger.info(f"PostgreSQL backup completed successfully: {backup_file}")
         return str(backup_file)
@@ -6,7 +6,7 @@ This module provides the data models for companies.
 
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, EmailStr, HttpUrl, Field
+from pydantic import BaseModel, EmailStr, HttpUrl, Field, ConfigDict
 
 
 class CompanyBase(BaseModel):
@@ -43,9 +43,7 @@ class CompanyInDBBase(CompanyBase):
     subscription_expires_at: Optional[datetime] = None
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class Company(CompanyInDBBase):
@@ -4,9 +4,12 @@ Configuration settings for the Business Automation System.
 This module provides configuration settings for the application.
 """
 
-import os
-from typing import Dict, Any, List, Optional
-from pydantic import BaseSettings, PostgresDsn, validator
+import re
+import functools
+from typing import Any, List, Optional, Pattern
+from urllib.parse import quote
+from pydantic import Field, ValidationInfo, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -17,90 +20,117 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "Business Automation System"
     
     # Security settings
-    SECRET_KEY: str = os.environ.get("SECRET_KEY", "mock_secret_key_for_development")
+    SECRET_KEY: str = "mock_secret_key_for_development"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Worker threads for blocking calls made from async routes (run_in_threadpool)
+    FASTAPI_THREAD_LIMIT: int = 128
+    
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
+    BACKEND_CORS_ORIGINS_RE: Optional[Pattern] = Field(None, validate_default=True)
+    
+    @field_validator("BACKEND_CORS_ORIGINS_RE", mode="before")
+    @classmethod
+    def compile_cors_origins(cls, v: Optional[str], info: ValidationInfo) -> Any:
+        """Compile the allowed CORS origins into one anchored regex."""
+        if v:
+            return re.compile(v) if isinstance(v, str) else v
+        
+        origins = info.data.get("BACKEND_CORS_ORIGINS") or []
+        if not origins or "*" in origins:
+            # Wildcard origins need no matching
+            return None
+        
+        # One match per request instead of a scan of the origin list
+        return re.compile("^(?:" + "|".join(re.escape(origin) for origin in origins) + ")$")
     
     # Database settings
-    DATABASE_TYPE: str = os.environ.get("DATABASE_TYPE", "postgres")  # postgres or firebase
+    DATABASE_TYPE: str = "postgres"  # postgres or firebase
     
     # PostgreSQL settings
-    POSTGRES_SERVER: str = os.environ.get("POSTGRES_SERVER", "localhost")
-    POSTGRES_USER: str = os.environ.get("POSTGRES_USER", "postgres")
-    POSTGRES_PASSWORD: str = os.environ.get("POSTGRES_PASSWORD", "postgres")
-    POSTGRES_DB: str = os.environ.get("POSTGRES_DB", "business_automation")
-    SQLALCHEMY_DATABASE_URI: Optional[PostgresDsn] = None
-    
-    @validator("SQLALCHEMY_DATABASE_URI", pre=True)
-    def assemble_db_connection(cls, v: Optional[str], values: Dict[str, Any]) -> Any:
+    POSTGRES_SERVER: str = "localhost"
+    POSTGRES_USER: str = "postgres"
+    POSTGRES_PASSWORD: str = "postgres"
+    POSTGRES_DB: str = "business_automation"
+    SQLALCHEMY_DATABASE_URI: Optional[str] = Field(None, validate_default=True)
+    
+    # PostgreSQL connection pool settings
+    POSTGRES_POOL_MIN_SIZE: int = 10
+    POSTGRES_POOL_MAX_SIZE: int = 50
+    POSTGRES_POOL_MAX_QUERIES: int = 50000  # queries before a connection is replaced
+    POSTGRES_POOL_MAX_INACTIVE_LIFETIME: float = 300.0  # seconds before an idle connection is closed
+    POSTGRES_COMMAND_TIMEOUT: float = 60.0
+    
+    @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
+    @classmethod
+    def assemble_db_connection(cls, v: Optional[str], info: ValidationInfo) -> Any:
         """Assemble database connection string."""
         if isinstance(v, str):
             return v
         
+        values = info.data
         if values.get("DATABASE_TYPE") == "postgres":
-            return PostgresDsn.build(
-                scheme="postgresql",
-                user=values.get("POSTGRES_USER"),
-                password=values.get("POSTGRES_PASSWORD"),
-                host=values.get("POSTGRES_SERVER"),
-                path=f"/{values.get('POSTGRES_DB') or ''}",
-            )
+            # Formatted once as a plain string rather than parsed as a URL
+            user = quote(values.get("POSTGRES_USER") or "", safe="")
+            password = quote(values.get("POSTGRES_PASSWORD") or "", safe="")
+            return f"postgresql://{user}:{password}@{values.get('POSTGRES_SERVER')}/{values.get('POSTGRES_DB') or ''}"
         
         return None
     
     # Firebase settings
-    FIREBASE_PROJECT_ID: str = os.environ.get("FIREBASE_PROJECT_ID", "")
-    FIREBASE_PRIVATE_KEY: str = os.environ.get("FIREBASE_PRIVATE_KEY", "")
-    FIREBASE_CLIENT_EMAIL: str = os.environ.get("FIREBASE_CLIENT_EMAIL", "")
+    FIREBASE_PROJECT_ID: str = ""
+    FIREBASE_PRIVATE_KEY: str = ""
+    FIREBASE_CLIENT_EMAIL: str = ""
     
     # Email settings
-    EMAIL_PROVIDER: str = os.environ.get("EMAIL_PROVIDER", "sendgrid")  # sendgrid or smtp
+    EMAIL_PROVIDER: str = "sendgrid"  # sendgrid or smtp
     
     # SendGrid settings
-    SENDGRID_API_KEY: str = os.environ.get("SENDGRID_API_KEY", "")
-    SENDGRID_FROM_EMAIL: str = os.environ.get("SENDGRID_FROM_EMAIL", "noreply@example.com")
+    SENDGRID_API_KEY: str = ""
+    SENDGRID_FROM_EMAIL: str = "noreply@example.com"
     
     # SMTP settings
-    SMTP_HOST: str = os.environ.get("SMTP_HOST", "smtp.gmail.com")
-    SMTP_PORT: int = int(os.environ.get("SMTP_PORT", "587"))
-    SMTP_USERNAME: str = os.environ.get("SMTP_USERNAME", "")
-    SMTP_PASSWORD: str = os.environ.get("SMTP_PASSWORD", "")
-    SMTP_USE_TLS: bool = os.environ.get("SMTP_USE_TLS", "true").lower() == "true"
-    SMTP_FROM_EMAIL: str = os.environ.get("SMTP_FROM_EMAIL", "noreply@example.com")
+    SMTP_HOST: str = "smtp.gmail.com"
+    SMTP_PORT: int = 587
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = True
+    SMTP_FROM_EMAIL: str = "noreply@example.com"
     
     # SMS settings
-    SMS_PROVIDER: str = os.environ.get("SMS_PROVIDER", "twilio")
+    SMS_PROVIDER: str = "twilio"
     
     # Twilio settings
-    TWILIO_ACCOUNT_SID: str = os.environ.get("TWILIO_ACCOUNT_SID", "")
-    TWILIO_AUTH_TOKEN: str = os.environ.get("TWILIO_AUTH_TOKEN", "")
-    TWILIO_FROM_NUMBER: str = os.environ.get("TWILIO_FROM_NUMBER", "")
+    TWILIO_ACCOUNT_SID: str = ""
+    TWILIO_AUTH_TOKEN: str = ""
+    TWILIO_FROM_NUMBER: str = ""
     
     # OpenAI settings
-    OPENAI_API_KEY: str = os.environ.get("OPENAI_API_KEY", "")
-    OPENAI_MODEL: str = os.environ.get("OPENAI_MODEL", "gpt-4")
+    OPENAI_API_KEY: str = ""
+    OPENAI_MODEL: str = "gpt-4"
+    OPENAI_SMALL_MODEL: str = "gpt-4o-mini"
+    OPENAI_LARGE_MODEL: str = "gpt-4o"
     
     # Celery settings
-    CELERY_BROKER_URL: str = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
-    CELERY_RESULT_BACKEND: str = os.environ.get("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
+    CELERY_BROKER_URL: str = "redis://localhost:6379/0"
+    CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
-    class Config:
-        """Pydantic config."""
-        case_sensitive = True
-        env_file = ".env"
+    model_config = SettingsConfigDict(case_sensitive=True, env_file=".env", frozen=True)
 
 
 # Create settings instance
 settings = Settings()
 
 
+@functools.lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get application settings.
     
+    Cached, so it can be used as a dependency without revalidating settings.
+    
     Returns:
         Application settings
     """
@@ -5,29 +5,62 @@ This module provides the API endpoints for managing content generation and publi
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, status
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from pydantic import BaseModel
+import functools
 
 from models.content import (
     Content, ContentCreate, ContentUpdate, ContentFilter,
     ContentGenerateRequest, ContentPublishRequest
 )
-from services.content_service import ContentService
-from services.ai.ai_service import AIService
+from services.content_service import ContentService, close_http_client
+from services.ai.ai_service import AIService, get_ai_service
 from services.scheduler.scheduler_service import SchedulerService
 from core.security import get_current_user, get_current_company
+from core.streaming import event_stream_response
 
-router = APIRouter()
-content_service = ContentService()
-ai_service = AIService()
-scheduler_service = SchedulerService()
+# Responses are encoded with orjson, which is much faster on large content lists
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+class ContentPage(BaseModel):
+    """Page of content with the cursor for the next page."""
+    items: List[Content]
+    next_cursor: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1)
+def get_content_service() -> ContentService:
+    """Get the shared content service, created on first use."""
+    return ContentService()
+
+
+@functools.lru_cache(maxsize=1)
+def get_scheduler_service() -> SchedulerService:
+    """Get the shared scheduler service, created on first use."""
+    return SchedulerService()
+
+
+async def close_ai_service() -> None:
+    """Release pooled OpenAI connections, if the AI service was created."""
+    if get_ai_service.cache_info().currsize:
+        await get_ai_service().close()
+
+
+# Release pooled OpenAI and publishing connections when the application shuts down
+router.add_event_handler("shutdown", close_ai_service)
+router.add_event_handler("shutdown", close_http_client)
 
 
 @router.post("/", response_model=Content, status_code=status.HTTP_201_CREATED)
 async def create_content(
     content_in: ContentCreate = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Create new content.
@@ -38,33 +71,35 @@ async def create_content(
     content_in.company_id = current_company["id"]
     
     # Create content
-    content = content_service.create_content(content_in, current_user["id"])
+    content = await content_service.create_content(content_in, current_user["id"])
     
     return content
 
 
-@router.get("/", response_model=List[Content])
+@router.get("/", response_model=ContentPage)
 async def get_content_list(
-    status: Optional[str] = Query(None, description="Filter by content status"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by content status"),
     type: Optional[str] = Query(None, description="Filter by content type"),
     platform: Optional[str] = Query(None, description="Filter by publishing platform"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
     created_after: Optional[datetime] = Query(None, description="Filter by creation date (after)"),
     created_before: Optional[datetime] = Query(None, description="Filter by creation date (before)"),
     created_by: Optional[str] = Query(None, description="Filter by creator"),
-    skip: int = Query(0, ge=0, description="Number of content items to skip"),
+    cursor: Optional[str] = Query(None, description="Cursor returned with the previous page"),
     limit: int = Query(100, ge=1, le=100, description="Maximum number of content items to return"),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Get content with optional filtering.
     
-    This endpoint retrieves content with optional filtering criteria.
+    This endpoint retrieves content with optional filtering criteria, newest
+    first. Pass the returned next_cursor to get the following page.
     """
     # Create filter
     content_filter = ContentFilter(
-        status=status,
+        status=status_filter,
         type=type,
         platform=platform,
         tags=tags,
@@ -74,23 +109,30 @@ async def get_content_list(
     )
     
     # Get content
-    content_list = content_service.get_content_list(current_company["id"], content_filter, skip, limit)
+    try:
+        content_page = await content_service.get_content_list(current_company["id"], content_filter, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    return content_list
+    return content_page
 
 
 @router.get("/{content_id}", response_model=Content)
 async def get_content(
     content_id: str = Path(..., description="ID of the content"),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Get content by ID.
     
     This endpoint retrieves specific content by ID.
     """
-    content = content_service.get_content(current_company["id"], content_id)
+    content = await content_service.get_content(current_company["id"], content_id)
     
     if not content:
         raise HTTPException(
@@ -106,14 +148,15 @@ async def update_content(
     content_id: str = Path(..., description="ID of the content"),
     content_update: ContentUpdate = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Update content.
     
     This endpoint updates specific content by ID.
     """
-    content = content_service.update_content(current_company["id"], content_id, content_update)
+    content = await content_service.update_content(current_company["id"], content_id, content_update)
     
     if not content:
         raise HTTPException(
@@ -128,14 +171,15 @@ async def update_content(
 async def delete_content(
     content_id: str = Path(..., description="ID of the content"),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Delete content.
     
     This endpoint deletes specific content by ID.
     """
-    success = content_service.delete_content(current_company["id"], content_id)
+    success = await content_service.delete_content(current_company["id"], content_id)
     
     if not success:
         raise HTTPException(
@@ -150,7 +194,9 @@ async def delete_content(
 async def generate_content(
     request: ContentGenerateRequest = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service),
+    ai_service: AIService = Depends(get_ai_service)
 ):
     """
     Generate content using AI.
@@ -158,16 +204,22 @@ async def generate_content(
     This endpoint generates content using AI based on the provided parameters.
     """
     # Generate content
-    generated_content = ai_service.generate_content(
-        content_type=request.content_type,
-        topic=request.topic,
-        keywords=request.keywords,
-        tone=request.tone,
-        length=request.length,
-        target_audience=request.target_audience,
-        additional_instructions=request.additional_instructions,
-        company_id=current_company["id"]
-    )
+    try:
+        generated_content = await ai_service.generate_content(
+            content_type=request.content_type,
+            topic=request.topic,
+            keywords=request.keywords,
+            tone=request.tone,
+            length=request.length,
+            target_audience=request.target_audience,
+            additional_instructions=request.additional_instructions,
+            company_id=current_company["id"]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     
     # Create content in the system if save_to_library is true
     content = None
@@ -182,7 +234,7 @@ async def generate_content(
             platform=request.platform
         )
         
-        content = content_service.create_content(content_in, current_user["id"])
+        content = await content_service.create_content(content_in, current_user["id"])
     
     return {
         "success": True,
@@ -191,56 +243,72 @@ async def generate_content(
     }
 
 
+@router.post("/stream")
+async def stream_content(
+    request: ContentGenerateRequest = Body(...),
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    Generate content using AI, streaming it as server-sent events.
+    
+    This endpoint streams the generated body as "delta" events while it is
+    generated, followed by a final event carrying the title.
+    """
+    try:
+        events = ai_service.stream_content(
+            content_type=request.content_type,
+            topic=request.topic,
+            keywords=request.keywords,
+            tone=request.tone,
+            length=request.length,
+            target_audience=request.target_audience,
+            additional_instructions=request.additional_instructions,
+            company_id=current_company["id"]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    return event_stream_response(events)
+
+
 @router.post("/{content_id}/publish", response_model=Dict[str, Any])
 async def publish_content(
     content_id: str = Path(..., description="ID of the content"),
     request: ContentPublishRequest = Body(...),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    content_service: ContentService = Depends(get_content_service)
 ):
     """
     Publish content to a platform.
     
     This endpoint publishes content to a specified platform.
     """
-    # Get content
-    content = content_service.get_content(current_company["id"], content_id)
-    
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Content with ID {content_id} not found"
-        )
-    
-    # Publish content
-    result = content_service.publish_content(
+    # Publish content, which also marks it as published
+    result = await content_service.publish_content(
         company_id=current_company["id"],
         content_id=content_id,
         platform=request.platform,
         params=request.params
     )
     
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Content with ID {content_id} not found"
+        )
+    
     if not result["success"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=result.get("error", "Failed to publish content")
         )
     
-    # Update content status and platform
-    content_service.update_content(
-        company_id=current_company["id"],
-        content_id=content_id,
-        content_update=ContentUpdate(
-            status="published",
-            platform=request.platform,
-            url=result.get("url"),
-            published_at=datetime.utcnow(),
-            metadata={
-                "publish_result": result
-            }
-        )
-    )
-    
     return {
         "success": True,
         "content_id": content_id,
@@ -260,7 +328,8 @@ async def schedule_content_generation(
     hour: int = Query(9, ge=0, le=23, description="Hour of day for generation (24-hour format)"),
     minute: int = Query(0, ge=0, le=59, description="Minute of hour for generation"),
     current_user: Dict[str, Any] = Depends(get_current_user),
-    current_company: Dict[str, Any] = Depends(get_current_company)
+    current_company: Dict[str, Any] = Depends(get_current_company),
+    scheduler_service: SchedulerService = Depends(get_scheduler_service)
 ):
     """
     Schedule recurring content generation.
@@ -283,7 +352,9 @@ async def schedule_content_generation(
         schedule["day_of_month"] = day_of_month
     
     # Schedule content generation
-    result = scheduler_service.schedule_content_generation(
+    # The scheduler is synchronous, so run it in a worker thread
+    result = await run_in_threadpool(
+        scheduler_service.schedule_content_generation,
         company_id=current_company["id"],
         content_type=content_type,
         topic=topic,
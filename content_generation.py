@@ -4,34 +4,277 @@ Content Generation API Routes
 This module contains the API routes for the Content Generation Bot workflow.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, status
-from typing import Dict, Any, List, Optional
-from pydantic import BaseModel
+import os
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional, Callable
+from pydantic import BaseModel, ConfigDict
+import redis.asyncio as redis
 
 from core.security import get_current_user
+from core.streaming import event_stream_response
+from services.ai.ai_service import get_ai_service
 from workflows.content_generation.service import content_generation_service
 
 router = APIRouter(
     prefix="/api/workflows/content-generation",
     tags=["content-generation"],
     responses={404: {"description": "Not found"}},
+    # Responses are encoded with orjson rather than the standard library json
+    default_response_class=ORJSONResponse,
 )
 
-class BlogPostRequest(BaseModel):
+logger = logging.getLogger(__name__)
+
+# Number of jobs run concurrently, bounding parallel LLM and publishing calls
+GENERATION_WORKERS = 16
+
+# Maximum number of jobs waiting to run; requests beyond this are rejected
+GENERATION_QUEUE_SIZE = 1000
+
+# Maximum number of job statuses kept for polling in process memory
+JOB_STATUS_MAX_ENTRIES = 10000
+
+# Finished jobs can be polled for at least this many seconds, unless the
+# in-memory status map fills up, in which case the longest finished are dropped first
+JOB_STATUS_TTL_SECONDS = 3600
+
+class MemoryJobStore:
+    """In-process job status store, for a single API process."""
+
+    def __init__(self, max_entries: int = JOB_STATUS_MAX_ENTRIES):
+        """
+        Initialize the memory store.
+        
+        Args:
+            max_entries: Maximum number of job statuses kept
+        """
+        self.max_entries = max_entries
+        
+        # Job statuses keyed by job ID
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job status, or None if unknown or evicted."""
+        return self._jobs.get(job_id)
+
+    async def set(self, job_id: str, job: Dict[str, Any]) -> None:
+        """Store a job status, evicting finished jobs when the store is full."""
+        if job_id not in self._jobs and len(self._jobs) >= self.max_entries:
+            self._prune()
+        self._jobs[job_id] = job
+
+    async def delete(self, job_id: str) -> None:
+        """Drop a job status."""
+        self._jobs.pop(job_id, None)
+
+    def _prune(self) -> None:
+        """Drop finished jobs past their TTL, then the longest finished while the store is full."""
+        now = time.time()
+        finished = sorted(
+            (job["finished_at"], job_id) for job_id, job in self._jobs.items() if "finished_at" in job
+        )
+        
+        expired = {job_id for finished_at, job_id in finished if finished_at + JOB_STATUS_TTL_SECONDS <= now}
+        overflow = len(self._jobs) - len(expired) - self.max_entries + 1
+        if overflow > 0:
+            expired.update(job_id for _, job_id in finished[len(expired):len(expired) + overflow])
+        
+        self._jobs = {job_id: job for job_id, job in self._jobs.items() if job_id not in expired}
+
+class RedisJobStore:
+    """Redis job status store, shared across API processes."""
+
+    def __init__(self, client: Any, prefix: str = "content_generation_job:"):
+        """
+        Initialize the Redis store.
+        
+        Args:
+            client: redis.asyncio client
+            prefix: Prefix for job keys in Redis
+        """
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job status, or None if unknown or expired."""
+        value = await self.client.get(self.prefix + job_id)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, job_id: str, job: Dict[str, Any]) -> None:
+        """Store a job status for JOB_STATUS_TTL_SECONDS."""
+        await self.client.set(self.prefix + job_id, json.dumps(job, default=str), ex=JOB_STATUS_TTL_SECONDS)
+
+    async def delete(self, job_id: str) -> None:
+        """Drop a job status."""
+        await self.client.delete(self.prefix + job_id)
+
+# Jobs waiting to run, and the worker tasks draining them. Jobs run in the
+# process that queued them
+_job_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+
+# Job statuses and results. With JOB_STORE_REDIS_URL set, they are shared by
+# all API processes, so a status poll can reach any of them
+_job_redis_url = os.environ.get("JOB_STORE_REDIS_URL")
+_job_store = RedisJobStore(redis.from_url(_job_redis_url)) if _job_redis_url else MemoryJobStore()
+
+# Generated results are reused for identical requests for up to this many seconds
+GENERATION_CACHE_TTL_SECONDS = 3600
+GENERATION_CACHE_MAX_ENTRIES = 10000
+
+# Generated results keyed by request hash, with the time the entry expires
+_generation_cache: Dict[str, Any] = {}
+
+def _generation_cache_key(kind: str, company_id: str, request: BaseModel) -> str:
+    """
+    Hash a generation request for the exact-match cache.
+    
+    Args:
+        kind: Kind of content generated
+        company_id: ID of the company
+        request: Generation request
+        
+    Returns:
+        Hex digest identifying the request
+    """
+    payload = {"kind": kind, "company_id": company_id, "request": request.model_dump()}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _get_cached_generation(cache_key: str) -> Optional[Any]:
+    """Get the cached result for a generation request, or None."""
+    cached = _generation_cache.get(cache_key)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    return None
+
+def _cache_generation(cache_key: str, result: Any) -> None:
+    """Cache the result of a generation request."""
+    global _generation_cache
+    now = time.time()
+    
+    if len(_generation_cache) >= GENERATION_CACHE_MAX_ENTRIES:
+        _generation_cache = {key: value for key, value in _generation_cache.items() if value[0] > now}
+        if len(_generation_cache) >= GENERATION_CACHE_MAX_ENTRIES:
+            _generation_cache.clear()
+    
+    _generation_cache[cache_key] = (now + GENERATION_CACHE_TTL_SECONDS, result)
+
+async def _run_jobs(queue: asyncio.Queue) -> None:
+    """Run queued jobs until cancelled."""
+    while True:
+        job, func, args, kwargs, cache_key = await queue.get()
+        job_id = job["job_id"]
+        try:
+            job["status"] = "running"
+            await _job_store.set(job_id, job)
+            
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                result = await run_in_threadpool(func, *args, **kwargs)
+            job.update(status="completed", result=result)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            job.update(status="failed", error=str(e))
+        
+        try:
+            job["finished_at"] = time.time()
+            await _job_store.set(job_id, job)
+            
+            # Failed generations are not cached, so identical requests retry them
+            result = job.get("result")
+            if cache_key and isinstance(result, dict) and result.get("success"):
+                _cache_generation(cache_key, result)
+        except Exception as e:
+            logger.error(f"Failed to record job {job_id}: {e}")
+        finally:
+            queue.task_done()
+
+async def start_workers():
+    """Create the job queue and start the workers."""
+    global _job_queue
+    _job_queue = asyncio.Queue(maxsize=GENERATION_QUEUE_SIZE)
+    _workers.extend(asyncio.create_task(_run_jobs(_job_queue)) for _ in range(GENERATION_WORKERS))
+
+async def stop_workers():
+    """Cancel the workers."""
+    for worker in _workers:
+        worker.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+# Run jobs for the lifetime of the application
+router.add_event_handler("startup", start_workers)
+router.add_event_handler("shutdown", stop_workers)
+
+async def _enqueue(func: Callable[..., Any], *args: Any, owner_id: str, cache_key: Optional[str] = None, **kwargs: Any) -> str:
+    """
+    Queue a job for the workers.
+    
+    Args:
+        func: Service function to run
+        *args: Positional arguments for the function
+        owner_id: ID of the user allowed to poll the job
+        cache_key: Key to cache the result under once the job completes
+        **kwargs: Keyword arguments for the function
+        
+    Returns:
+        ID of the queued job
+        
+    Raises:
+        HTTPException: If the workers are not running or the queue is full
+    """
+    if _job_queue is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Job workers are not running, try again later"
+        )
+    
+    # Stored before queuing, so the worker's status updates always come after it
+    job_id = str(uuid.uuid4())
+    job = {"job_id": job_id, "status": "queued", "owner_id": owner_id}
+    await _job_store.set(job_id, job)
+    
+    try:
+        _job_queue.put_nowait((job, func, args, kwargs, cache_key))
+    except asyncio.QueueFull:
+        await _job_store.delete(job_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many jobs queued, try again later"
+        )
+    
+    return job_id
+
+class GenerationRequest(BaseModel):
+    """Base model for content generation requests."""
+    # Reject unknown fields and oversized strings during validation, before
+    # they reach prompt building or the generation cache key
+    model_config = ConfigDict(extra="forbid", str_max_length=2000)
+
+class BlogPostRequest(GenerationRequest):
     """Blog post generation request model."""
     topic: str
     word_count: Optional[int] = None
     keywords: Optional[str] = None
     call_to_action: Optional[str] = None
 
-class SocialMediaRequest(BaseModel):
+class SocialMediaRequest(GenerationRequest):
     """Social media post generation request model."""
     topic: str
     platform: str
     hashtags: Optional[str] = None
     call_to_action: Optional[str] = None
 
-class EmailNewsletterRequest(BaseModel):
+class EmailNewsletterRequest(GenerationRequest):
     """Email newsletter generation request model."""
     topic: str
     newsletter_type: Optional[str] = None
@@ -40,7 +283,7 @@ class EmailNewsletterRequest(BaseModel):
     call_to_action: Optional[str] = None
     word_count: Optional[int] = None
 
-class ProductDescriptionRequest(BaseModel):
+class ProductDescriptionRequest(GenerationRequest):
     """Product description generation request model."""
     product_name: str
     product_category: Optional[str] = None
@@ -70,7 +313,6 @@ class PublishContentRequest(BaseModel):
 async def generate_blog_post(
     request: BlogPostRequest,
     company_id: str,
-    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -79,32 +321,87 @@ async def generate_blog_post(
     Args:
         request: Blog post generation request
         company_id: ID of the company
-        background_tasks: FastAPI background tasks
         current_user: Current authenticated user
         
     Returns:
         Result of the operation
     """
-    # Add task to background to avoid blocking the API
-    background_tasks.add_task(
+    # Serve identical repeated requests from the cache
+    cache_key = _generation_cache_key("blog-post", company_id, request)
+    cached = _get_cached_generation(cache_key)
+    if cached is not None:
+        return {
+            "message": f"Blog post on topic '{request.topic}' retrieved from cache",
+            "result": cached,
+            "status": "cached"
+        }
+    
+    # Queue the job to avoid blocking the API
+    job_id = await _enqueue(
         content_generation_service.generate_blog_post,
         company_id,
         request.topic,
         word_count=request.word_count,
         keywords=request.keywords,
-        call_to_action=request.call_to_action
+        call_to_action=request.call_to_action,
+        owner_id=current_user["id"],
+        cache_key=cache_key
     )
     
     return {
         "message": f"Generating blog post on topic '{request.topic}' in the background",
-        "status": "pending"
+        "job_id": job_id,
+        "status": "queued"
     }
 
+@router.post("/blog-post/stream")
+async def stream_blog_post(
+    request: BlogPostRequest,
+    company_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Generate a blog post, streaming it as server-sent events.
+    
+    The body is streamed as "delta" events while it is generated, followed by
+    a final event carrying the title. Use the queued route for jobs that
+    nobody is waiting on.
+    
+    Args:
+        request: Blog post generation request
+        company_id: ID of the company
+        current_user: Current authenticated user
+        
+    Returns:
+        Streaming response of generated content events
+    """
+    instructions = []
+    if request.word_count:
+        instructions.append(f"Write about {request.word_count} words.")
+    if request.call_to_action:
+        instructions.append(f"End with this call to action: {request.call_to_action}")
+    
+    try:
+        events = get_ai_service().stream_content(
+            content_type="blog",
+            topic=request.topic,
+            keywords=[keyword.strip() for keyword in request.keywords.split(",")] if request.keywords else None,
+            length="long" if request.word_count and request.word_count > 1000 else "medium",
+            additional_instructions=" ".join(instructions) or None,
+            company_id=company_id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    return event_stream_response(events)
+
 @router.post("/social-media")
 async def generate_social_media_post(
     request: SocialMediaRequest,
     company_id: str,
-    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -113,32 +410,43 @@ async def generate_social_media_post(
     Args:
         request: Social media post generation request
         company_id: ID of the company
-        background_tasks: FastAPI background tasks
         current_user: Current authenticated user
         
     Returns:
         Result of the operation
     """
-    # Add task to background to avoid blocking the API
-    background_tasks.add_task(
+    # Serve identical repeated requests from the cache
+    cache_key = _generation_cache_key("social-media", company_id, request)
+    cached = _get_cached_generation(cache_key)
+    if cached is not None:
+        return {
+            "message": f"{request.platform} post on topic '{request.topic}' retrieved from cache",
+            "result": cached,
+            "status": "cached"
+        }
+    
+    # Queue the job to avoid blocking the API
+    job_id = await _enqueue(
         content_generation_service.generate_social_media_post,
         company_id,
         request.topic,
         request.platform,
         hashtags=request.hashtags,
-        call_to_action=request.call_to_action
+        call_to_action=request.call_to_action,
+        owner_id=current_user["id"],
+        cache_key=cache_key
     )
     
     return {
         "message": f"Generating {request.platform} post on topic '{request.topic}' in the background",
-        "status": "pending"
+        "job_id": job_id,
+        "status": "queued"
     }
 
 @router.post("/email-newsletter")
 async def generate_email_newsletter(
     request: EmailNewsletterRequest,
     company_id: str,
-    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -147,14 +455,23 @@ async def generate_email_newsletter(
     Args:
         request: Email newsletter generation request
         company_id: ID of the company
-        background_tasks: FastAPI background tasks
         current_user: Current authenticated user
         
     Returns:
         Result of the operation
     """
-    # Add task to background to avoid blocking the API
-    background_tasks.add_task(
+    # Serve identical repeated requests from the cache
+    cache_key = _generation_cache_key("email-newsletter", company_id, request)
+    cached = _get_cached_generation(cache_key)
+    if cached is not None:
+        return {
+            "message": f"Email newsletter on topic '{request.topic}' retrieved from cache",
+            "result": cached,
+            "status": "cached"
+        }
+    
+    # Queue the job to avoid blocking the API
+    job_id = await _enqueue(
         content_generation_service.generate_email_newsletter,
         company_id,
         request.topic,
@@ -162,19 +479,21 @@ async def generate_email_newsletter(
         content_sections=request.content_sections,
         primary_goal=request.primary_goal,
         call_to_action=request.call_to_action,
-        word_count=request.word_count
+        word_count=request.word_count,
+        owner_id=current_user["id"],
+        cache_key=cache_key
     )
     
     return {
         "message": f"Generating email newsletter on topic '{request.topic}' in the background",
-        "status": "pending"
+        "job_id": job_id,
+        "status": "queued"
     }
 
 @router.post("/product-description")
 async def generate_product_description(
     request: ProductDescriptionRequest,
     company_id: str,
-    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -183,14 +502,23 @@ async def generate_product_description(
     Args:
         request: Product description generation request
         company_id: ID of the company
-        background_tasks: FastAPI background tasks
         current_user: Current authenticated user
         
     Returns:
         Result of the operation
     """
-    # Add task to background to avoid blocking the API
-    background_tasks.add_task(
+    # Serve identical repeated requests from the cache
+    cache_key = _generation_cache_key("product-description", company_id, request)
+    cached = _get_cached_generation(cache_key)
+    if cached is not None:
+        return {
+            "message": f"Product description for '{request.product_name}' retrieved from cache",
+            "result": cached,
+            "status": "cached"
+        }
+    
+    # Queue the job to avoid blocking the API
+    job_id = await _enqueue(
         content_generation_service.generate_product_description,
         company_id,
         request.product_name,
@@ -201,12 +529,15 @@ async def generate_product_description(
         price_point=request.price_point,
         unique_selling_proposition=request.unique_selling_proposition,
         platform=request.platform,
-        keywords=request.keywords
+        keywords=request.keywords,
+        owner_id=current_user["id"],
+        cache_key=cache_key
     )
     
     return {
         "message": f"Generating product description for '{request.product_name}' in the background",
-        "status": "pending"
+        "job_id": job_id,
+        "status": "queued"
     }
 
 @router.post("/schedule")
@@ -251,7 +582,6 @@ async def schedule_content_generation(
 async def publish_content(
     content_id: str,
     request: PublishContentRequest,
-    background_tasks: BackgroundTasks,
     current_user: Dict[str, Any] = Depends(get_current_user)
 ):
     """
@@ -260,24 +590,50 @@ async def publish_content(
     Args:
         content_id: ID of the content to publish
         request: Publish content request
-        background_tasks: FastAPI background tasks
         current_user: Current authenticated user
         
     Returns:
         Result of the operation
     """
-    # Add task to background to avoid blocking the API
-    background_tasks.add_task(
+    # Queue the job to avoid blocking the API
+    job_id = await _enqueue(
         content_generation_service.publish_content,
         content_id,
-        request.platform
+        request.platform,
+        owner_id=current_user["id"]
     )
     
     return {
         "message": f"Publishing content {content_id} to {request.platform} in the background",
-        "status": "pending"
+        "job_id": job_id,
+        "status": "queued"
     }
 
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Get the status of a queued job.
+    
+    Args:
+        job_id: ID returned when the job was queued
+        current_user: Current authenticated user
+        
+    Returns:
+        Job status, with the result once completed
+    """
+    # Other users' jobs are reported as missing, so job IDs cannot be probed
+    job = await _job_store.get(job_id)
+    if job is None or job["owner_id"] != current_user["id"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found"
+        )
+    
+    return {key: value for key, value in job.items() if key != "owner_id"}
+
 @router.get("/content/{content_id}")
 async def get_content(
     content_id: str,
@@ -4,16 +4,254 @@ Content Service for Business Automation System.
 This module provides the service layer for content management and generation.
 """
 
+import json
 import uuid
+import base64
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
+
+import httpx
 
 from models.content import (
     Content, ContentCreate, ContentUpdate, ContentFilter,
     ContentGenerateRequest, ContentPublishRequest
 )
-from services.ai.ai_service import AIService
-from services.analytics.analytics_service import AnalyticsService
+from core.database import db
+from services.ai.ai_service import get_ai_service
+from services.analytics.analytics_service import get_analytics_service
+
+
+# Mock content rows, validated once at import; requests get copies with
+# their own timestamps instead of constructing new models
+_MOCK_BLOG_POST = Content(
+    id=str(uuid.uuid4()),
+    company_id="",
+    title="10 Tips for Small Business Success",
+    type="blog",
+    body="Here are 10 tips for small business success...",
+    tags=["small business", "tips", "success"],
+    status="published",
+    platform="wordpress",
+    url="https://example.com/blog/10-tips",
+    created_by="user123",
+    created_at=datetime(1970, 1, 1),
+    published_at=datetime(1970, 1, 1),
+    metadata={}
+)
+
+_MOCK_BLOG_DRAFT = _MOCK_BLOG_POST.model_copy(update={
+    "status": "draft",
+    "platform": None,
+    "url": None,
+    "published_at": None
+})
+
+
+# HTTP client shared by every ContentService instance, so publishing calls
+# reuse pooled keep-alive HTTP/2 connections instead of opening new ones
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=50, max_connections=100, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(30.0, connect=10.0)
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+async def _publish_wordpress(client: httpx.AsyncClient, content: Content, params: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Publish content to WordPress."""
+    params = params or {}
+    api_url = params.get("api_url")
+    
+    # Without a configured site, return a mock result
+    if not api_url:
+        return {
+            "success": True,
+            "platform": "wordpress",
+            "url": f"https://example.com/blog/{content.id}",
+            "published_at": now.isoformat()
+        }
+    
+    response = await client.post(
+        f"{api_url.rstrip('/')}/posts",
+        json={"title": content.title, "content": content.body, "status": "publish"},
+        auth=(params.get("username", ""), params.get("password", ""))
+    )
+    response.raise_for_status()
+    
+    return {
+        "success": True,
+        "platform": "wordpress",
+        "url": response.json().get("link"),
+        "published_at": now.isoformat()
+    }
+
+
+async def _publish_buffer(client: httpx.AsyncClient, content: Content, params: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Publish content to Buffer."""
+    params = params or {}
+    api_key = params.get("api_key")
+    
+    # Without a configured account, return a mock result
+    if not api_key:
+        return {
+            "success": True,
+            "platform": "buffer",
+            "url": f"https://buffer.com/updates/{content.id}",
+            "published_at": now.isoformat()
+        }
+    
+    response = await client.post(
+        "https://api.bufferapp.com/1/updates/create.json",
+        data={
+            "access_token": api_key,
+            "text": content.body,
+            "profile_ids[]": params.get("profile_ids", []),
+            "now": "true"
+        }
+    )
+    response.raise_for_status()
+    updates = response.json().get("updates") or [{}]
+    
+    return {
+        "success": True,
+        "platform": "buffer",
+        "url": f"https://buffer.com/updates/{updates[0].get('id', content.id)}",
+        "published_at": now.isoformat()
+    }
+
+
+async def _publish_email(client: httpx.AsyncClient, content: Content, params: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+    """Publish content as an email."""
+    # In a real implementation, this would send through the email service
+    # For now, we'll just return a mock result
+    return {
+        "success": True,
+        "platform": "email",
+        "url": None,
+        "published_at": now.isoformat(),
+        "recipients": (params or {}).get("recipients", 0)
+    }
+
+
+# Publishing handlers by platform; support a new platform by registering its handler here
+PLATFORM_HANDLERS: Dict[str, Callable[[httpx.AsyncClient, Content, Optional[Dict[str, Any]], datetime], Awaitable[Dict[str, Any]]]] = {
+    "wordpress": _publish_wordpress,
+    "buffer": _publish_buffer,
+    "email": _publish_email
+}
+
+
+def build_content_filters(company_id: str, content_filter: ContentFilter) -> List[Dict[str, Any]]:
+    """
+    Build database filter conditions for a content query.
+    
+    Only the filters that are set become conditions, so the database can use
+    the (company_id, ...) indexes and return only matching rows. The content
+    table has no tags or creator columns, so those filters are rejected rather
+    than silently ignored.
+    
+    Args:
+        company_id: ID of the company
+        content_filter: Filter criteria
+        
+    Returns:
+        List of filter conditions for query_collection
+        
+    Raises:
+        ValueError: If the filter uses tags or created_by
+    """
+    if content_filter.tags or content_filter.created_by:
+        raise ValueError("Filtering content by tags or creator is not supported")
+    
+    filters = [{"field": "company_id", "op": "==", "value": company_id}]
+    
+    for field in ("status", "type", "platform"):
+        value = getattr(content_filter, field)
+        if value:
+            filters.append({"field": field, "op": "==", "value": value})
+    
+    if content_filter.created_after:
+        filters.append({"field": "created_at", "op": ">=", "value": content_filter.created_after})
+    if content_filter.created_before:
+        filters.append({"field": "created_at", "op": "<=", "value": content_filter.created_before})
+    
+    return filters
+
+
+def _content_from_row(row: Dict[str, Any]) -> Content:
+    """
+    Build content from a content table row.
+    
+    Args:
+        row: Row of the content table
+        
+    Returns:
+        Content
+    """
+    return Content(
+        id=str(row["id"]),
+        company_id=str(row["company_id"]),
+        title=row["title"],
+        type=row["type"],
+        body=row["content"],
+        tags=row.get("tags") or [],
+        status=row["status"],
+        platform=row.get("platform"),
+        url=row.get("url"),
+        created_by=row.get("created_by"),
+        created_at=row["created_at"],
+        published_at=row.get("published_at"),
+        metadata=row.get("metadata") or {}
+    )
+
+
+def encode_content_cursor(content: Content) -> str:
+    """
+    Encode the position after a content item as a pagination cursor.
+    
+    Args:
+        content: Last content item of a page
+        
+    Returns:
+        Opaque cursor string
+    """
+    position = json.dumps([content.created_at.isoformat(), content.id])
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_content_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a pagination cursor.
+    
+    Args:
+        cursor: Cursor returned with a previous page
+        
+    Returns:
+        Tuple of the created_at and ID of the last item of the previous page
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, content_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), content_id
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
 
 
 class ContentService:
@@ -21,10 +259,10 @@ class ContentService:
 
     def __init__(self):
         """Initialize the content service."""
-        self.ai_service = AIService()
-        self.analytics_service = AnalyticsService()
+        self.ai_service = get_ai_service()
+        self.analytics_service = get_analytics_service()
 
-    def create_content(self, content_in: ContentCreate, created_by: str) -> Content:
+    async def create_content(self, content_in: ContentCreate, created_by: str) -> Content:
         """
         Create new content.
         
@@ -67,89 +305,50 @@ class ContentService:
         
         return content
 
-    def get_content_list(self, company_id: str, content_filter: ContentFilter, skip: int = 0, limit: int = 100) -> List[Content]:
+    async def get_content_list(self, company_id: str, content_filter: ContentFilter, cursor: Optional[str] = None, limit: int = 100) -> Dict[str, Any]:
         """
-        Get content with optional filtering.
+        Get content with optional filtering, newest first.
+        
+        Pages are addressed by keyset cursors on (created_at, id), so each
+        page costs the same regardless of how deep it is.
         
         Args:
             company_id: ID of the company
             content_filter: Filter criteria
-            skip: Number of content items to skip
+            cursor: Cursor returned with the previous page, or None for the first page
             limit: Maximum number of content items to return
             
         Returns:
-            List of content items
+            Dictionary with the content items and the cursor for the next page,
+            which is None on the last page
+            
+        Raises:
+            ValueError: If the cursor is malformed, or the filter is not supported
         """
-        # In a real implementation, this would query the database
-        # For now, we'll just return a mock list of content
-        content_list = [
-            Content(
-                id=str(uuid.uuid4()),
-                company_id=company_id,
-                title="10 Tips for Small Business Success",
-                type="blog",
-                body="Here are 10 tips for small business success...",
-                tags=["small business", "tips", "success"],
-                status="published",
-                platform="wordpress",
-                url="https://example.com/blog/10-tips",
-                created_by="user123",
-                created_at=datetime.utcnow() - timedelta(days=5),
-                published_at=datetime.utcnow() - timedelta(days=4),
-                metadata={}
-            ),
-            Content(
-                id=str(uuid.uuid4()),
-                company_id=company_id,
-                title="New Product Announcement",
-                type="email",
-                body="We're excited to announce our new product...",
-                tags=["product", "announcement", "email"],
-                status="draft",
-                platform=None,
-                url=None,
-                created_by="user123",
-                created_at=datetime.utcnow() - timedelta(days=2),
-                published_at=None,
-                metadata={}
-            )
-        ]
-        
-        # Apply filters
-        filtered_content = content_list
-        if content_filter.status:
-            filtered_content = [content for content in filtered_content if content.status == content_filter.status]
-        if content_filter.type:
-            filtered_content = [content for content in filtered_content if content.type == content_filter.type]
-        if content_filter.platform:
-            filtered_content = [content for content in filtered_content if content.platform == content_filter.platform]
-        if content_filter.tags:
-            filtered_content = [
-                content for content in filtered_content 
-                if any(tag in content.tags for tag in content_filter.tags)
-            ]
-        if content_filter.created_after:
-            filtered_content = [
-                content for content in filtered_content 
-                if content.created_at >= content_filter.created_after
-            ]
-        if content_filter.created_before:
-            filtered_content = [
-                content for content in filtered_content 
-                if content.created_at <= content_filter.created_before
-            ]
-        if content_filter.created_by:
-            filtered_content = [
-                content for content in filtered_content 
-                if content.created_by == content_filter.created_by
-            ]
-        
-        # Apply pagination
-        paginated_content = filtered_content[skip:skip + limit]
-        
-        return paginated_content
-
-    def get_content(self, company_id: str, content_id: str) -> Optional[Content]:
+        after = decode_content_cursor(cursor) if cursor else None
+        
+        # Filter, order and limit in the database, continuing after the cursor
+        # with WHERE (created_at, id) < (:created_at, :id). One extra row is
+        # fetched to tell whether there is a next page
+        rows = await db.query_collection(
+            "content",
+            filters=build_content_filters(company_id, content_filter),
+            order_by=["created_at", "id"],
+            order_direction="desc",
+            limit=limit + 1,
+            start_after=list(after) if after else None
+        )
+        filtered_content = [_content_from_row(row) for row in rows]
+        
+        paginated_content = filtered_content[:limit]
+        next_cursor = encode_content_cursor(paginated_content[-1]) if len(filtered_content) > limit else None
+        
+        return {
+            "items": paginated_content,
+            "next_cursor": next_cursor
+        }
+
+    async def get_content(self, company_id: str, content_id: str) -> Optional[Content]:
         """
         Get content by ID.
         
@@ -163,25 +362,18 @@ class ContentService:
         # In a real implementation, this would query the database
         # For now, we'll just return a mock content
         if content_id == "mock_content_id":
-            return Content(
-                id=content_id,
-                company_id=company_id,
-                title="10 Tips for Small Business Success",
-                type="blog",
-                body="Here are 10 tips for small business success...",
-                tags=["small business", "tips", "success"],
-                status="published",
-                platform="wordpress",
-                url="https://example.com/blog/10-tips",
-                created_by="user123",
-                created_at=datetime.utcnow() - timedelta(days=5),
-                published_at=datetime.utcnow() - timedelta(days=4),
-                metadata={}
-            )
+            now = datetime.utcnow()
+            return _MOCK_BLOG_POST.model_copy(update={
+                "id": content_id,
+                "company_id": company_id,
+                "created_at": now - timedelta(days=5),
+                "published_at": now - timedelta(days=4),
+                "metadata": {}
+            })
         
         return None
 
-    def update_content(self, company_id: str, content_id: str, content_update: ContentUpdate) -> Content:
+    async def update_content(self, company_id: str, content_id: str, content_update: ContentUpdate) -> Content:
         """
         Update content.
         
@@ -195,53 +387,51 @@ class ContentService:
         """
         # In a real implementation, this would update the database
         # For now, we'll just return a mock updated content
-        content = self.get_content(company_id, content_id)
+        content = await self.get_content(company_id, content_id)
         
         if not content:
             # In a real implementation, this would raise an exception
             # For now, we'll just return a mock content
-            content = Content(
-                id=content_id,
-                company_id=company_id,
-                title="10 Tips for Small Business Success",
-                type="blog",
-                body="Here are 10 tips for small business success...",
-                tags=["small business", "tips", "success"],
-                status="draft",
-                platform=None,
-                url=None,
-                created_by="user123",
-                created_at=datetime.utcnow() - timedelta(days=2),
-                published_at=None,
-                metadata={}
-            )
-        
-        # Update fields
-        if content_update.title:
-            content.title = content_update.title
-        if content_update.body:
-            content.body = content_update.body
-        if content_update.tags:
-            content.tags = content_update.tags
-        if content_update.status:
-            content.status = content_update.status
+            content = _MOCK_BLOG_DRAFT.model_copy(update={
+                "id": content_id,
+                "company_id": company_id,
+                "created_at": datetime.utcnow() - timedelta(days=2),
+                "metadata": {}
+            })
+        
+        return self._apply_content_update(content, content_update)
+
+    @staticmethod
+    def _apply_content_update(content: Content, content_update: ContentUpdate) -> Content:
+        """
+        Apply update data to content.
+        
+        The changes are collected and applied in one copy, rather than
+        assigning (and validating) the fields one by one.
+        
+        Args:
+            content: Content to update
+            content_update: Content update data
             
-            # If status is changed to published, set published_at
-            if content_update.status == "published" and not content.published_at:
-                content.published_at = datetime.utcnow()
-        
-        if content_update.platform:
-            content.platform = content_update.platform
-        if content_update.url:
-            content.url = content_update.url
-        if content_update.metadata:
-            content.metadata = {**content.metadata, **content_update.metadata}
-        if content_update.published_at:
-            content.published_at = content_update.published_at
+        Returns:
+            Updated content
+        """
+        # Only the fields set in the update are changed
+        changes = content_update.model_dump(exclude_unset=True, exclude_none=True)
         
-        return content
+        metadata = changes.pop("metadata", None)
+        if metadata:
+            # Content rows are per-request copies, so merge into the existing
+            # metadata in place rather than building a new dict
+            content.metadata.update(metadata)
+        
+        # If status is changed to published, set published_at
+        if changes.get("status") == "published" and not content.published_at:
+            changes.setdefault("published_at", datetime.utcnow())
+        
+        return content.model_copy(update=changes)
 
-    def delete_content(self, company_id: str, content_id: str) -> bool:
+    async def delete_content(self, company_id: str, content_id: str) -> bool:
         """
         Delete content.
         
@@ -256,7 +446,7 @@ class ContentService:
         # For now, we'll just return True
         return True
 
-    def update_content_metadata(self, company_id: str, content_id: str, metadata_key: str, metadata_value: Any) -> Content:
+    async def update_content_metadata(self, company_id: str, content_id: str, metadata_key: str, metadata_value: Any) -> Content:
         """
         Update content metadata.
         
@@ -271,7 +461,7 @@ class ContentService:
         """
         # In a real implementation, this would update the database
         # For now, we'll just return a mock updated content
-        content = self.get_content(company_id, content_id)
+        content = await self.get_content(company_id, content_id)
         
         if not content:
             return None
@@ -281,9 +471,9 @@ class ContentService:
         
         return content
 
-    def publish_content(self, company_id: str, content_id: str, platform: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def publish_content(self, company_id: str, content_id: str, platform: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """
-        Publish content to a platform.
+        Publish content to a platform and mark it as published.
         
         Args:
             company_id: ID of the company
@@ -292,41 +482,59 @@ class ContentService:
             params: Additional parameters for publishing
             
         Returns:
-            Dictionary with publish result
+            Dictionary with publish result, including the updated content on
+            success, or None if the content was not found
         """
-        # In a real implementation, this would publish to the platform
-        # For now, we'll just return a mock result
-        content = self.get_content(company_id, content_id)
+        # In a real implementation, this would run in one transaction:
+        # SELECT ... FOR UPDATE, publish to the platform, then
+        # UPDATE ... RETURNING * on the locked row
+        content = await self.get_content(company_id, content_id)
         
         if not content:
-            return {"success": False, "error": "Content not found"}
+            return None
         
-        # Mock publishing to different platforms
-        if platform == "wordpress":
-            return {
-                "success": True,
-                "platform": "wordpress",
-                "url": f"https://example.com/blog/{content_id}",
-                "published_at": datetime.utcnow().isoformat()
-            }
-        elif platform == "buffer":
-            return {
-                "success": True,
-                "platform": "buffer",
-                "url": f"https://buffer.com/updates/{content_id}",
-                "published_at": datetime.utcnow().isoformat()
-            }
-        elif platform == "email":
+        now = datetime.utcnow()
+        result = await self._publish_to_platform(content, platform, params, now)
+        
+        if result["success"]:
+            result["content"] = self._apply_content_update(content, ContentUpdate(
+                status="published",
+                platform=platform,
+                url=result.get("url"),
+                published_at=now,
+                metadata={
+                    "publish_result": dict(result)
+                }
+            ))
+        
+        return result
+
+    async def _publish_to_platform(self, content: Content, platform: str, params: Optional[Dict[str, Any]], now: datetime) -> Dict[str, Any]:
+        """
+        Publish content to a platform.
+        
+        Args:
+            content: Content to publish
+            platform: Platform to publish to
+            params: Additional parameters for publishing
+            now: Time of publishing
+            
+        Returns:
+            Dictionary with publish result
+        """
+        handler = PLATFORM_HANDLERS.get(platform)
+        if handler is None:
             return {
-                "success": True,
-                "platform": "email",
-                "url": None,
-                "published_at": datetime.utcnow().isoformat(),
-                "recipients": params.get("recipients", 0)
+                "success": False,
+                "error": f"Unsupported platform: {platform}"
             }
-        else:
+        
+        # Platform APIs are called over the shared pooled client
+        try:
+            return await handler(_get_http_client(), content, params, now)
+        except httpx.HTTPError as e:
             return {
                 "success": False,
-                "error": f"Unsupported platform: {platform}"
+                "error": f"Failed to publish to {platform}: {e}"
             }
 
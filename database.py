@@ -1,13 +1,59 @@
 import os
+import re
+import asyncio
 import logging
 from typing import Dict, List, Any, Optional, Union
-import json
-from datetime import datetime
+
+import orjson
+
+# Database drivers are optional; only the one for the configured backend is required
+try:
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+except ImportError:
+    firebase_admin = credentials = firestore = None
+
+try:
+    import asyncpg
+    from asyncpg.exceptions import UndefinedColumnError, UndefinedTableError
+    
+    # Errors from querying the ID column of a table that has none (or of a missing table)
+    _MISSING_ID_ERRORS = (UndefinedColumnError, UndefinedTableError)
+except ImportError:
+    asyncpg = None
+    _MISSING_ID_ERRORS = ()
 
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Table and column names interpolated into SQL must match this pattern
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Prepared statements kept per PostgreSQL connection, keyed by query text
+PG_STATEMENT_CACHE_SIZE = 1024
+
+def _encode_jsonb(value: Any) -> bytes:
+    """Encode a JSONB parameter in PostgreSQL's binary format (version 1)."""
+    return b"\x01" + orjson.dumps(value)
+
+def _decode_jsonb(data: bytes) -> Any:
+    """Decode a JSONB column from PostgreSQL's binary format."""
+    return orjson.loads(data[1:])
+
+# Maximum number of writes in one Firestore batch commit
+FIREBASE_BATCH_SIZE = 500
+
+# Minimum number of rows with the same columns for which COPY is used instead of executemany
+PG_COPY_MIN_ROWS = 100
+
+# Per-table SQL, built once per table so repeated calls send the same prepared text
+_TABLE_SQL = {
+    "get": "SELECT * FROM {table} WHERE id = $1",
+    "batch_get": "SELECT * FROM {table} WHERE id = ANY($1)",
+    "delete": "DELETE FROM {table} WHERE id = $1 RETURNING id"
+}
+
 class DatabaseClient:
     """
     Abstract database client that provides a unified interface for different database backends.
@@ -16,6 +62,16 @@ class DatabaseClient:
     def __init__(self):
         self.db_type = settings.DB_TYPE
         self.client = None
+        
+        # Whether each PostgreSQL table has an ID column, keyed by table name
+        self._id_col_cache: Dict[str, bool] = {}
+        
+        # Guards creation of the PostgreSQL pool, so concurrent first callers share one pool
+        self._pool_lock = asyncio.Lock()
+        
+        # Per-table SQL keyed by (operation, table name[, sorted column names])
+        self._sql_cache: Dict[tuple, str] = {}
+        
         self.initialize()
     
     def initialize(self):
@@ -36,8 +92,8 @@ class DatabaseClient:
     def _initialize_firebase(self):
         """Initialize Firebase client."""
         try:
-            import firebase_admin
-            from firebase_admin import credentials, firestore
+            if firebase_admin is None:
+                raise ImportError("firebase-admin is required for the firebase database type")
             
             # Check if already initialized
             if not firebase_admin._apps:
@@ -58,6 +114,7 @@ class DatabaseClient:
                 firebase_admin.initialize_app(cred)
             
             self.client = firestore.client()
+            
             logger.info("Firebase client initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize Firebase client: {e}")
@@ -66,7 +123,8 @@ class DatabaseClient:
     def _initialize_postgresql(self):
         """Initialize PostgreSQL client."""
         try:
-            import asyncpg
+            if asyncpg is None:
+                raise ImportError("asyncpg is required for the postgresql database type")
             
             self.pool = None
             self.dsn = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
@@ -79,11 +137,165 @@ class DatabaseClient:
     async def _get_pg_pool(self):
         """Get or create PostgreSQL connection pool."""
         if self.pool is None:
-            import asyncpg
-            self.pool = await asyncpg.create_pool(dsn=self.dsn)
+            async with self._pool_lock:
+                if self.pool is None:
+                    self.pool = await asyncpg.create_pool(
+                        dsn=self.dsn,
+                        min_size=settings.POSTGRES_POOL_MIN_SIZE,
+                        max_size=settings.POSTGRES_POOL_MAX_SIZE,
+                        max_queries=settings.POSTGRES_POOL_MAX_QUERIES,
+                        max_inactive_connection_lifetime=settings.POSTGRES_POOL_MAX_INACTIVE_LIFETIME,
+                        command_timeout=settings.POSTGRES_COMMAND_TIMEOUT,
+                        statement_cache_size=PG_STATEMENT_CACHE_SIZE,
+                        server_settings={"application_name": settings.PROJECT_NAME},
+                        init=self._init_pg_connection
+                    )
+                    await self._load_id_columns()
         return self.pool
     
-    async def create_document(self, collection: str, data: Dict[str, Any], doc_id: Optional[str] = None) -> Dict[str, Any]:
+    async def _load_id_columns(self):
+        """
+        Record which tables have an ID column, for every table in one query.
+        
+        Tables created later are checked on first use by _has_id_column.
+        """
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                "SELECT table_name, bool_or(column_name = 'id') AS has_id FROM information_schema.columns "
+                "WHERE table_schema = current_schema() GROUP BY table_name"
+            )
+        
+        self._id_col_cache.update((row["table_name"], row["has_id"]) for row in rows)
+    
+    async def _init_pg_connection(self, conn):
+        """
+        Set up a new PostgreSQL connection.
+        
+        JSONB values are encoded and decoded with orjson in the binary wire
+        format, so dicts and lists are passed and returned as-is rather than
+        as JSON strings.
+        
+        Args:
+            conn: New database connection
+        """
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=_encode_jsonb,
+            decoder=_decode_jsonb,
+            schema="pg_catalog",
+            format="binary"
+        )
+    
+    async def _has_id_column(self, conn, collection: str) -> bool:
+        """
+        Check whether a PostgreSQL table has an ID column.
+        
+        The schema does not change while the application runs, so the result
+        is looked up once per table rather than once per call.
+        
+        Args:
+            conn: Database connection
+            collection: Table name
+            
+        Returns:
+            True if the table has an ID column
+        """
+        id_exists = self._id_col_cache.get(collection)
+        if id_exists is None:
+            id_exists = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = $1 AND column_name = 'id')",
+                collection
+            )
+            self._id_col_cache[collection] = id_exists
+        return id_exists
+    
+    def _table_sql(self, operation: str, collection: str) -> str:
+        """
+        Get the SQL for an operation on a table, building it on first use.
+        
+        Args:
+            operation: Operation in _TABLE_SQL
+            collection: Table name
+            
+        Returns:
+            SQL text for the operation
+            
+        Raises:
+            ValueError: If the table name is not a valid identifier
+        """
+        key = (operation, collection)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            sql = _TABLE_SQL[operation].format(table=self._check_identifier(collection))
+            self._sql_cache[key] = sql
+        return sql
+    
+    def _insert_sql(self, collection: str, columns: tuple) -> str:
+        """
+        Get the INSERT statement for a table and set of columns, building it on first use.
+        
+        Args:
+            collection: Table name
+            columns: Sorted column names, in the order of the values
+            
+        Returns:
+            SQL text for the insert
+            
+        Raises:
+            ValueError: If a table or column name is not a valid identifier
+        """
+        key = ("insert", collection, columns)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            column_list = ", ".join(self._check_identifier(column) for column in columns)
+            placeholders = ", ".join(f"${i+1}" for i in range(len(columns)))
+            sql = f"INSERT INTO {self._check_identifier(collection)} ({column_list}) VALUES ({placeholders}) RETURNING *"
+            self._sql_cache[key] = sql
+        return sql
+    
+    def _update_sql(self, collection: str, columns: tuple) -> str:
+        """
+        Get the UPDATE statement for a table and set of columns, building it on first use.
+        
+        The document ID is $1, followed by the column values.
+        
+        Args:
+            collection: Table name
+            columns: Sorted column names, in the order of the values
+            
+        Returns:
+            SQL text for the update
+            
+        Raises:
+            ValueError: If a table or column name is not a valid identifier
+        """
+        key = ("update", collection, columns)
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            set_clause = ", ".join(f"{self._check_identifier(column)} = ${i+2}" for i, column in enumerate(columns))
+            sql = f"UPDATE {self._check_identifier(collection)} SET {set_clause} WHERE id = $1 RETURNING *"
+            self._sql_cache[key] = sql
+        return sql
+    
+    @staticmethod
+    def _check_identifier(name: str) -> str:
+        """
+        Check that a table or column name is safe to interpolate into SQL.
+        
+        Args:
+            name: Table or column name
+            
+        Returns:
+            The name, unchanged
+            
+        Raises:
+            ValueError: If the name is not a valid identifier
+        """
+        if not isinstance(name, str) or not _IDENTIFIER_RE.fullmatch(name):
+            raise ValueError(f"Invalid identifier: {name!r}")
+        return name
+    
+    async def create_document(self, collection: str, data: Dict[str, Any], doc_id: Optional[str] = None, read_after_write: bool = False) -> Dict[str, Any]:
         """
         Create a new document in the specified collection.
         
@@ -91,22 +303,26 @@ class DatabaseClient:
             collection: Collection name
             data: Document data
             doc_id: Optional document ID
+            read_after_write: On Firebase, read the document back after writing it, to
+                include server-computed fields such as SERVER_TIMESTAMP values. Otherwise
+                the written data is returned with the document ID, saving a round trip.
+                PostgreSQL always returns the stored row.
             
         Returns:
             Created document data
         """
         try:
             if self.db_type == "firebase":
-                # Convert datetime objects to Firestore timestamps
-                data = self._convert_datetimes_for_firebase(data)
-                
-                # Create document
+                # Create document; Firestore stores datetime values as timestamps natively
                 if doc_id:
                     doc_ref = self.client.collection(collection).document(doc_id)
                     doc_ref.set(data)
                 else:
                     doc_ref = self.client.collection(collection).add(data)[1]
                 
+                if not read_after_write:
+                    return {**data, "id": doc_ref.id}
+                
                 # Get created document
                 doc = doc_ref.get()
                 result = doc.to_dict()
@@ -116,71 +332,85 @@ class DatabaseClient:
             elif self.db_type == "postgresql":
                 pool = await self._get_pg_pool()
                 
-                # Convert data to JSON-compatible format
-                data_json = self._convert_for_postgresql(data)
+                # JSONB values are encoded by the connection's codec
+                row = dict(data)
                 
                 # Create document
                 async with pool.acquire() as conn:
-                    if doc_id:
-                        # Check if ID column exists
-                        id_exists = await conn.fetchval(
-                            f"SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = '{collection}' AND column_name = 'id')"
-                        )
-                        
-                        if id_exists:
-                            # Insert with specified ID
-                            columns = list(data_json.keys())
-                            values = list(data_json.values())
-                            
-                            # Add ID to columns and values
-                            if "id" not in columns:
-                                columns.append("id")
-                                values.append(doc_id)
-                            
-                            placeholders = [f"${i+1}" for i in range(len(values))]
-                            
-                            query = f"""
-                                INSERT INTO {collection} ({', '.join(columns)})
-                                VALUES ({', '.join(placeholders)})
-                                RETURNING *
-                            """
-                            
-                            result = await conn.fetchrow(query, *values)
-                            return dict(result)
-                        else:
-                            # Table doesn't have ID column, use regular insert
-                            columns = list(data_json.keys())
-                            values = list(data_json.values())
-                            placeholders = [f"${i+1}" for i in range(len(values))]
-                            
-                            query = f"""
-                                INSERT INTO {collection} ({', '.join(columns)})
-                                VALUES ({', '.join(placeholders)})
-                                RETURNING *
-                            """
-                            
-                            result = await conn.fetchrow(query, *values)
-                            return dict(result)
-                    else:
-                        # Insert without specified ID
-                        columns = list(data_json.keys())
-                        values = list(data_json.values())
-                        placeholders = [f"${i+1}" for i in range(len(values))]
-                        
-                        query = f"""
-                            INSERT INTO {collection} ({', '.join(columns)})
-                            VALUES ({', '.join(placeholders)})
-                            RETURNING *
-                        """
-                        
-                        result = await conn.fetchrow(query, *values)
-                        return dict(result)
+                    # Insert with specified ID, if the table has an ID column
+                    if doc_id and "id" not in row and await self._has_id_column(conn, collection):
+                        row["id"] = doc_id
+                    
+                    # Columns are sorted so the same set of columns always uses the same statement
+                    columns = tuple(sorted(row))
+                    result = await conn.fetchrow(self._insert_sql(collection, columns), *[row[column] for column in columns])
+                    return dict(result)
             else:
                 raise ValueError(f"Unsupported database type: {self.db_type}")
         except Exception as e:
             logger.error(f"Error creating document in {collection}: {e}")
             raise
     
+    async def batch_create_documents(self, collection: str, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several documents in the specified collection.
+        
+        The documents are written in batched Firestore commits, or with one
+        COPY or pipelined executemany per set of columns on PostgreSQL, rather
+        than one round trip per document. Documents are returned as written, so
+        server-computed fields are not included; on PostgreSQL, documents
+        without an "id" do not get one back.
+        
+        Args:
+            collection: Collection name
+            documents: Document data; an "id" key is used as the document ID
+            
+        Returns:
+            Created documents
+        """
+        try:
+            if self.db_type == "firebase":
+                collection_ref = self.client.collection(collection)
+                results = []
+                
+                for start in range(0, len(documents), FIREBASE_BATCH_SIZE):
+                    batch = self.client.batch()
+                    for data in documents[start:start + FIREBASE_BATCH_SIZE]:
+                        doc_ref = collection_ref.document(data.get("id"))
+                        fields = {key: value for key, value in data.items() if key != "id"}
+                        batch.set(doc_ref, fields)
+                        results.append({**data, "id": doc_ref.id})
+                    batch.commit()
+                
+                return results
+            elif self.db_type == "postgresql":
+                pool = await self._get_pg_pool()
+                
+                # Group documents by their columns, so each group shares one statement
+                groups: Dict[tuple, List[Dict[str, Any]]] = {}
+                for data in documents:
+                    groups.setdefault(tuple(sorted(data)), []).append(data)
+                
+                async with pool.acquire() as conn:
+                    async with conn.transaction():
+                        for columns, rows in groups.items():
+                            records = [[row[column] for column in columns] for row in rows]
+                            if len(records) >= PG_COPY_MIN_ROWS:
+                                await conn.copy_records_to_table(
+                                    self._check_identifier(collection),
+                                    records=records,
+                                    columns=[self._check_identifier(column) for column in columns]
+                                )
+                            else:
+                                await conn.executemany(self._insert_sql(collection, columns), records)
+                
+                return [dict(data) for data in documents]
+            else:
+                raise ValueError(f"Unsupported database type: {self.db_type}")
+        except Exception as e:
+            logger.error(f"Error creating documents in {collection}: {e}")
+            raise
+    
     async def get_document(self, collection: str, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a document by ID.
@@ -207,21 +437,16 @@ class DatabaseClient:
                 pool = await self._get_pg_pool()
                 
                 async with pool.acquire() as conn:
-                    # Check if ID column exists
-                    id_exists = await conn.fetchval(
-                        f"SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = '{collection}' AND column_name = 'id')"
-                    )
+                    # One round trip; a table without an ID column fails the query
+                    try:
+                        result = await conn.fetchrow(self._table_sql("get", collection), doc_id)
+                    except _MISSING_ID_ERRORS:
+                        # If no ID column, return None
+                        return None
                     
-                    if id_exists:
-                        query = f"SELECT * FROM {collection} WHERE id = $1"
-                        result = await conn.fetchrow(query, doc_id)
-                        
-                        if result:
-                            return dict(result)
-                        else:
-                            return None
+                    if result:
+                        return dict(result)
                     else:
-                        # If no ID column, return None
                         return None
             else:
                 raise ValueError(f"Unsupported database type: {self.db_type}")
@@ -229,6 +454,48 @@ class DatabaseClient:
             logger.error(f"Error getting document {doc_id} from {collection}: {e}")
             raise
     
+    async def batch_get_documents(self, collection: str, doc_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Get several documents by ID in one round trip.
+        
+        Args:
+            collection: Collection name
+            doc_ids: Document IDs
+            
+        Returns:
+            Document data for each ID, in the order given, with None for documents not found
+        """
+        try:
+            if not doc_ids:
+                return []
+            
+            if self.db_type == "firebase":
+                # get_all fetches every document in one batched RPC, in no particular order
+                collection_ref = self.client.collection(collection)
+                found = {
+                    doc.id: {**doc.to_dict(), "id": doc.id}
+                    for doc in self.client.get_all([collection_ref.document(doc_id) for doc_id in doc_ids])
+                    if doc.exists
+                }
+            elif self.db_type == "postgresql":
+                pool = await self._get_pg_pool()
+                
+                async with pool.acquire() as conn:
+                    try:
+                        rows = await conn.fetch(self._table_sql("batch_get", collection), list(doc_ids))
+                    except _MISSING_ID_ERRORS:
+                        # If no ID column, no documents are found
+                        rows = []
+                
+                found = {str(row["id"]): dict(row) for row in rows}
+            else:
+                raise ValueError(f"Unsupported database type: {self.db_type}")
+            
+            return [found.get(str(doc_id)) for doc_id in doc_ids]
+        except Exception as e:
+            logger.error(f"Error getting documents from {collection}: {e}")
+            raise
+    
     async def update_document(self, collection: str, doc_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update a document by ID.
@@ -243,9 +510,6 @@ class DatabaseClient:
         """
         try:
             if self.db_type == "firebase":
-                # Convert datetime objects to Firestore timestamps
-                data = self._convert_datetimes_for_firebase(data)
-                
                 # Update document
                 doc_ref = self.client.collection(collection).document(doc_id)
                 doc_ref.update(data)
@@ -259,27 +523,17 @@ class DatabaseClient:
             elif self.db_type == "postgresql":
                 pool = await self._get_pg_pool()
                 
-                # Convert data to JSON-compatible format
-                data_json = self._convert_for_postgresql(data)
+                # JSONB values are encoded by the connection's codec
+                row = data
                 
                 async with pool.acquire() as conn:
                     # Check if ID column exists
-                    id_exists = await conn.fetchval(
-                        f"SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = '{collection}' AND column_name = 'id')"
-                    )
+                    id_exists = await self._has_id_column(conn, collection)
                     
                     if id_exists:
-                        # Build SET clause
-                        set_clause = ", ".join([f"{key} = ${i+2}" for i, key in enumerate(data_json.keys())])
-                        
-                        query = f"""
-                            UPDATE {collection}
-                            SET {set_clause}
-                            WHERE id = $1
-                            RETURNING *
-                        """
-                        
-                        result = await conn.fetchrow(query, doc_id, *data_json.values())
+                        # Columns are sorted so the same set of columns always uses the same statement
+                        columns = tuple(sorted(row))
+                        result = await conn.fetchrow(self._update_sql(collection, columns), doc_id, *[row[column] for column in columns])
                         
                         if result:
                             return dict(result)
@@ -314,21 +568,16 @@ class DatabaseClient:
                 pool = await self._get_pg_pool()
                 
                 async with pool.acquire() as conn:
-                    # Check if ID column exists
-                    id_exists = await conn.fetchval(
-                        f"SELECT EXISTS (SELECT 1 FROM information_schema.columns WHERE table_name = '{collection}' AND column_name = 'id')"
-                    )
+                    # One round trip; a table without an ID column fails the query
+                    try:
+                        result = await conn.fetchval(self._table_sql("delete", collection), doc_id)
+                    except _MISSING_ID_ERRORS:
+                        raise ValueError(f"Table {collection} does not have an ID column")
                     
-                    if id_exists:
-                        query = f"DELETE FROM {collection} WHERE id = $1 RETURNING id"
-                        result = await conn.fetchval(query, doc_id)
-                        
-                        if result:
-                            return {"deleted": True, "id": doc_id}
-                        else:
-                            return {"deleted": False, "id": doc_id}
+                    if result:
+                        return {"deleted": True, "id": doc_id}
                     else:
-                        raise ValueError(f"Table {collection} does not have an ID column")
+                        return {"deleted": False, "id": doc_id}
             else:
                 raise ValueError(f"Unsupported database type: {self.db_type}")
         except Exception as e:
@@ -339,10 +588,11 @@ class DatabaseClient:
         self, 
         collection: str, 
         filters: Optional[List[Dict[str, Any]]] = None,
-        order_by: Optional[str] = None,
+        order_by: Optional[Union[str, List[str]]] = None,
         order_direction: Optional[str] = "asc",
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        start_after: Optional[List[Any]] = None
     ) -> List[Dict[str, Any]]:
         """
         Query a collection with filters and ordering.
@@ -350,14 +600,20 @@ class DatabaseClient:
         Args:
             collection: Collection name
             filters: List of filter conditions
-            order_by: Field to order by
+            order_by: Field, or fields in priority order, to order by
             order_direction: Order direction (asc or desc)
             limit: Maximum number of documents to return
             offset: Number of documents to skip
+            start_after: Values of the order_by fields of the last document of the
+                previous page; only documents after it are returned (keyset pagination)
             
         Returns:
             List of documents matching the query
         """
+        order_fields = [order_by] if isinstance(order_by, str) else list(order_by or [])
+        if start_after is not None and len(start_after) != len(order_fields):
+            raise ValueError("start_after needs one value per order_by field")
+        
         try:
             if self.db_type == "firebase":
                 # Start query
@@ -374,39 +630,34 @@ class DatabaseClient:
                             query = query.where(field, op, value)
                 
                 # Apply ordering
-                if order_by:
-                    query = query.order_by(order_by, direction=order_direction)
+                for field in order_fields:
+                    query = query.order_by(field, direction=order_direction)
+                
+                if start_after is not None:
+                    query = query.start_after(dict(zip(order_fields, start_after)))
                 
                 # Apply limit
                 if limit:
                     query = query.limit(limit)
                 
-                # Execute query
-                docs = query.stream()
+                # Apply offset in the query, so skipped documents are not sent to the client
+                if offset:
+                    query = query.offset(offset)
                 
-                # Apply offset manually (Firestore doesn't support offset directly)
-                results = []
-                for i, doc in enumerate(docs):
-                    if offset and i < offset:
-                        continue
-                    
-                    data = doc.to_dict()
-                    data["id"] = doc.id
-                    results.append(data)
-                
-                return results
+                # Execute query
+                return [{**doc.to_dict(), "id": doc.id} for doc in query.stream()]
             elif self.db_type == "postgresql":
                 pool = await self._get_pg_pool()
                 
                 async with pool.acquire() as conn:
                     # Build query
-                    query = f"SELECT * FROM {collection}"
+                    query = f"SELECT * FROM {self._check_identifier(collection)}"
                     
                     # Apply filters
                     params = []
+                    where_clauses = []
                     if filters:
-                        where_clauses = []
-                        for i, filter_condition in enumerate(filters):
+                        for filter_condition in filters:
                             field = filter_condition.get("field")
                             op = filter_condition.get("op")
                             value = filter_condition.get("value")
@@ -414,23 +665,34 @@ class DatabaseClient:
                             if field and op and value is not None:
                                 # Convert operator
                                 pg_op = self._convert_operator_for_postgresql(op)
-                                where_clauses.append(f"{field} {pg_op} ${len(params) + 1}")
+                                where_clauses.append(f"{self._check_identifier(field)} {pg_op} ${len(params) + 1}")
                                 params.append(value)
-                        
-                        if where_clauses:
-                            query += f" WHERE {' AND '.join(where_clauses)}"
+                    
+                    descending = bool(order_direction) and order_direction.lower() == "desc"
+                    
+                    # Continue after the previous page with a row comparison, which
+                    # the (..., created_at DESC, id DESC) style indexes serve directly
+                    if start_after is not None:
+                        columns = ", ".join(self._check_identifier(field) for field in order_fields)
+                        placeholders = ", ".join(f"${len(params) + i + 1}" for i in range(len(start_after)))
+                        where_clauses.append(f"({columns}) {'<' if descending else '>'} ({placeholders})")
+                        params.extend(start_after)
+                    
+                    if where_clauses:
+                        query += f" WHERE {' AND '.join(where_clauses)}"
                     
                     # Apply ordering
-                    if order_by:
-                        query += f" ORDER BY {order_by} {order_direction.upper()}"
+                    if order_fields:
+                        direction = "DESC" if descending else "ASC"
+                        query += " ORDER BY " + ", ".join(f"{self._check_identifier(field)} {direction}" for field in order_fields)
                     
                     # Apply limit
                     if limit:
-                        query += f" LIMIT {limit}"
+                        query += f" LIMIT {int(limit)}"
                     
                     # Apply offset
                     if offset:
-                        query += f" OFFSET {offset}"
+                        query += f" OFFSET {int(offset)}"
                     
                     # Execute query
                     rows = await conn.fetch(query, *params)
@@ -445,37 +707,6 @@ class DatabaseClient:
             logger.error(f"Error querying collection {collection}: {e}")
             raise
     
-    def _convert_datetimes_for_firebase(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert datetime objects to Firestore timestamps."""
-        from firebase_admin import firestore
-        
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                result[key] = firestore.SERVER_TIMESTAMP if value is None else firestore.Timestamp.from_datetime(value)
-            elif isinstance(value, dict):
-                result[key] = self._convert_datetimes_for_firebase(value)
-            elif isinstance(value, list):
-                result[key] = [
-                    self._convert_datetimes_for_firebase(item) if isinstance(item, dict) else item
-                    for item in value
-                ]
-            else:
-                result[key] = value
-        
-        return result
-    
-    def _convert_for_postgresql(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert data to PostgreSQL-compatible format."""
-        result = {}
-        for key, value in data.items():
-            if isinstance(value, dict) or isinstance(value, list):
-                result[key] = json.dumps(value)
-            else:
-                result[key] = value
-        
-        return result
-    
     def _convert_operator_for_postgresql(self, op: str) -> str:
         """Convert Firestore operator to PostgreSQL operator."""
         op_map = {
@@ -486,6 +717,7 @@ class DatabaseClient:
             ">": ">",
             ">=": ">=",
             "array-contains": "@>",
+            "array-contains-any": "&&",
             "in": "IN",
             "not-in": "NOT IN"
         }
@@ -5,11 +5,62 @@ This module provides the service layer for sending emails.
 """
 
 import os
+import asyncio
 import logging
 from typing import Dict, Any, List, Optional
 
+import httpx
+import aiosmtplib
+
 logger = logging.getLogger(__name__)
 
+# Maximum number of personalizations (recipients) in one SendGrid mail send request
+SENDGRID_MAX_PERSONALIZATIONS = 1000
+
+# HTTP client shared by every EmailService instance, so SendGrid calls reuse
+# pooled keep-alive connections instead of opening new ones
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60.0),
+            timeout=httpx.Timeout(30.0, connect=10.0)
+        )
+    return _http_client
+
+
+# Mock email templates, built once rather than on every lookup
+_EMAIL_TEMPLATES = {
+    "lead_welcome": {
+        "subject": "Welcome to {company_name}",
+        "content": "<p>Hello {lead_name},</p><p>Thank you for your interest in {company_name}. We're excited to help you with {service_name}.</p><p>Best regards,<br>{sender_name}</p>"
+    },
+    "lead_followup": {
+        "subject": "Following up on your interest in {company_name}",
+        "content": "<p>Hello {lead_name},</p><p>I wanted to follow up on your interest in {company_name}. Do you have any questions I can answer?</p><p>Best regards,<br>{sender_name}</p>"
+    },
+    "review_request": {
+        "subject": "We'd love your feedback on {platform}",
+        "content": "<p>Hello {customer_name},</p><p>Thank you for choosing {company_name}. We'd love to hear about your experience. Could you take a moment to leave us a review on {platform}?</p><p>Here's the link: {review_url}</p><p>Thank you,<br>{company_name} Team</p>"
+    },
+    "referral_offer": {
+        "subject": "Refer a friend and save",
+        "content": "<p>Hello {customer_name},</p><p>Thank you for your positive review! We'd like to offer you a special discount when you refer friends to us.</p><p>Your referral code is: <strong>{referral_code}</strong></p><p>Thank you,<br>{company_name} Team</p>"
+    }
+}
+
+
+class _SlotDict(dict):
+    """Mapping that leaves unknown placeholders in place when formatting."""
+
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
 
 class EmailService:
     """Service for sending emails."""
@@ -29,8 +80,37 @@ class EmailService:
         self.smtp_password = os.environ.get("SMTP_PASSWORD", "password")
         self.smtp_use_tls = os.environ.get("SMTP_USE_TLS", "true").lower() == "true"
         self.smtp_from_email = os.environ.get("SMTP_FROM_EMAIL", "noreply@example.com")
+        
+        # SMTP connection kept open across sends, and the lock serializing its use
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._smtp_lock = asyncio.Lock()
+
+    async def _get_smtp(self) -> aiosmtplib.SMTP:
+        """
+        Get the open SMTP connection, connecting and logging in on first use.
+        
+        Callers must hold _smtp_lock. The connection is reopened if the server
+        has closed it, so the TCP, STARTTLS and login handshakes are paid once
+        rather than once per message.
+        
+        Returns:
+            Connected SMTP client
+        """
+        if self._smtp is None or not self._smtp.is_connected:
+            smtp = aiosmtplib.SMTP(hostname=self.smtp_host, port=self.smtp_port, start_tls=self.smtp_use_tls)
+            await smtp.connect()
+            await smtp.login(self.smtp_username, self.smtp_password)
+            self._smtp = smtp
+        return self._smtp
 
-    def send_email(self, to_email: str, subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def close(self) -> None:
+        """Close the SMTP connection, if open."""
+        async with self._smtp_lock:
+            if self._smtp is not None and self._smtp.is_connected:
+                await self._smtp.quit()
+            self._smtp = None
+
+    async def send_email(self, to_email: str, subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Send an email.
         
@@ -53,16 +133,16 @@ class EmailService:
         logger.debug(f"Email content: {content[:100]}...")
         
         if self.provider == "sendgrid":
-            return self._send_via_sendgrid(to_email, subject, content, company_id, from_name, reply_to, attachments)
+            return await self._send_via_sendgrid([to_email], subject, content, company_id, from_name, reply_to, attachments)
         else:
-            return self._send_via_smtp(to_email, subject, content, company_id, from_name, reply_to, attachments)
+            return await self._send_via_smtp([to_email], subject, content, company_id, from_name, reply_to, attachments)
 
-    def _send_via_sendgrid(self, to_email: str, subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def _send_via_sendgrid(self, to_emails: List[str], subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Send an email using SendGrid.
+        Send an email to up to SENDGRID_MAX_PERSONALIZATIONS recipients in one SendGrid request.
         
         Args:
-            to_email: Recipient email address
+            to_emails: Recipient email addresses
             subject: Email subject
             content: Email content (HTML or plain text)
             company_id: ID of the company
@@ -73,25 +153,45 @@ class EmailService:
         Returns:
             Dictionary with send result
         """
-        # In a real implementation, this would use the SendGrid API
+        # Each recipient gets their own personalization, so they receive a
+        # separate copy without a request per recipient
+        sender = {"email": self.sendgrid_from_email}
+        if from_name:
+            sender["name"] = from_name
+        
+        payload = {
+            "personalizations": [{"to": [{"email": to_email}]} for to_email in to_emails],
+            "from": sender,
+            "subject": subject,
+            "content": [{"type": "text/html", "value": content}]
+        }
+        if reply_to:
+            payload["reply_to"] = {"email": reply_to}
+        
+        # In a real implementation, this would POST the payload to the SendGrid v3 mail send API:
+        # response = await _get_http_client().post(
+        #     "https://api.sendgrid.com/v3/mail/send", json=payload,
+        #     headers={"Authorization": f"Bearer {self.sendgrid_api_key}"}
+        # )
         # For now, we'll just return a mock result
         
-        logger.info(f"Sending email via SendGrid to {to_email}")
+        logger.info(f"Sending email via SendGrid to {len(to_emails)} recipients")
         
         # Mock successful send
         return {
             "success": True,
             "provider": "sendgrid",
-            "message_id": f"mock-sendgrid-{to_email}-{subject[:10]}",
+            "message_id": f"mock-sendgrid-{to_emails[0]}-{subject[:10]}",
+            "recipients": len(payload["personalizations"]),
             "timestamp": "2023-01-01T12:00:00Z"
         }
 
-    def _send_via_smtp(self, to_email: str, subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def _send_via_smtp(self, to_emails: List[str], subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
-        Send an email using SMTP.
+        Send an email to each recipient using SMTP, over one connection.
         
         Args:
-            to_email: Recipient email address
+            to_emails: Recipient email addresses
             subject: Email subject
             content: Email content (HTML or plain text)
             company_id: ID of the company
@@ -102,20 +202,26 @@ class EmailService:
         Returns:
             Dictionary with send result
         """
-        # In a real implementation, this would use the SMTP protocol
+        # In a real implementation, this would send one message per recipient
+        # over the shared connection:
+        # async with self._smtp_lock:
+        #     smtp = await self._get_smtp()
+        #     for message in messages:
+        #         await smtp.send_message(message)
         # For now, we'll just return a mock result
         
-        logger.info(f"Sending email via SMTP to {to_email}")
+        logger.info(f"Sending email via SMTP to {len(to_emails)} recipients")
         
         # Mock successful send
         return {
             "success": True,
             "provider": "smtp",
-            "message_id": f"mock-smtp-{to_email}-{subject[:10]}",
+            "message_id": f"mock-smtp-{to_emails[0]}-{subject[:10]}",
+            "recipients": len(to_emails),
             "timestamp": "2023-01-01T12:00:00Z"
         }
 
-    def send_bulk_email(self, to_emails: List[str], subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def send_bulk_email(self, to_emails: List[str], subject: str, content: str, company_id: str = None, from_name: str = None, reply_to: str = None, attachments: List[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Send an email to multiple recipients.
         
@@ -129,24 +235,30 @@ class EmailService:
             attachments: List of attachments
             
         Returns:
-            Dictionary with send result
+            Dictionary with send result, with one result per provider request
         """
-        # In a real implementation, this would send bulk emails
-        # For now, we'll just log the emails and return a mock result
-        
         logger.info(f"Sending bulk email to {len(to_emails)} recipients with subject '{subject}'")
         
         results = []
-        for to_email in to_emails:
-            result = self.send_email(to_email, subject, content, company_id, from_name, reply_to, attachments)
-            results.append(result)
+        if to_emails:
+            if self.provider == "sendgrid":
+                # One request per batch of recipients rather than one per recipient,
+                # with the batches sent concurrently
+                results = await asyncio.gather(*[
+                    self._send_via_sendgrid(to_emails[start:start + SENDGRID_MAX_PERSONALIZATIONS], subject, content, company_id, from_name, reply_to, attachments)
+                    for start in range(0, len(to_emails), SENDGRID_MAX_PERSONALIZATIONS)
+                ])
+            else:
+                results.append(await self._send_via_smtp(to_emails, subject, content, company_id, from_name, reply_to, attachments))
+        
+        sent = sum(result["recipients"] for result in results if result["success"])
         
         # Return summary
         return {
-            "success": True,
+            "success": sent == len(to_emails),
             "total": len(to_emails),
-            "sent": len(to_emails),
-            "failed": 0,
+            "sent": sent,
+            "failed": len(to_emails) - sent,
             "results": results
         }
 
@@ -164,30 +276,11 @@ class EmailService:
         # In a real implementation, this would retrieve a template from the database
         # For now, we'll just return a mock template
         
-        templates = {
-            "lead_welcome": {
-                "subject": "Welcome to {company_name}",
-                "content": "<p>Hello {lead_name},</p><p>Thank you for your interest in {company_name}. We're excited to help you with {service_name}.</p><p>Best regards,<br>{sender_name}</p>"
-            },
-            "lead_followup": {
-                "subject": "Following up on your interest in {company_name}",
-                "content": "<p>Hello {lead_name},</p><p>I wanted to follow up on your interest in {company_name}. Do you have any questions I can answer?</p><p>Best regards,<br>{sender_name}</p>"
-            },
-            "review_request": {
-                "subject": "We'd love your feedback on {platform}",
-                "content": "<p>Hello {customer_name},</p><p>Thank you for choosing {company_name}. We'd love to hear about your experience. Could you take a moment to leave us a review on {platform}?</p><p>Here's the link: {review_url}</p><p>Thank you,<br>{company_name} Team</p>"
-            },
-            "referral_offer": {
-                "subject": "Refer a friend and save",
-                "content": "<p>Hello {customer_name},</p><p>Thank you for your positive review! We'd like to offer you a special discount when you refer friends to us.</p><p>Your referral code is: <strong>{referral_code}</strong></p><p>Thank you,<br>{company_name} Team</p>"
-            }
-        }
-        
-        if template_name in templates:
+        if template_name in _EMAIL_TEMPLATES:
             return {
                 "name": template_name,
-                "subject": templates[template_name]["subject"],
-                "content": templates[template_name]["content"]
+                "subject": _EMAIL_TEMPLATES[template_name]["subject"],
+                "content": _EMAIL_TEMPLATES[template_name]["content"]
             }
         
         return None
@@ -203,18 +296,12 @@ class EmailService:
         Returns:
             Dictionary with rendered subject and content
         """
-        # In a real implementation, this would use a template engine
-        # For now, we'll just do simple string replacement
-        
-        subject = template["subject"]
-        content = template["content"]
-        
-        for key, value in context.items():
-            subject = subject.replace(f"{{{key}}}", str(value))
-            content = content.replace(f"{{{key}}}", str(value))
+        # Fill each string in a single format_map pass; placeholders missing
+        # from the context are left in place
+        slots = _SlotDict(context)
         
         return {
-            "subject": subject,
-            "content": content
+            "subject": template["subject"].format_map(slots),
+            "content": template["content"].format_map(slots)
         }
 
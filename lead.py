@@ -6,7 +6,7 @@ This module provides the data models for leads and interactions.
 
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 
 class LeadBase(BaseModel):
@@ -58,9 +58,7 @@ class Lead(LeadBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class InteractionBase(BaseModel):
@@ -88,9 +86,7 @@ class Interaction(InteractionBase):
     lead_id: str
     created_at: datetime
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class LeadWithInteractions(Lead):
@@ -9,10 +9,10 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
 from models.lead import Lead, LeadCreate, LeadUpdate, LeadFilter, Interaction, InteractionCreate
-from services.ai.ai_service import AIService
+from services.ai.ai_service import get_ai_service
 from services.email.email_service import EmailService
 from services.sms.sms_service import SMSService
-from services.analytics.analytics_service import AnalyticsService
+from services.analytics.analytics_service import get_analytics_service
 
 
 class LeadService:
@@ -20,10 +20,10 @@ class LeadService:
 
     def __init__(self):
         """Initialize the lead service."""
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
         self.email_service = EmailService()
         self.sms_service = SMSService()
-        self.analytics_service = AnalyticsService()
+        self.analytics_service = get_analytics_service()
 
     def create_lead(self, lead_in: LeadCreate) -> Lead:
         """
@@ -309,7 +309,7 @@ class LeadService:
         
         return interaction
 
-    def generate_lead_message(self, lead_id: str, company_id: str, message_type: str) -> str:
+    async def generate_lead_message(self, lead_id: str, company_id: str, message_type: str) -> str:
         """
         Generate a message for a lead using AI.
         
@@ -335,9 +335,9 @@ class LeadService:
             "message_type": message_type
         }
         
-        return self.ai_service.generate_lead_message(message_params)
+        return await self.ai_service.generate_lead_message(message_params)
 
-    def send_lead_message(self, lead_id: str, company_id: str, message: str, channel: str) -> bool:
+    async def send_lead_message(self, lead_id: str, company_id: str, message: str, channel: str) -> bool:
         """
         Send a message to a lead.
         
@@ -359,7 +359,7 @@ class LeadService:
         # Send message
         if channel == "email" and lead.email:
             # Send email
-            self.email_service.send_email(
+            await self.email_service.send_email(
                 to_email=lead.email,
                 subject=f"Following up on your interest",
                 content=message,
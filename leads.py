@@ -200,10 +200,10 @@ async def generate_and_send_message(
     This endpoint generates a personalized message for a lead and sends it via the specified channel.
     """
     # Generate message
-    message = lead_service.generate_lead_message(lead_id, current_company["id"], message_type)
+    message = await lead_service.generate_lead_message(lead_id, current_company["id"], message_type)
     
     # Send message
-    success = lead_service.send_lead_message(lead_id, current_company["id"], message, channel)
+    success = await lead_service.send_lead_message(lead_id, current_company["id"], message, channel)
     
     if not success:
         raise HTTPException(
@@ -0,0 +1,239 @@
+"""
+LLM Response Cache for Business Automation System.
+
+This module provides exact and semantic caching of generated content, so
+repeated or near-identical generation requests skip the LLM round trip.
+"""
+
+import json
+import time
+import hashlib
+from typing import Dict, Any, List, Optional, Protocol, Tuple
+
+import numpy as np
+
+
+# Minimum cosine similarity between request embeddings for a semantic cache hit
+SEMANTIC_SIMILARITY_THRESHOLD = 0.92
+
+# Cached responses are reused for up to this many seconds
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 10000
+
+# Maximum number of embeddings searched per namespace
+SEMANTIC_INDEX_MAX_ENTRIES = 1000
+
+
+class CacheBackend(Protocol):
+    """Storage for cached responses, keyed by exact cache key."""
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process cache backend with per-entry expiry."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        """
+        Initialize the memory backend.
+        
+        Args:
+            max_entries: Maximum number of cached responses
+        """
+        self.max_entries = max_entries
+        
+        # Responses keyed by cache key, with the time the entry expires
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        """Cache a response for ttl seconds."""
+        now = time.time()
+        
+        if len(self._entries) >= self.max_entries:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] > now}
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+        
+        self._entries[key] = (now + ttl, value)
+
+
+class RedisCacheBackend:
+    """Redis cache backend, shared across application processes."""
+
+    def __init__(self, client: Any, prefix: str = "llm_cache:"):
+        """
+        Initialize the Redis backend.
+        
+        Args:
+            client: redis.asyncio client
+            prefix: Prefix for cache keys in Redis
+        """
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached response, or None if missing or expired."""
+        value = await self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> None:
+        """Cache a response for ttl seconds."""
+        await self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+
+class LLMCache:
+    """Exact and semantic cache for LLM responses."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, threshold: float = SEMANTIC_SIMILARITY_THRESHOLD, ttl: int = LLM_CACHE_TTL_SECONDS):
+        """
+        Initialize the cache.
+        
+        Args:
+            backend: Storage for cached responses (defaults to in-process memory)
+            threshold: Minimum cosine similarity for a semantic hit
+            ttl: Seconds a cached response is reused for
+        """
+        self.backend = backend or MemoryCacheBackend()
+        self.threshold = threshold
+        self.ttl = ttl
+        
+        # Unit-length request embeddings and their cache keys, per namespace
+        self._index: Dict[tuple, Tuple[np.ndarray, List[str]]] = {}
+        
+        # Lookup counters for this process, reported by stats()
+        self._hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def cache_key(model: str, prompt_fields: Dict[str, Any], temperature: float) -> str:
+        """
+        Build the exact cache key for a request.
+        
+        Args:
+            model: Model the request is sent to
+            prompt_fields: Fields that determine the prompt
+            temperature: Temperature for generation
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = {"model": model, "fields": prompt_fields, "temperature": temperature}
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the response cached for an exact request.
+        
+        Args:
+            key: Cache key from cache_key()
+        
+        Returns:
+            Cached response, or None on a miss
+        """
+        value = await self.backend.get(key)
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    def has_index(self, namespace: tuple) -> bool:
+        """
+        Check whether any request embeddings are indexed for a namespace.
+        
+        Callers skip embedding a request when there is nothing to compare it to.
+        
+        Args:
+            namespace: Scope for semantic lookups
+        
+        Returns:
+            True if semantic_get() may find a match in the namespace
+        """
+        return namespace in self._index
+
+    async def semantic_get(self, namespace: tuple, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Get the response cached for the most similar earlier request.
+        
+        Args:
+            namespace: Scope that similar requests must share (e.g. company and content type)
+            embedding: Embedding of the request
+        
+        Returns:
+            Cached response, or None if no earlier request is similar enough
+        """
+        entry = self._index.get(namespace)
+        if entry is None:
+            return None
+        
+        # At most SEMANTIC_INDEX_MAX_ENTRIES rows, so the product is cheaper
+        # than handing it to a worker thread
+        matrix, keys = entry
+        similarities = np.dot(matrix, self._normalize(embedding))
+        best = int(np.argmax(similarities))
+        
+        if similarities[best] < self.threshold:
+            return None
+        
+        value = await self.backend.get(keys[best])
+        if value is not None:
+            self._semantic_hits += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any], namespace: Optional[tuple] = None, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Cache a response.
+        
+        Args:
+            key: Cache key from cache_key()
+            value: Response to cache
+            namespace: Scope for semantic lookups
+            embedding: Embedding of the request, to serve similar requests
+        """
+        await self.backend.set(key, value, self.ttl)
+        
+        if namespace is None or embedding is None:
+            return
+        
+        vector = self._normalize(embedding)[np.newaxis, :]
+        entry = self._index.get(namespace)
+        if entry is None or entry[0].shape[1] != vector.shape[1]:
+            self._index[namespace] = (vector, [key])
+            return
+        
+        # Keep the most recent embeddings, so each lookup is one bounded matrix product
+        matrix, keys = entry
+        self._index[namespace] = (
+            np.vstack((matrix, vector))[-SEMANTIC_INDEX_MAX_ENTRIES:],
+            (keys + [key])[-SEMANTIC_INDEX_MAX_ENTRIES:]
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the lookup counters for this process.
+        
+        Semantic hits are counted among the exact-match misses.
+        
+        Returns:
+            Dictionary with exact hits, exact-match misses and semantic hits
+        """
+        return {"hits": self._hits, "semantic_hits": self._semantic_hits, "misses": self._misses}
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        """Scale an embedding to unit length, so dot products are cosine similarities."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -1,5 +1,7 @@
+import anyio
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from typing import Dict, Any, List, Optional
 
@@ -10,18 +12,32 @@ from core.config import settings
 app = FastAPI(
     title="Business Automation System API",
     description="API for the Business Automation System",
-    version="1.0.0"
+    version="1.0.0",
+    # Encode responses with orjson by default, which is much faster than the standard library json
+    default_response_class=ORJSONResponse
 )
 
-# Configure CORS
+# Configure CORS, matching listed origins with the regex precompiled in settings
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=[] if settings.BACKEND_CORS_ORIGINS_RE else settings.BACKEND_CORS_ORIGINS,
+    allow_origin_regex=settings.BACKEND_CORS_ORIGINS_RE,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def configure_thread_pool():
+    """
+    Size the thread pool used for blocking calls from async routes.
+    
+    Database and service calls are I/O-bound, so they can share many more
+    threads than anyio's default of 40. CPU-bound work belongs in a process
+    pool rather than this thread pool.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.FASTAPI_THREAD_LIMIT
+
 # Include API routers
 app.include_router(lead_nurturing.router)
 app.include_router(review_referral.router)
@@ -20,7 +20,7 @@ class LeadRepository:
             now = datetime.utcnow()
             
             # Prepare lead data
-            lead_dict = lead_data.dict()
+            lead_dict = lead_data.model_dump()
             lead_dict.update({
                 "id": lead_id,
                 "status": "new",
@@ -77,7 +77,7 @@ class LeadRepository:
                 return None
             
             # Prepare update data
-            update_dict = {k: v for k, v in lead_data.dict().items() if v is not None}
+            update_dict = {k: v for k, v in lead_data.model_dump().items() if v is not None}
             update_dict["updated_at"] = datetime.utcnow()
             
             # Update lead in database
@@ -168,7 +168,7 @@ class InteractionRepository:
             now = datetime.utcnow()
             
             # Prepare interaction data
-            interaction_dict = interaction_data.dict()
+            interaction_dict = interaction_data.model_dump()
             interaction_dict.update({
                 "id": interaction_id,
                 "created_at": now
@@ -12,6 +12,7 @@ import argparse
 import logging
 import subprocess
 import json
+import orjson
 import firebase_admin
 from firebase_admin import credentials, firestore
 from pathlib import Path
@@ -27,6 +28,24 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).parent
 BACKUP_DIR = BASE_DIR / 'backups'
 
+def read_firebase_backup(backup_file):
+    """Yield (collection name, document) pairs from a Firebase backup file."""
+    if backup_file.suffix == '.ndjson':
+        # One document per line
+        with open(backup_file, 'rb', buffering=1 << 20) as f:
+            for line in f:
+                if line.strip():
+                    record = orjson.loads(line)
+                    yield record['collection'], record['doc']
+    else:
+        # Older backups hold all collections in one JSON object
+        with open(backup_file, 'r') as f:
+            backup_data = json.load(f)
+        
+        for collection_name, documents in backup_data.items():
+            for doc_data in documents:
+                yield collection_name, doc_data
+
 def restore_firebase(backup_file):
     """Restore Firebase database from backup."""
     logger.info(f"Restoring Firebase database from {backup_file}")
@@ -60,28 +79,27 @@ def restore_firebase(backup_file):
         
         db = firestore.client()
         
-        # Load backup data
-        with open(backup_file, 'r') as f:
-            backup_data = json.load(f)
-        
-        # Restore data
+        # Restore data, processing in batches to avoid Firestore limits
         batch_size = 500
-        for collection_name, documents in backup_data.items():
-            logger.info(f"Restoring collection {collection_name} with {len(documents)} documents")
+        batch = db.batch()
+        batch_count = 0
+        
+        for collection_name, doc_data in read_firebase_backup(backup_file):
+            doc_id = doc_data.pop('id')
+            doc_ref = db.collection(collection_name).document(doc_id)
+            batch.set(doc_ref, doc_data)
+            batch_count += 1
             
-            # Process in batches to avoid Firestore limits
-            for i in range(0, len(documents), batch_size):
-                batch = db.batch()
-                batch_docs = documents[i:i+batch_size]
-                
-                for doc_data in batch_docs:
-                    doc_id = doc_data.pop('id')
-                    doc_ref = db.collection(collection_name).document(doc_id)
-                    batch.set(doc_ref, doc_data)
-                
+            if batch_count == batch_size:
                 # Commit batch
                 batch.commit()
-                logger.info(f"Restored batch of {len(batch_docs)} documents to collection {collection_name}")
+                logger.info(f"Restored batch of {batch_count} documents")
+                batch = db.batch()
+                batch_count = 0
+        
+        if batch_count:
+            batch.commit()
+            logger.info(f"Restored batch of {batch_count} documents")
         
         logger.info("Firebase restore completed successfully")
     except Exception as e:
@@ -108,15 +126,29 @@ def restore_postgresql(backup_file):
         env = os.environ.copy()
         env['PGPASSWORD'] = pg_password
         
-        # Run psql to restore
-        cmd = [
-            'psql',
-            '-h', pg_host,
-            '-p', pg_port,
-            '-U', pg_user,
-            '-d', pg_db,
-            '-f', str(backup_file)
-        ]
+        if backup_file.is_dir():
+            # Directory-format dumps are restored in parallel with pg_restore
+            cmd = [
+                'pg_restore',
+                '-h', pg_host,
+                '-p', pg_port,
+                '-U', pg_user,
+                '-d', pg_db,
+                '--jobs', str(os.cpu_count() or 1),
+                '--no-owner',
+                '--no-acl',
+                str(backup_file)
+            ]
+        else:
+            # Run psql to restore plain SQL backups
+            cmd = [
+                'psql',
+                '-h', pg_host,
+                '-p', pg_port,
+                '-U', pg_user,
+                '-d', pg_db,
+                '-f', str(backup_file)
+            ]
         
         subprocess.run(cmd, env=env, check=True)
         
@@ -132,7 +164,7 @@ def main():
     """Main function."""
     parser = argparse.ArgumentParser(description='Restore the database for the Business Automation System')
     parser.add_argument('--db-type', choices=['firebase', 'postgresql'], required=True, help='Database type to restore')
-    parser.add_argument('--backup-file', required=True, help='Path to backup file')
+    parser.add_argument('--backup-file', required=True, help='Path to backup file or PostgreSQL backup directory')
     
     args = parser.parse_args()
     
@@ -14,10 +14,10 @@ from models.review_referral import (
     Review, ReviewRequestCreate, ReviewUpdate, ReviewFilter,
     Referral, ReferralCreate, ReferralFilter, Customer
 )
-from services.ai.ai_service import AIService
+from services.ai.ai_service import get_ai_service
 from services.email.email_service import EmailService
 from services.sms.sms_service import SMSService
-from services.analytics.analytics_service import AnalyticsService
+from services.analytics.analytics_service import get_analytics_service
 
 
 class ReviewService:
@@ -25,10 +25,10 @@ class ReviewService:
 
     def __init__(self):
         """Initialize the review service."""
-        self.ai_service = AIService()
+        self.ai_service = get_ai_service()
         self.email_service = EmailService()
         self.sms_service = SMSService()
-        self.analytics_service = AnalyticsService()
+        self.analytics_service = get_analytics_service()
 
     def get_customer(self, company_id: str, customer_id: str) -> Optional[Customer]:
         """
@@ -6,8 +6,10 @@ authorization, and token management.
 """
 
 import os
+import time
+import functools
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Union, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -22,12 +24,84 @@ SECRET_KEY = os.environ.get("SECRET_KEY", "mock_secret_key_for_development")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing, with the cost pinned so the context is set up once
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12, bcrypt__ident="2b")
+
+# Load the bcrypt backend at import rather than on the first request
+pwd_context.hash("warmup")
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Validated tokens are reused for up to this many seconds, or until the token expires
+TOKEN_CACHE_TTL_SECONDS = 60
+TOKEN_CACHE_MAX_ENTRIES = 10000
+
+# Users keyed by bearer token, with the time the entry expires
+_token_cache: Dict[str, Tuple[float, User]] = {}
+
+# Companies change rarely, so they are reused for up to this many seconds
+COMPANY_CACHE_TTL_SECONDS = 60
+COMPANY_CACHE_MAX_ENTRIES = 1024
+
+# Companies keyed by company ID, with the time the entry expires
+_company_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _cache_user(token: str, user: User, token_expires_at: Optional[float]) -> None:
+    """
+    Cache the user for a validated token.
+    
+    Args:
+        token: JWT token
+        user: User the token belongs to
+        token_expires_at: Expiry timestamp of the token, if any
+    """
+    global _token_cache
+    now = time.time()
+    
+    if len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache = {key: value for key, value in _token_cache.items() if value[0] > now}
+        if len(_token_cache) >= TOKEN_CACHE_MAX_ENTRIES:
+            _token_cache.clear()
+    
+    expires_at = now + TOKEN_CACHE_TTL_SECONDS
+    if token_expires_at is not None:
+        expires_at = min(expires_at, token_expires_at)
+    
+    _token_cache[token] = (expires_at, user)
+
+
+def _cache_company(company_id: str, company: Dict[str, Any]) -> None:
+    """
+    Cache a company looked up for a request.
+    
+    Args:
+        company_id: ID of the company
+        company: Company data
+    """
+    global _company_cache
+    now = time.time()
+    
+    if len(_company_cache) >= COMPANY_CACHE_MAX_ENTRIES:
+        _company_cache = {key: value for key, value in _company_cache.items() if value[0] > now}
+        if len(_company_cache) >= COMPANY_CACHE_MAX_ENTRIES:
+            _company_cache.clear()
+    
+    _company_cache[company_id] = (now + COMPANY_CACHE_TTL_SECONDS, company)
+
+
+def invalidate_company_cache(company_id: str) -> None:
+    """
+    Drop a cached company, so the next request reads it again.
+    
+    Call this after updating a company.
+    
+    Args:
+        company_id: ID of the company
+    """
+    _company_cache.pop(company_id, None)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -56,6 +130,19 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+@functools.lru_cache(maxsize=1)
+def _mock_password_hash() -> str:
+    """
+    Get the password hash of the mock development user.
+    
+    Hashed once, since bcrypt is deliberately slow.
+    
+    Returns:
+        Hashed password
+    """
+    return get_password_hash("password")
+
+
 def authenticate_user(email: str, password: str) -> Optional[User]:
     """
     Authenticate a user.
@@ -75,7 +162,7 @@ def authenticate_user(email: str, password: str) -> Optional[User]:
         return User(
             id="user123",
             email="user@example.com",
-            hashed_password=get_password_hash("password"),
+            hashed_password=_mock_password_hash(),
             full_name="John Doe",
             is_active=True,
             is_superuser=False,
@@ -122,6 +209,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     Raises:
         HTTPException: If authentication fails
     """
+    # Reuse the user for a token validated recently
+    cached = _token_cache.get(token)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -147,7 +239,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
         user = User(
             id="user123",
             email="user@example.com",
-            hashed_password=get_password_hash("password"),
+            hashed_password=_mock_password_hash(),
             full_name="John Doe",
             is_active=True,
             is_superuser=False,
@@ -156,6 +248,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> User:
     else:
         raise credentials_exception
     
+    _cache_user(token, user, payload.get("exp"))
+    
     return user
 
 
@@ -188,6 +282,11 @@ async def get_current_company(current_user: User = Depends(get_current_user)) ->
     Returns:
         Current company
     """
+    # Reuse the company for a recent request
+    cached = _company_cache.get(current_user.company_id)
+    if cached and cached[0] > time.time():
+        return cached[1]
+    
     # In a real implementation, this would query the database
     # For now, we'll just use a mock company
     
@@ -200,5 +299,7 @@ async def get_current_company(current_user: User = Depends(get_current_user)) ->
         "created_at": "2023-01-01T00:00:00Z"
     }
     
+    _cache_company(current_user.company_id, company)
+    
     return company
 
@@ -0,0 +1,48 @@
+"""
+Server-sent events for the Business Automation System API.
+
+This module streams events from async generators to clients as server-sent
+events.
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+
+async def _event_frames(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """
+    Encode events as server-sent event frames.
+    
+    An error raised while streaming ends the stream with an "error" event, so
+    clients can tell a failed stream from a finished one.
+    
+    Args:
+        events: Events to send
+        
+    Returns:
+        Async iterator of frames
+    """
+    try:
+        async for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+    except Exception as e:
+        logger.error(f"Error streaming events: {e}")
+        yield f"event: error\ndata: {json.dumps({'message': 'Streaming failed'})}\n\n"
+
+
+def event_stream_response(events: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """
+    Stream events to the client as server-sent events.
+    
+    Args:
+        events: Events to send
+        
+    Returns:
+        Streaming response of the events
+    """
+    return StreamingResponse(_event_frames(events), media_type="text/event-stream")
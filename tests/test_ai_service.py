@@ -0,0 +1,187 @@
+"""
+Test cases for the AI service response templates.
+
+This module contains test cases for caching generated responses as templates
+and filling them in for each recipient.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+
+from services.ai import ai_service as ai_service_module
+from services.ai.ai_service import AIService
+from services.ai.llm_cache import LLMCache
+
+# Mock data
+mock_lead_params = {
+    'message_type': 'initial_contact',
+    'lead_name': 'Jane Doe',
+    'company_id': 'company-123',
+    'lead_source': 'our website'
+}
+
+@pytest.fixture
+def ai_service():
+    """Create an AIService instance with a mocked API call."""
+    service = AIService()
+    service._call_openai_api = AsyncMock(return_value='Hi {lead_name}, thanks for visiting!')
+    return service
+
+def test_fill_response_substitutes_known_slots(ai_service):
+    """Test that known slots are filled in."""
+    message = ai_service._fill_response('Hi {lead_name}, welcome!', {'lead_name': 'Jane Doe'})
+
+    # Assertions
+    assert message == 'Hi Jane Doe, welcome!'
+
+@pytest.mark.parametrize('response_template', [
+    'Hi {lead_name.upper}, see {0.real} and {source}',
+    'Use {{braces}} or a lone { or } in your reply',
+    'Format {lead_name!r:>10} and {}'
+])
+def test_fill_response_leaves_other_braces(ai_service, response_template):
+    """Test that braces in model output other than known slots are left as they are."""
+    message = ai_service._fill_response(response_template, {'lead_name': 'Jane Doe'})
+
+    # Assertions
+    assert message == response_template
+
+@pytest.mark.asyncio
+async def test_generate_lead_message_reuses_cached_response(ai_service):
+    """Test that leads sharing a template and fixed parameters share one API call."""
+    first = await ai_service.generate_lead_message(mock_lead_params)
+    second = await ai_service.generate_lead_message({**mock_lead_params, 'lead_name': 'John Smith'})
+
+    # Assertions
+    assert first == 'Hi Jane Doe, thanks for visiting!'
+    assert second == 'Hi John Smith, thanks for visiting!'
+    ai_service._call_openai_api.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_generate_lead_message_regenerates_expired_response(ai_service, monkeypatch):
+    """Test that an expired cached response is generated again."""
+    monkeypatch.setattr(ai_service_module, 'RESPONSE_CACHE_TTL_SECONDS', 0)
+
+    await ai_service.generate_lead_message(mock_lead_params)
+    await ai_service.generate_lead_message(mock_lead_params)
+
+    # Assertions
+    assert ai_service._call_openai_api.call_count == 2
+
+def test_response_cache_evicts_least_recently_used(ai_service, monkeypatch):
+    """Test that the least recently used response is evicted when the cache is full."""
+    monkeypatch.setattr(ai_service_module, 'RESPONSE_CACHE_MAX_ENTRIES', 2)
+
+    ai_service._cache_response_template(('lead', 'a'), 'Response A')
+    ai_service._cache_response_template(('lead', 'b'), 'Response B')
+    ai_service._get_response_template(('lead', 'a'))
+    ai_service._cache_response_template(('lead', 'c'), 'Response C')
+
+    # Assertions
+    assert ai_service._get_response_template(('lead', 'a')) == 'Response A'
+    assert ai_service._get_response_template(('lead', 'b')) is None
+    assert ai_service._get_response_template(('lead', 'c')) == 'Response C'
+
+@pytest.mark.asyncio
+async def test_generate_lead_messages_bulk_returns_none_for_failed_items(ai_service, monkeypatch):
+    """Test that items failed in the batch job come back as None and are not cached."""
+    monkeypatch.setattr(AIService, '_client', AsyncMock())
+    ai_service._run_batch = AsyncMock(return_value=[None])
+
+    messages = await ai_service.generate_lead_messages_bulk([
+        mock_lead_params,
+        {**mock_lead_params, 'lead_name': 'John Smith'}
+    ])
+
+    # Assertions
+    assert messages == [None, None]
+    ai_service._run_batch.assert_called_once()
+    assert ai_service._get_response_template((('lead', 'initial_contact'), (('company_id', 'company-123'), ('lead_source', 'our website')))) is None
+
+@pytest.mark.asyncio
+async def test_generate_lead_messages_bulk_retries_failed_items(ai_service, monkeypatch):
+    """Test that a failed batch item is submitted again on the next call."""
+    monkeypatch.setattr(AIService, '_client', AsyncMock())
+    ai_service._run_batch = AsyncMock(side_effect=[[None], ['Hi {lead_name}, thanks for visiting!']])
+
+    await ai_service.generate_lead_messages_bulk([mock_lead_params])
+    messages = await ai_service.generate_lead_messages_bulk([mock_lead_params])
+
+    # Assertions
+    assert messages == ['Hi Jane Doe, thanks for visiting!']
+    assert ai_service._run_batch.call_count == 2
+
+@pytest.mark.asyncio
+async def test_generate_lead_message_does_not_cache_empty_response(ai_service):
+    """Test that an empty response is not served to later leads."""
+    ai_service._call_openai_api.side_effect = ['', 'Hi {lead_name}, thanks for visiting!']
+
+    first = await ai_service.generate_lead_message(mock_lead_params)
+    second = await ai_service.generate_lead_message(mock_lead_params)
+
+    # Assertions
+    assert first == ''
+    assert second == 'Hi Jane Doe, thanks for visiting!'
+    assert ai_service._call_openai_api.call_count == 2
+
+@pytest.mark.asyncio
+async def test_close_rebuilds_client_on_new_transport(monkeypatch):
+    """Test that the OpenAI client is not left on the closed HTTP client."""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-key')
+    service = AIService()
+    client = service._client
+    http_client = service._openai_http_client
+
+    await service.close()
+
+    # Assertions
+    assert http_client.is_closed
+    assert service._client is not client
+    assert not service._openai_http_client.is_closed
+    await service.close()
+
+@pytest.mark.asyncio
+async def test_generate_content_skips_embedding_without_index(ai_service, monkeypatch):
+    """Test that the first request in a namespace is embedded only to seed the index."""
+    monkeypatch.setattr(ai_service_module, '_content_cache', LLMCache())
+    ai_service._embed = AsyncMock(return_value=np.array([1.0, 0.0]))
+
+    await ai_service.generate_content('social', 'Growth tips', company_id='company-123')
+
+    # Assertions
+    ai_service._embed.assert_called_once()
+    assert ai_service_module._content_cache.has_index(('company', 'company-123', 'social', 'medium'))
+
+@pytest.mark.asyncio
+async def test_generate_content_semantic_hit_stays_within_company(ai_service, monkeypatch):
+    """Test that a similar request from another company is not served the cached content."""
+    monkeypatch.setattr(ai_service_module, '_content_cache', LLMCache())
+    ai_service._embed = AsyncMock(return_value=np.array([1.0, 0.0]))
+
+    await ai_service.generate_content('social', 'Growth tips', company_id='company-123')
+    await ai_service.generate_content('social', 'Tips for growth', company_id='company-123')
+    await ai_service.generate_content('social', 'Tips for growth', company_id='company-456')
+
+    # Assertions
+    assert ai_service._call_openai_api.call_count == 2
+
+@pytest.mark.asyncio
+async def test_generate_content_without_company_skips_semantic_cache(ai_service, monkeypatch):
+    """Test that requests without a company are never matched semantically."""
+    monkeypatch.setattr(ai_service_module, '_content_cache', LLMCache())
+    ai_service._embed = AsyncMock(return_value=np.array([1.0, 0.0]))
+
+    await ai_service.generate_content('social', 'Growth tips')
+    await ai_service.generate_content('social', 'Tips for growth')
+
+    # Assertions
+    ai_service._embed.assert_not_called()
+    assert ai_service._call_openai_api.call_count == 2
+
+def test_completion_params_use_configured_models(ai_service):
+    """Test that short and long-form intents use the configured small and large models."""
+    # Assertions
+    assert ai_service._completion_params('title', None)['model'] == ai_service_module.OPENAI_SMALL_MODEL
+    assert ai_service._completion_params('blog', None)['model'] == ai_service_module.OPENAI_LARGE_MODEL
+    assert ai_service._completion_params(None, None)['model'] == ai_service.model
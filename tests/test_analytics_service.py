@@ -0,0 +1,103 @@
+"""
+Test cases for the Analytics Service.
+
+This module contains test cases for batching tracked metrics and caching
+computed metrics.
+"""
+
+import pytest
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from services.analytics import analytics_service as analytics_service_module
+from services.analytics.analytics_service import AnalyticsService
+
+@pytest.fixture
+def analytics_service():
+    """Create an AnalyticsService instance."""
+    return AnalyticsService()
+
+@pytest.mark.asyncio
+async def test_close_writes_queued_metrics(analytics_service, monkeypatch):
+    """Test that metrics still queued at shutdown are written."""
+    monkeypatch.setattr(analytics_service_module, 'FLUSH_INTERVAL_SECONDS', 60)
+    written = []
+    monkeypatch.setattr(AnalyticsService, '_write_metrics', written.extend)
+
+    await analytics_service.track_lead_metric('company-123', 'lead-1', 'new')
+    await analytics_service.track_lead_metric('company-123', 'lead-2', 'new')
+    await asyncio.sleep(0)
+    await analytics_service.close()
+
+    # Assertions
+    assert [metric['lead_id'] for metric in written] == ['lead-1', 'lead-2']
+    assert analytics_service._metric_queue.empty()
+    assert 'company-123' in analytics_service._metrics_generation
+
+def test_flush_retries_failed_write(analytics_service, monkeypatch):
+    """Test that a failed write is retried before the batch is dropped."""
+    write_metrics = MagicMock(side_effect=[RuntimeError('Database error'), None])
+    monkeypatch.setattr(AnalyticsService, '_write_metrics', write_metrics)
+
+    analytics_service._flush([{'company_id': 'company-123'}])
+
+    # Assertions
+    assert write_metrics.call_count == 2
+    assert analytics_service._metrics_generation['company-123'] == 1
+
+def test_flush_drops_batch_after_failed_writes(analytics_service, monkeypatch, caplog):
+    """Test that a batch failing every write is logged as dropped."""
+    write_metrics = MagicMock(side_effect=RuntimeError('Database error'))
+    monkeypatch.setattr(AnalyticsService, '_write_metrics', write_metrics)
+
+    analytics_service._flush([{'company_id': 'company-123'}, {'company_id': 'company-123'}])
+
+    # Assertions
+    assert write_metrics.call_count == analytics_service_module.FLUSH_WRITE_ATTEMPTS
+    assert 'Dropped 2 tracked metrics' in caplog.text
+    assert 'company-123' not in analytics_service._metrics_generation
+
+def test_write_metrics_returns_result_per_metric(analytics_service):
+    """Test that each written metric gets its own tracking result."""
+    metrics = [{'company_id': 'company-123', 'lead_id': 'lead-1'}, {'company_id': 'company-123', 'lead_id': 'lead-2'}]
+
+    results = analytics_service._write_metrics(metrics)
+
+    # Assertions
+    assert results == metrics
+    assert results[0] is not metrics[0]
+
+def test_cached_metrics_returns_copy(analytics_service):
+    """Test that changing a returned result does not change the cached one."""
+    start_date = datetime(2026, 1, 1)
+    end_date = datetime(2026, 1, 30)
+
+    metrics = analytics_service.get_lead_metrics('company-123', start_date, end_date)
+    metrics['summary']['total'] = -1
+    metrics['by_source'].clear()
+
+    # Assertions
+    cached = analytics_service.get_lead_metrics('company-123', start_date, end_date)
+    assert cached['summary']['total'] != -1
+    assert cached['by_source']
+    assert cached['over_time'] is metrics['over_time']
+
+def test_cached_metrics_drops_lock_after_computing(analytics_service):
+    """Test that no per-key lock is kept once the result is cached."""
+    analytics_service.get_lead_metrics('company-123', datetime(2026, 1, 1), datetime(2026, 1, 30))
+
+    # Assertions
+    assert len(analytics_service._metrics_cache) == 1
+    assert analytics_service._metrics_locks == {}
+
+def test_cached_metrics_drops_lock_after_failure(analytics_service, monkeypatch):
+    """Test that the per-key lock is dropped when the getter raises."""
+    monkeypatch.setattr(AnalyticsService, '_leads_over_time', MagicMock(side_effect=RuntimeError('Database error')))
+
+    with pytest.raises(RuntimeError):
+        analytics_service.get_lead_metrics('company-123', datetime(2026, 1, 1), datetime(2026, 1, 30))
+
+    # Assertions
+    assert analytics_service._metrics_cache == {}
+    assert analytics_service._metrics_locks == {}
@@ -0,0 +1,251 @@
+"""
+Test cases for the Content Generation job queue.
+
+This module contains test cases for queuing, polling and evicting content
+generation jobs.
+"""
+
+import pytest
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+
+from api import content_generation
+
+@pytest.fixture(autouse=True)
+def job_queue(monkeypatch):
+    """Give each test an empty job queue and job store."""
+    queue = asyncio.Queue(maxsize=content_generation.GENERATION_QUEUE_SIZE)
+    monkeypatch.setattr(content_generation, '_job_queue', queue)
+    monkeypatch.setattr(content_generation, '_job_store', content_generation.MemoryJobStore())
+    return queue
+
+def _finished_job(job_id, finished_at):
+    """Build the status of a completed job."""
+    return {
+        'job_id': job_id,
+        'status': 'completed',
+        'owner_id': 'user-123',
+        'result': {'success': True},
+        'finished_at': finished_at
+    }
+
+async def _run_queued_jobs(queue):
+    """Run a worker until the queued jobs are done."""
+    worker = asyncio.create_task(content_generation._run_jobs(queue))
+    await queue.join()
+    worker.cancel()
+
+@pytest.mark.asyncio
+async def test_get_job_returns_own_job():
+    """Test polling a job queued by the same user."""
+    job_id = await content_generation._enqueue(MagicMock(), owner_id='user-123')
+
+    # Call the endpoint
+    job = await content_generation.get_job(job_id, current_user={'id': 'user-123'})
+
+    # Assertions
+    assert job['job_id'] == job_id
+    assert job['status'] == 'queued'
+    assert 'owner_id' not in job
+
+@pytest.mark.asyncio
+async def test_get_job_hides_other_users_jobs():
+    """Test that a job queued by another user is reported as not found."""
+    job_id = await content_generation._enqueue(MagicMock(), owner_id='user-123')
+
+    # Call the endpoint
+    with pytest.raises(HTTPException) as exc_info:
+        await content_generation.get_job(job_id, current_user={'id': 'user-456'})
+
+    # Assertions
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_job_unknown_job():
+    """Test polling a job that does not exist."""
+    with pytest.raises(HTTPException) as exc_info:
+        await content_generation.get_job('missing-job', current_user={'id': 'user-123'})
+
+    # Assertions
+    assert exc_info.value.status_code == 404
+
+@pytest.mark.asyncio
+async def test_enqueue_without_workers(monkeypatch):
+    """Test that queuing before the workers have started is rejected with 503."""
+    monkeypatch.setattr(content_generation, '_job_queue', None)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await content_generation._enqueue(MagicMock(), owner_id='user-123')
+
+    # Assertions
+    assert exc_info.value.status_code == 503
+
+@pytest.mark.asyncio
+async def test_enqueue_full_queue(monkeypatch):
+    """Test that a full queue is rejected with 503 and leaves no job behind."""
+    job_store = content_generation.MemoryJobStore()
+    monkeypatch.setattr(content_generation, '_job_store', job_store)
+    monkeypatch.setattr(content_generation, '_job_queue', asyncio.Queue(maxsize=1))
+    await content_generation._enqueue(MagicMock(), owner_id='user-123')
+
+    with pytest.raises(HTTPException) as exc_info:
+        await content_generation._enqueue(MagicMock(), owner_id='user-123')
+
+    # Assertions
+    assert exc_info.value.status_code == 503
+    assert len(job_store._jobs) == 1
+
+@pytest.mark.asyncio
+async def test_memory_job_store_evicts_expired_jobs():
+    """Test that finished jobs past their TTL are evicted when the store is full."""
+    job_store = content_generation.MemoryJobStore(max_entries=3)
+    now = time.time()
+    await job_store.set('expired-job', _finished_job('expired-job', now - content_generation.JOB_STATUS_TTL_SECONDS - 1))
+    await job_store.set('recent-job', _finished_job('recent-job', now - 10))
+    await job_store.set('running-job', {'job_id': 'running-job', 'status': 'running', 'owner_id': 'user-123'})
+
+    # Store another job
+    await job_store.set('new-job', {'job_id': 'new-job', 'status': 'queued', 'owner_id': 'user-123'})
+
+    # Assertions
+    assert set(job_store._jobs) == {'recent-job', 'running-job', 'new-job'}
+
+@pytest.mark.asyncio
+async def test_memory_job_store_evicts_longest_finished_jobs_when_full():
+    """Test that only the longest finished jobs are evicted while none have expired."""
+    job_store = content_generation.MemoryJobStore(max_entries=3)
+    now = time.time()
+    await job_store.set('newest-job', _finished_job('newest-job', now - 10))
+    await job_store.set('oldest-job', _finished_job('oldest-job', now - 30))
+    await job_store.set('middle-job', _finished_job('middle-job', now - 20))
+
+    # Store another job
+    await job_store.set('new-job', {'job_id': 'new-job', 'status': 'queued', 'owner_id': 'user-123'})
+
+    # Assertions
+    assert set(job_store._jobs) == {'newest-job', 'middle-job', 'new-job'}
+
+@pytest.mark.asyncio
+async def test_memory_job_store_keeps_unfinished_jobs():
+    """Test that queued and running jobs are never evicted."""
+    job_store = content_generation.MemoryJobStore(max_entries=2)
+    await job_store.set('queued-job', {'job_id': 'queued-job', 'status': 'queued', 'owner_id': 'user-123'})
+    await job_store.set('running-job', {'job_id': 'running-job', 'status': 'running', 'owner_id': 'user-123'})
+
+    # Store another job
+    await job_store.set('new-job', {'job_id': 'new-job', 'status': 'queued', 'owner_id': 'user-123'})
+
+    # Assertions
+    assert set(job_store._jobs) == {'queued-job', 'running-job', 'new-job'}
+
+@pytest.mark.asyncio
+async def test_redis_job_store_round_trip():
+    """Test that job statuses are stored in Redis under the prefix with the TTL."""
+    stored = {}
+
+    async def redis_set(key, value, ex):
+        stored[key] = value
+
+    async def redis_get(key):
+        return stored.get(key)
+
+    client = AsyncMock()
+    client.set.side_effect = redis_set
+    client.get.side_effect = redis_get
+    job_store = content_generation.RedisJobStore(client)
+
+    await job_store.set('job-123', {'job_id': 'job-123', 'status': 'queued', 'owner_id': 'user-123'})
+
+    # Assertions
+    assert await job_store.get('job-123') == {'job_id': 'job-123', 'status': 'queued', 'owner_id': 'user-123'}
+    assert await job_store.get('other-job') is None
+    assert client.set.call_args.args[0] == 'content_generation_job:job-123'
+    assert client.set.call_args.kwargs['ex'] == content_generation.JOB_STATUS_TTL_SECONDS
+
+@pytest.mark.asyncio
+async def test_run_jobs_records_result(job_queue):
+    """Test that a worker runs a queued job and records its result."""
+    async def generate():
+        return {'success': True, 'content': 'Generated content'}
+
+    job_id = await content_generation._enqueue(generate, owner_id='user-123')
+    await _run_queued_jobs(job_queue)
+
+    # Assertions
+    job = await content_generation.get_job(job_id, current_user={'id': 'user-123'})
+    assert job['status'] == 'completed'
+    assert job['result'] == {'success': True, 'content': 'Generated content'}
+    assert 'finished_at' in job
+
+@pytest.mark.asyncio
+async def test_run_jobs_records_failure(job_queue):
+    """Test that a job raising an error is recorded as failed."""
+    async def generate():
+        raise RuntimeError('OpenAI API error')
+
+    job_id = await content_generation._enqueue(generate, owner_id='user-123')
+    await _run_queued_jobs(job_queue)
+
+    # Assertions
+    job = await content_generation.get_job(job_id, current_user={'id': 'user-123'})
+    assert job['status'] == 'failed'
+    assert job['error'] == 'OpenAI API error'
+
+@pytest.mark.asyncio
+async def test_run_jobs_completes_non_dict_result(job_queue, monkeypatch):
+    """Test that a cached job whose result is not a dict still completes."""
+    monkeypatch.setattr(content_generation, '_generation_cache', {})
+
+    async def generate():
+        return 'Generated content'
+
+    job_id = await content_generation._enqueue(generate, owner_id='user-123', cache_key='request-hash')
+    await _run_queued_jobs(job_queue)
+
+    # Assertions
+    job = await content_generation.get_job(job_id, current_user={'id': 'user-123'})
+    assert job['status'] == 'completed'
+    assert job['result'] == 'Generated content'
+    assert content_generation._get_cached_generation('request-hash') is None
+
+@pytest.mark.asyncio
+async def test_run_jobs_caches_successful_generation(job_queue, monkeypatch):
+    """Test that a successful generation is served from the cache afterwards."""
+    monkeypatch.setattr(content_generation, '_generation_cache', {})
+
+    async def generate():
+        return {'success': True, 'content': 'Generated content'}
+
+    await content_generation._enqueue(generate, owner_id='user-123', cache_key='request-hash')
+    await _run_queued_jobs(job_queue)
+
+    # Assertions
+    assert content_generation._get_cached_generation('request-hash') == {'success': True, 'content': 'Generated content'}
+
+@pytest.mark.asyncio
+async def test_run_jobs_does_not_cache_failed_generation(job_queue, monkeypatch):
+    """Test that a failed generation is not cached, so it is retried."""
+    monkeypatch.setattr(content_generation, '_generation_cache', {})
+
+    async def generate():
+        return {'success': False, 'message': 'OpenAI API error'}
+
+    job_id = await content_generation._enqueue(generate, owner_id='user-123', cache_key='request-hash')
+    await _run_queued_jobs(job_queue)
+
+    # Assertions
+    job = await content_generation.get_job(job_id, current_user={'id': 'user-123'})
+    assert job['status'] == 'completed'
+    assert content_generation._get_cached_generation('request-hash') is None
+
+def test_get_cached_generation_expired(monkeypatch):
+    """Test that an expired cached generation is not served."""
+    monkeypatch.setattr(content_generation, '_generation_cache', {
+        'request-hash': (time.time() - 1, {'success': True})
+    })
+
+    # Assertions
+    assert content_generation._get_cached_generation('request-hash') is None
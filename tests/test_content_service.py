@@ -0,0 +1,180 @@
+"""
+Test cases for content list pagination.
+
+This module contains test cases for the keyset cursors used to page through
+content lists, and for publishing content.
+"""
+
+import pytest
+import base64
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch, AsyncMock
+
+import httpx
+from fastapi import HTTPException
+
+from api import content as content_api
+from models.content import ContentFilter
+from services import content_service as content_service_module
+from services.content_service import ContentService, decode_content_cursor
+
+def _encode(value):
+    """Encode a value the way cursors are encoded."""
+    return base64.urlsafe_b64encode(json.dumps(value).encode('utf-8')).decode('ascii')
+
+@pytest.fixture
+def content_service():
+    """Create a ContentService instance."""
+    return ContentService()
+
+# Mock data
+mock_content_rows = [
+    {
+        'id': 'content-2',
+        'company_id': 'company-123',
+        'type': 'email',
+        'title': 'New Product Announcement',
+        'content': "We're excited to announce our new product...",
+        'status': 'draft',
+        'platform': None,
+        'created_at': datetime(2024, 1, 2, tzinfo=timezone.utc),
+        'published_at': None,
+        'metadata': {}
+    },
+    {
+        'id': 'content-1',
+        'company_id': 'company-123',
+        'type': 'blog',
+        'title': '10 Tips for Small Business Success',
+        'content': 'Here are 10 tips for small business success...',
+        'status': 'published',
+        'platform': 'wordpress',
+        'created_at': datetime(2024, 1, 1, tzinfo=timezone.utc),
+        'published_at': datetime(2024, 1, 1, tzinfo=timezone.utc),
+        'metadata': {}
+    }
+]
+
+@pytest.mark.asyncio
+async def test_get_content_list_queries_database(content_service):
+    """Test that filters, ordering and the page size are pushed down to the database."""
+    with patch('core.database.db.query_collection', new_callable=AsyncMock) as mock_query_collection:
+        mock_query_collection.return_value = mock_content_rows
+
+        page = await content_service.get_content_list('company-123', ContentFilter(status='draft', type='email'), limit=1)
+
+        # Assertions
+        assert [content.id for content in page['items']] == ['content-2']
+        assert page['items'][0].body == "We're excited to announce our new product..."
+        assert page['next_cursor'] is not None
+        mock_query_collection.assert_called_once_with(
+            'content',
+            filters=[
+                {'field': 'company_id', 'op': '==', 'value': 'company-123'},
+                {'field': 'status', 'op': '==', 'value': 'draft'},
+                {'field': 'type', 'op': '==', 'value': 'email'}
+            ],
+            order_by=['created_at', 'id'],
+            order_direction='desc',
+            limit=2,
+            start_after=None
+        )
+
+@pytest.mark.asyncio
+async def test_get_content_list_continues_after_cursor(content_service):
+    """Test that the next page starts after the position in the cursor."""
+    with patch('core.database.db.query_collection', new_callable=AsyncMock) as mock_query_collection:
+        mock_query_collection.side_effect = [mock_content_rows, mock_content_rows[1:]]
+
+        first_page = await content_service.get_content_list('company-123', ContentFilter(), limit=1)
+        second_page = await content_service.get_content_list('company-123', ContentFilter(), cursor=first_page['next_cursor'], limit=1)
+
+        # Assertions
+        assert [content.id for content in second_page['items']] == ['content-1']
+        assert second_page['next_cursor'] is None
+        assert mock_query_collection.call_args.kwargs['start_after'] == [datetime(2024, 1, 2, tzinfo=timezone.utc), 'content-2']
+
+@pytest.mark.asyncio
+async def test_get_content_list_rejects_unsupported_filters(content_service):
+    """Test that filters without a database column are rejected."""
+    with pytest.raises(ValueError):
+        await content_service.get_content_list('company-123', ContentFilter(tags=['tips']))
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor',
+    _encode('2024-01-01T00:00:00'),
+    _encode([1, 2]),
+    _encode(['not-a-date', 'content-123']),
+    _encode(['2024-01-01T00:00:00', 'content-123', 'extra'])
+])
+def test_decode_content_cursor_malformed(cursor):
+    """Test that malformed cursors are rejected with ValueError."""
+    with pytest.raises(ValueError):
+        decode_content_cursor(cursor)
+
+@pytest.mark.asyncio
+async def test_get_content_list_endpoint_rejects_malformed_cursor(content_service):
+    """Test that the endpoint answers a malformed cursor with 400."""
+    with pytest.raises(HTTPException) as exc_info:
+        await content_api.get_content_list(
+            status_filter=None,
+            type=None,
+            platform=None,
+            tags=None,
+            created_after=None,
+            created_before=None,
+            created_by=None,
+            cursor='not-a-cursor',
+            limit=100,
+            current_user={'id': 'user-123'},
+            current_company={'id': 'company-123'},
+            content_service=content_service
+        )
+
+    # Assertions
+    assert exc_info.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_publish_content_wordpress_uses_shared_client(content_service, monkeypatch):
+    """Test that publishing to WordPress posts over the shared HTTP client."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(201, json={'id': 42, 'link': 'https://example.com/blog/42'})
+
+    monkeypatch.setattr(content_service_module, '_http_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    result = await content_service.publish_content(
+        'company-123',
+        'mock_content_id',
+        'wordpress',
+        {'api_url': 'https://example.com/wp-json/wp/v2', 'username': 'admin', 'password': 'password'}
+    )
+
+    # Assertions
+    assert result['success'] is True
+    assert result['url'] == 'https://example.com/blog/42'
+    assert result['content'].status == 'published'
+    assert len(requests) == 1
+    assert str(requests[0].url) == 'https://example.com/wp-json/wp/v2/posts'
+
+@pytest.mark.asyncio
+async def test_publish_content_platform_error(content_service, monkeypatch):
+    """Test that a platform API error is returned as a failed result."""
+    def handler(request):
+        return httpx.Response(500)
+
+    monkeypatch.setattr(content_service_module, '_http_client', httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    result = await content_service.publish_content(
+        'company-123',
+        'mock_content_id',
+        'wordpress',
+        {'api_url': 'https://example.com/wp-json/wp/v2'}
+    )
+
+    # Assertions
+    assert result['success'] is False
+    assert 'content' not in result
@@ -0,0 +1,152 @@
+"""
+Test cases for the database client.
+
+This module contains test cases for the database client helpers that do not
+need a live database.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from core.database import DatabaseClient, _encode_jsonb, _decode_jsonb
+
+# Mock data
+mock_metadata = {
+    'word_count': 800,
+    'keywords': ['software development', 'business growth'],
+    'published': True,
+    'rating': None
+}
+
+def test_encode_jsonb_binary_format():
+    """Test that JSONB values are prefixed with the binary format version."""
+    data = _encode_jsonb({'word_count': 800})
+
+    # Assertions
+    assert data == b'\x01{"word_count":800}'
+
+@pytest.mark.parametrize('value', [mock_metadata, [1, 'two', {'three': 3}], 'text', 42, None])
+def test_jsonb_round_trip(value):
+    """Test that JSONB values decode to what was encoded."""
+    assert _decode_jsonb(_encode_jsonb(value)) == value
+
+@pytest.mark.asyncio
+async def test_init_pg_connection_registers_jsonb_codec():
+    """Test that new connections encode and decode JSONB in binary format."""
+    client = DatabaseClient.__new__(DatabaseClient)
+    conn = AsyncMock()
+
+    await client._init_pg_connection(conn)
+
+    # Assertions
+    conn.set_type_codec.assert_called_once_with(
+        'jsonb',
+        encoder=_encode_jsonb,
+        decoder=_decode_jsonb,
+        schema='pg_catalog',
+        format='binary'
+    )
+
+def _firebase_doc(doc_id, data):
+    """Build a Firestore document snapshot."""
+    doc = MagicMock()
+    doc.id = doc_id
+    doc.exists = data is not None
+    doc.to_dict.return_value = data
+    return doc
+
+@pytest.mark.asyncio
+async def test_batch_get_documents_firebase_keeps_order():
+    """Test that Firestore documents are returned in the order requested."""
+    client = DatabaseClient.__new__(DatabaseClient)
+    client.db_type = 'firebase'
+    client.client = MagicMock()
+    client.client.get_all.return_value = [
+        _firebase_doc('lead-3', {'name': 'Lead 3'}),
+        _firebase_doc('lead-2', None),
+        _firebase_doc('lead-1', {'name': 'Lead 1'})
+    ]
+
+    documents = await client.batch_get_documents('leads', ['lead-1', 'lead-2', 'lead-3'])
+
+    # Assertions
+    assert documents == [
+        {'name': 'Lead 1', 'id': 'lead-1'},
+        None,
+        {'name': 'Lead 3', 'id': 'lead-3'}
+    ]
+    client.client.get_all.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_batch_get_documents_postgresql_keeps_order():
+    """Test that PostgreSQL rows are returned in the order requested."""
+    conn = AsyncMock()
+    conn.fetch.return_value = [
+        {'id': 'lead-3', 'name': 'Lead 3'},
+        {'id': 'lead-1', 'name': 'Lead 1'}
+    ]
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+
+    client = DatabaseClient.__new__(DatabaseClient)
+    client.db_type = 'postgresql'
+    client._sql_cache = {}
+    client._get_pg_pool = AsyncMock(return_value=pool)
+
+    documents = await client.batch_get_documents('leads', ['lead-1', 'lead-2', 'lead-3'])
+
+    # Assertions
+    assert documents == [
+        {'id': 'lead-1', 'name': 'Lead 1'},
+        None,
+        {'id': 'lead-3', 'name': 'Lead 3'}
+    ]
+    conn.fetch.assert_called_once_with('SELECT * FROM leads WHERE id = ANY($1)', ['lead-1', 'lead-2', 'lead-3'])
+
+@pytest.mark.asyncio
+async def test_batch_get_documents_empty():
+    """Test that no IDs need no database call."""
+    client = DatabaseClient.__new__(DatabaseClient)
+    client.db_type = 'postgresql'
+    client._get_pg_pool = AsyncMock()
+
+    # Assertions
+    assert await client.batch_get_documents('leads', []) == []
+    client._get_pg_pool.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_query_collection_postgresql_keyset():
+    """Test that a keyset page is queried with a row comparison on the order fields."""
+    conn = AsyncMock()
+    conn.fetch.return_value = []
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__.return_value = conn
+
+    client = DatabaseClient.__new__(DatabaseClient)
+    client.db_type = 'postgresql'
+    client._get_pg_pool = AsyncMock(return_value=pool)
+
+    await client.query_collection(
+        'content',
+        filters=[{'field': 'company_id', 'op': '==', 'value': 'company-123'}],
+        order_by=['created_at', 'id'],
+        order_direction='desc',
+        limit=101,
+        start_after=['2024-01-02T00:00:00+00:00', 'content-2']
+    )
+
+    # Assertions
+    conn.fetch.assert_called_once_with(
+        'SELECT * FROM content WHERE company_id = $1 AND (created_at, id) < ($2, $3) '
+        'ORDER BY created_at DESC, id DESC LIMIT 101',
+        'company-123', '2024-01-02T00:00:00+00:00', 'content-2'
+    )
+
+@pytest.mark.asyncio
+async def test_query_collection_start_after_needs_order_fields():
+    """Test that start_after must match the order_by fields."""
+    client = DatabaseClient.__new__(DatabaseClient)
+    client.db_type = 'postgresql'
+
+    with pytest.raises(ValueError):
+        await client.query_collection('content', order_by='created_at', start_after=['2024-01-02', 'content-2'])
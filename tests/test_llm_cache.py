@@ -0,0 +1,109 @@
+"""
+Test cases for the LLM response cache.
+
+This module contains test cases for exact and semantic caching of generated
+content.
+"""
+
+import pytest
+import numpy as np
+from unittest.mock import AsyncMock
+
+from services.ai.llm_cache import LLMCache, MemoryCacheBackend, RedisCacheBackend
+
+# Mock data
+mock_response = {'title': '10 Tips for Small Business Success', 'body': 'Generated content'}
+
+@pytest.fixture
+def llm_cache():
+    """Create an LLMCache instance with an in-memory backend."""
+    return LLMCache(MemoryCacheBackend())
+
+def test_cache_key_ignores_field_order():
+    """Test that the cache key does not depend on the order of the prompt fields."""
+    first = LLMCache.cache_key('gpt-4', {'topic': 'growth', 'tone': 'friendly'}, 0.7)
+    second = LLMCache.cache_key('gpt-4', {'tone': 'friendly', 'topic': 'growth'}, 0.7)
+
+    # Assertions
+    assert first == second
+    assert first != LLMCache.cache_key('gpt-4', {'topic': 'growth', 'tone': 'friendly'}, 0.2)
+
+@pytest.mark.asyncio
+async def test_get_exact_match(llm_cache):
+    """Test that a cached response is returned for the same request."""
+    await llm_cache.set('request-key', mock_response)
+
+    # Assertions
+    assert await llm_cache.get('request-key') == mock_response
+    assert await llm_cache.get('other-key') is None
+
+@pytest.mark.asyncio
+async def test_get_expired_response():
+    """Test that an expired response is not returned."""
+    llm_cache = LLMCache(MemoryCacheBackend(), ttl=0)
+    await llm_cache.set('request-key', mock_response)
+
+    # Assertions
+    assert await llm_cache.get('request-key') is None
+
+@pytest.mark.asyncio
+async def test_semantic_get_similar_request(llm_cache):
+    """Test that a similar request in the same namespace is served from the cache."""
+    namespace = ('company-123', 'blog')
+    await llm_cache.set('request-key', mock_response, namespace=namespace, embedding=np.array([1.0, 0.0, 0.0]))
+
+    # Assertions
+    assert await llm_cache.semantic_get(namespace, np.array([0.99, 0.05, 0.0])) == mock_response
+    assert await llm_cache.semantic_get(namespace, np.array([0.0, 1.0, 0.0])) is None
+    assert await llm_cache.semantic_get(('company-456', 'blog'), np.array([1.0, 0.0, 0.0])) is None
+
+@pytest.mark.asyncio
+async def test_has_index(llm_cache):
+    """Test that a namespace is indexed once a response is cached with an embedding."""
+    await llm_cache.set('request-key', mock_response)
+
+    assert not llm_cache.has_index(('company-123', 'blog'))
+
+    await llm_cache.set('request-key', mock_response, namespace=('company-123', 'blog'), embedding=np.array([1.0, 0.0]))
+
+    # Assertions
+    assert llm_cache.has_index(('company-123', 'blog'))
+    assert not llm_cache.has_index(('company-456', 'blog'))
+
+@pytest.mark.asyncio
+async def test_stats_counts_lookups(llm_cache):
+    """Test that hits, misses and semantic hits are counted."""
+    namespace = ('company-123', 'blog')
+    await llm_cache.set('request-key', mock_response, namespace=namespace, embedding=np.array([1.0, 0.0]))
+
+    await llm_cache.get('request-key')
+    await llm_cache.get('other-key')
+    await llm_cache.semantic_get(namespace, np.array([1.0, 0.0]))
+
+    # Assertions
+    assert llm_cache.stats() == {'hits': 1, 'semantic_hits': 1, 'misses': 1}
+
+@pytest.mark.asyncio
+async def test_redis_backend_round_trip():
+    """Test that responses are stored in Redis under the prefix with the TTL."""
+    stored = {}
+
+    async def redis_set(key, value, ex):
+        stored[key] = value
+
+    async def redis_get(key):
+        return stored.get(key)
+
+    client = AsyncMock()
+    client.set.side_effect = redis_set
+    client.get.side_effect = redis_get
+    llm_cache = LLMCache(RedisCacheBackend(client), ttl=60)
+
+    await llm_cache.set('request-key', mock_response)
+
+    # Assertions
+    assert await llm_cache.get('request-key') == mock_response
+    assert await llm_cache.get('other-key') is None
+    client.set.assert_called_once()
+    assert client.set.call_args.args[0] == 'llm_cache:request-key'
+    assert client.set.call_args.kwargs['ex'] == 60
@@ -0,0 +1,45 @@
+"""
+Test cases for server-sent event streaming.
+
+This module contains test cases for encoding streamed events as server-sent
+event frames.
+"""
+
+import pytest
+
+from core.streaming import event_stream_response
+
+async def _read_frames(response):
+    """Read every frame sent by a streaming response."""
+    return [frame async for frame in response.body_iterator]
+
+@pytest.mark.asyncio
+async def test_event_stream_response_sends_data_frames():
+    """Test that each event is sent as a data frame."""
+    async def events():
+        yield {'type': 'delta', 'text': 'Hello'}
+        yield {'type': 'done', 'title': 'Greeting'}
+
+    response = event_stream_response(events())
+
+    # Assertions
+    assert response.media_type == 'text/event-stream'
+    assert await _read_frames(response) == [
+        'data: {"type": "delta", "text": "Hello"}\n\n',
+        'data: {"type": "done", "title": "Greeting"}\n\n'
+    ]
+
+@pytest.mark.asyncio
+async def test_event_stream_response_ends_with_error_event():
+    """Test that an error while streaming ends the stream with an error event."""
+    async def events():
+        yield {'type': 'delta', 'text': 'Hello'}
+        raise RuntimeError('OpenAI API error')
+
+    frames = await _read_frames(event_stream_response(events()))
+
+    # Assertions
+    assert frames == [
+        'data: {"type": "delta", "text": "Hello"}\n\n',
+        'event: error\ndata: {"message": "Streaming failed"}\n\n'
+    ]
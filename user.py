@@ -6,7 +6,7 @@ This module provides the data models for users and authentication.
 
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 
 class UserBase(BaseModel):
@@ -36,9 +36,7 @@ class UserInDBBase(UserBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class User(UserInDBBase):
@@ -6,7 +6,7 @@ This module provides the data models for workflow configuration and management.
 
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 
 
 class WorkflowBase(BaseModel):
@@ -42,9 +42,7 @@ class Workflow(WorkflowBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WorkflowStep(BaseModel):
@@ -58,9 +56,7 @@ class WorkflowStep(BaseModel):
     next_steps: List[str] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WorkflowExecution(BaseModel):
@@ -76,9 +72,7 @@ class WorkflowExecution(BaseModel):
     result: Dict[str, Any] = Field(default_factory=dict)
     error: Optional[str] = None
 
-    class Config:
-        """Pydantic config."""
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class WorkflowWithSteps(Workflow):
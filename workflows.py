@@ -81,7 +81,7 @@ async def create_workflow_config(
     config_data.updated_at = now
     
     # Create config in database
-    result = await db.create_document("workflow_configs", config_data.dict(), config_id)
+    result = await db.create_document("workflow_configs", config_data.model_dump(), config_id)
     
     return LeadNurturingConfig(**result)
 
@@ -155,7 +155,7 @@ async def update_workflow_config(
         )
     
     # Prepare update data
-    update_dict = config_data.dict(exclude_unset=True)
+    update_dict = config_data.model_dump(exclude_unset=True)
     update_dict["updated_at"] = datetime.utcnow()
     
     # Don't allow changing company_id or created_by